@@ -0,0 +1,44 @@
+"""
+Compares batched `CadEntry` validation (`core/cad_validation.py`) with the per-row `model_validate` path.
+
+    python -m benchmarks.bench_cad_validation --days 365 --rows-per-day 200
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+
+from core import CadEntry
+from core.cad_validation import validate_cad_rows
+from modules.backend_tests.stand_in import CadDataset, run_query
+
+
+def per_row(fields, data):
+    for row in data:
+        CadEntry.model_validate(dict(zip(fields, row)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=365, help="Width of the synthetic date window")
+    parser.add_argument("--rows-per-day", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    start = datetime(2024, 1, 1)
+    dataset = CadDataset.synthetic(start, start + timedelta(days=args.days), rows_per_day=args.rows_per_day)
+    payload = json.loads(run_query(dataset, {"date-min": "2024-01-01", "date-max": f"+{args.days}", "dist-max": "10",
+                                             "diameter": "true", "fullname": "true"}, now=start))
+    fields, data = payload["fields"], payload["data"]
+    validate_cad_rows(fields, data[:10])  # build the cached adapter outside the timing
+
+    results = {}
+    for name, fn in (("per_row", per_row), ("batched", validate_cad_rows)):
+        results[name] = min(timeit.repeat(lambda: fn(fields, data), number=1, repeat=args.repeat))
+        print(f"{name:>8}: {results[name] * 1000:8.1f} ms for {len(data)} rows "
+              f"({results[name] / len(data) * 1e6:.2f} µs/row)")
+    print(f" speedup: {results['per_row'] / results['batched']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
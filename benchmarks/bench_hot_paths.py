@@ -0,0 +1,129 @@
+"""
+Times the client-side hot paths of the suite on synthetic or recorded CAD payloads and gates regressions.
+
+    python -m benchmarks.bench_hot_paths --save-baseline            # record output/benchmarks/baseline.json
+    python -m benchmarks.bench_hot_paths                            # compare against it, exit 1 on a regression
+    python -m benchmarks.bench_hot_paths --sizes 1000000 --payload recorded.json --cases json_decode
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from benchmarks.harness import (DEFAULT_ALPHA, DEFAULT_SAMPLES, DEFAULT_THRESHOLD, benchmark, cases, compare,
+                                format_table, load_baseline, measure, save_baseline, summarize)
+from benchmarks.payloads import load_payload, resized, synthetic_payload
+from core import NASA_CLOSE_APPROACH_DATE_FORMAT, ROOT_WORKING_DIRECTORY, LOGS_FOLDER
+from core.cad_columns import CadColumns
+from core.cad_dates import first_unsorted, parse_cd_array
+from core.cad_validation import validate_cad_rows
+from core.schema_validation import validate_response
+from modules.backend_tests import AsteroidRequestBuilder
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_BASELINE = os.path.join(ROOT_WORKING_DIRECTORY, LOGS_FOLDER, "benchmarks", "baseline.json")
+
+
+@benchmark("json_decode")
+def bench_json_decode(payload, rows):
+    """`json.loads` of the response body, as in `HelperAsteroidData.fetch_data`."""
+    body = json.dumps(payload).encode("utf-8")
+    return lambda: json.loads(body)
+
+
+@benchmark("schema_validation")
+def bench_schema_validation(payload, rows):
+    """`ASTEROID_API_SCHEMA` validation through the compiled validator."""
+    validate_response(payload)
+    return lambda: validate_response(payload)
+
+
+@benchmark("row_validation")
+def bench_row_validation(payload, rows):
+    """Batched `CadEntry` validation of every row."""
+    fields, data = payload["fields"], payload["data"]
+    validate_cad_rows(fields, data[:10])
+    return lambda: validate_cad_rows(fields, data)
+
+
+@benchmark("cd_parse")
+def bench_cd_parse(payload, rows):
+    """`cd` format and order checks: vectorised parse plus the O(n) sortedness pass."""
+    cds = CadColumns.from_payload(payload)["cd"]
+    return lambda: first_unsorted(parse_cd_array(cds))
+
+
+@benchmark("cd_strptime")
+def bench_cd_strptime(payload, rows):
+    """Reference: the per-row `datetime.strptime` loop `cd_parse` replaced."""
+    cds = CadColumns.from_payload(payload)["cd"]
+    return lambda: [datetime.strptime(value, NASA_CLOSE_APPROACH_DATE_FORMAT) for value in cds]
+
+
+@benchmark("float_filter")
+def bench_float_filter(payload, rows):
+    """Float conversion and bound check of a numeric column, as in the filtering tests."""
+    fields, data = payload["fields"], payload["data"]
+    return lambda: CadColumns(fields, data).violations("dist", 0, 0.05)
+
+
+@benchmark("request_builder")
+def bench_request_builder(payload, rows):
+    """`rows` chained `AsteroidRequestBuilder(...).build()` calls."""
+    def build_all():
+        for _ in range(rows):
+            AsteroidRequestBuilder().with_date_range("2024-01-01", "2024-02-01").with_dist_range("0.01", "0.2") \
+                .with_h_max(22).with_v_inf_max(20).with_kind("a").with_fullname().with_diameter().build()
+    return build_all
+
+
+def run(selected, sizes, payload=None, samples=DEFAULT_SAMPLES):
+    """Results keyed by `case@rows` (see `benchmarks.harness.summarize`)."""
+    source = payload or synthetic_payload(max(sizes))
+    fns = {}
+    for rows in sizes:
+        sized = resized(source, rows)
+        for name in selected:
+            fns[f"{name}@{rows}"] = cases()[name](sized, rows)
+    results = {}
+    for key, timings in measure(fns, samples=samples).items():
+        results[key] = {"rows": int(key.rsplit("@", 1)[1]) if "@" in key else 0, **summarize(timings)}
+        print(f"{key:<34} {results[key]['median_s'] * 1000:10.3f} ms", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", nargs="+", choices=sorted(cases()), default=list(cases()))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="Rows per payload")
+    parser.add_argument("--payload", help="Recorded CAD response (JSON) to use instead of synthetic rows")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="Timed samples per case and size")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="Significance level of the U test")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative median slowdown tolerated even when significant")
+    args = parser.parse_args()
+
+    payload = load_payload(args.payload) if args.payload else None
+    results = run(args.cases, sorted(args.sizes), payload, args.samples)
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+
+    speed, rows = compare(load_baseline(args.baseline)["results"], results, args.alpha, args.threshold)
+    print(format_table(rows, speed))
+    regressed = [row["case"] for row in rows if row["verdict"] == "REGRESSED"]
+    if regressed:
+        print(f"\n{len(regressed)} significant regression(s): {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import json
+import math
+import os
+import platform
+import statistics
+import timeit
+from datetime import datetime
+
+DEFAULT_SAMPLES = 10
+DEFAULT_MIN_SAMPLE_TIME = 0.05  # seconds; fast cases are looped until one sample takes at least this long
+DEFAULT_ALPHA = 0.01
+DEFAULT_THRESHOLD = 0.10  # relative median change below which a significant difference is still noise
+
+CALIBRATION_KEY = "calibration"
+
+_cases = {}
+
+
+def benchmark(name):
+    """
+    Registers a benchmark case. The decorated function takes `(payload, rows)` and returns the zero-argument callable
+    to time; everything it does before returning (building inputs, warming caches) is not timed.
+    """
+    def register(setup):
+        _cases[name] = setup
+        return setup
+    return register
+
+
+def cases():
+    return dict(_cases)
+
+
+def calibration_workload():
+    """
+    Fixed pure-Python work timed with every run. Its median, baseline versus current, is the host speed factor
+    that current timings are scaled by before comparing, so a uniformly slower CI runner is not reported as a
+    regression of every case.
+    """
+    table = {}
+    for i in range(20_000):
+        table[i % 997] = table.get(i % 997, 0) + i * 3 // 7
+    return sorted(table.values())
+
+
+def calibrate(fn, min_sample_time=DEFAULT_MIN_SAMPLE_TIME):
+    """`(timer, loops)` such that one sample of `loops` calls takes at least `min_sample_time` (also warms `fn` up)."""
+    timer = timeit.Timer(fn)
+    loops, elapsed = 1, timer.timeit(1)
+    while elapsed < min_sample_time:
+        loops *= max(2, min(int(min_sample_time / max(elapsed, 1e-9)), 10))
+        elapsed = timer.timeit(loops)
+    return timer, loops
+
+
+def measure(fns, samples=DEFAULT_SAMPLES, min_sample_time=DEFAULT_MIN_SAMPLE_TIME):
+    """
+    Seconds per call for each of `samples` samples of every callable in `fns` (a dict), keyed like `fns`.
+
+    Samples are taken in rounds over all callables rather than case after case, so drift during the run (CPU clock
+    scaling, a noisy neighbour) lands in every case's spread instead of biasing whichever case ran at that moment.
+    """
+    fns = {CALIBRATION_KEY: calibration_workload, **fns}
+    timers = {key: calibrate(fn, min_sample_time) for key, fn in fns.items()}
+    results = {key: [] for key in fns}
+    for _ in range(samples):
+        for key, (timer, loops) in timers.items():
+            results[key].append(timer.timeit(loops) / loops)
+    return results
+
+
+def summarize(samples):
+    return {
+        "samples_s": samples,
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def mann_whitney_p(baseline, current):
+    """
+    One-sided Mann-Whitney U p-value for "`current` samples are larger than `baseline` ones" (normal approximation
+    with tie and continuity correction). Makes no normality assumption, which timing samples rarely meet.
+    """
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2:
+        return 1.0
+    combined = sorted([(value, 1) for value in current] + [(value, 0) for value in baseline])
+    rank_sum, ties, index = 0.0, 0.0, 0
+    while index < len(combined):
+        end = index
+        while end + 1 < len(combined) and combined[end + 1][0] == combined[index][0]:
+            end += 1
+        average_rank = (index + end) / 2 + 1
+        rank_sum += average_rank * sum(group for _, group in combined[index:end + 1])
+        size = end - index + 1
+        ties += size ** 3 - size
+        index = end + 1
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(baseline, current, alpha=DEFAULT_ALPHA, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares two result sets keyed by `case@rows`. A case regressed when it is slower with p < `alpha` and its
+    median grew by more than `threshold`; faster is judged the same way. Current samples are first scaled by the
+    host speed factor (see `calibration_workload`). Returns `(speed_factor, rows)`, one row per current case.
+    """
+    speed = host_speed_factor(baseline, current)
+    rows = []
+    for key, result in current.items():
+        if key == CALIBRATION_KEY:
+            continue
+        result = summarize([sample * speed for sample in result["samples_s"]])
+        before = baseline.get(key)
+        if before is None:
+            rows.append({"case": key, "baseline_ms": None, "current_ms": result["median_s"] * 1000,
+                         "ratio": None, "p_slower": None, "verdict": "new"})
+            continue
+        ratio = result["median_s"] / before["median_s"]
+        p_slower = mann_whitney_p(before["samples_s"], result["samples_s"])
+        p_faster = mann_whitney_p(result["samples_s"], before["samples_s"])
+        if p_slower < alpha and ratio > 1 + threshold:
+            verdict = "REGRESSED"
+        elif p_faster < alpha and ratio < 1 - threshold:
+            verdict = "faster"
+        else:
+            verdict = "same"
+        rows.append({"case": key, "baseline_ms": before["median_s"] * 1000, "current_ms": result["median_s"] * 1000,
+                     "ratio": ratio, "p_slower": p_slower, "verdict": verdict})
+    return speed, rows
+
+
+def host_speed_factor(baseline, current):
+    """How much faster this host ran the calibration workload than the baseline host did (1.0 when unknown)."""
+    if CALIBRATION_KEY not in baseline or CALIBRATION_KEY not in current:
+        return 1.0
+    return baseline[CALIBRATION_KEY]["median_s"] / current[CALIBRATION_KEY]["median_s"]
+
+
+def format_table(rows, speed=1.0):
+    header = f"{'case':<34} {'baseline ms':>12} {'current ms':>12} {'ratio':>7} {'p(slower)':>10}  verdict"
+    lines = [f"current timings scaled by host speed factor {speed:.3f}", header, "-" * len(header)]
+    for row in rows:
+        baseline = "-" if row["baseline_ms"] is None else f"{row['baseline_ms']:.3f}"
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}x"
+        p_slower = "-" if row["p_slower"] is None else f"{row['p_slower']:.4f}"
+        lines.append(f"{row['case']:<34} {baseline:>12} {row['current_ms']:>12.3f} {ratio:>7} {p_slower:>10}  "
+                     f"{row['verdict']}")
+    return "\n".join(lines)
+
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    document = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(document, file, indent=1)
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
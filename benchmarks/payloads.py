@@ -0,0 +1,33 @@
+import json
+import math
+from datetime import datetime, timedelta
+
+from modules.backend_tests.stand_in import CadDataset, run_query
+
+SYNTHETIC_ROWS_PER_DAY = 500
+SYNTHETIC_START = datetime(2024, 1, 1)
+SYNTHETIC_PARAMS = {"dist-max": "10", "diameter": "true", "fullname": "true"}
+
+
+def synthetic_payload(rows):
+    """A CAD response (`signature`, `count`, `fields`, `data`) of at least `rows` rows from the stand-in generator."""
+    days = max(math.ceil(rows / SYNTHETIC_ROWS_PER_DAY), 1) + 1
+    dataset = CadDataset.synthetic(SYNTHETIC_START, SYNTHETIC_START + timedelta(days=days),
+                                   rows_per_day=SYNTHETIC_ROWS_PER_DAY)
+    params = {**SYNTHETIC_PARAMS, "date-min": SYNTHETIC_START.strftime("%Y-%m-%d"), "date-max": f"+{days}"}
+    return json.loads(run_query(dataset, params, now=SYNTHETIC_START))
+
+
+def load_payload(path):
+    """A recorded CAD response saved as JSON (e.g. `curl '<cad.api url>' > payload.json`)."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def resized(payload, rows):
+    """Copy of `payload` with exactly `rows` data rows: truncated, or repeated when the recording is shorter."""
+    data = payload["data"]
+    if not data:
+        raise ValueError("Payload has no data rows to benchmark with")
+    repeated = data * math.ceil(rows / len(data)) if len(data) < rows else data
+    return {**payload, "count": type(payload.get("count", 0))(rows), "data": repeated[:rows]}
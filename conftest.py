@@ -1,11 +1,111 @@
 import pytest
 import logging
 import os
+import re
 import http.client as http_client
+from html import escape
 from faker import Faker
+from pytest_html import extras as html_extras
 from datetime import datetime
-from core import ROOT_WORKING_DIRECTORY, LOGS_FOLDER
-from modules.backend_tests import HelperAsteroidData, HelperThread
+from core import ROOT_WORKING_DIRECTORY, LOGS_FOLDER, CadModes, configure_transport, get_transport
+from core.cassette import Cassette, CASSETTES_FOLDER, DEFAULT_CASSETTE_NAME
+from core.transport import DEFAULT_POOL_SIZE, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from core.response_cache import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL, configure_response_cache, get_response_cache
+from core.response_store import (DEFAULT_STORE_TTL, DEFAULT_STORE_MAX_MB, STORE_FOLDER, configure_response_store,
+                                 get_response_store)
+from core.retry import (DEFAULT_RETRY_BUDGET, DEFAULT_BASE_DELAY, RETRY_BUDGET_FOLDER, configure_retry_engine,
+                        get_retry_engine)
+from core.rate_limiter import (DEFAULT_BURST, DEFAULT_BACKOFF, RATE_LIMIT_FOLDER, configure_rate_limiter,
+                               get_rate_limiter)
+from core.duration_history import DURATION_HISTORY_FILE
+from core.latency_budget import BUDGET_MODES, parse_budget_groups
+from core.log_pipeline import (DEFAULT_BODY_LIMIT, LOG_SEGMENTS_FOLDER, configure_log_pipeline, get_log_pipeline,
+                                level_for, merge_segments, parse_marker_levels, session_segments)
+from core.profiling import DEFAULT_TOP_FUNCTIONS, PROFILES_FOLDER
+from core.request_timing import CLIENT_PHASES, NETWORK_PHASES, PROPERTY_PREFIX, get_request_timer
+from modules.backend_tests import AsteroidAPIController, HelperAsteroidData, HelperThread
+from modules.backend_tests.plugins import (DurationHistoryPlugin, HotPathProfilerPlugin, LatencyBudgetPlugin,
+                                           PrefetchPlugin)
+from modules.backend_tests.plugins.duration_history import LPT_PLANS_FOLDER
+from modules.backend_tests.plugins.prefetch import DEFAULT_PREFETCH_CONCURRENCY
+from modules.backend_tests.stand_in import CadStandInServer, build_dataset
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("cad", "NASA CAD API client options")
+    group.addoption("--http-pool-size", type=int, default=DEFAULT_POOL_SIZE,
+                    help="Max keep-alive connections per host in the pooled HTTP transport.")
+    group.addoption("--http-connect-timeout", type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                    help="Connect timeout (seconds) for every CAD API request.")
+    group.addoption("--http-read-timeout", type=float, default=DEFAULT_READ_TIMEOUT,
+                    help="Read timeout (seconds) for every CAD API request.")
+    group.addoption("--http-no-keep-alive", action="store_true", default=False,
+                    help="Disable connection reuse (sends 'Connection: close' on every request).")
+    group.addoption("--response-cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                    help="Max responses kept in the in-process fetch_data cache (0 disables it).")
+    group.addoption("--response-cache-ttl", type=float, default=DEFAULT_CACHE_TTL,
+                    help="Seconds a cached fetch_data response stays valid.")
+    group.addoption("--response-store", action="store_true", default=False,
+                    help="Share fetched responses across xdist workers through an on-disk store.")
+    group.addoption("--response-store-ttl", type=float, default=DEFAULT_STORE_TTL,
+                    help="Seconds a stored response stays valid before it is re-fetched.")
+    group.addoption("--response-store-max-mb", type=int, default=DEFAULT_STORE_MAX_MB,
+                    help="Size cap of the on-disk response store; least recently used entries are evicted.")
+    group.addoption("--rate-limit", type=float, default=None,
+                    help="Requests per second allowed to the CAD API across all xdist workers (off by default).")
+    group.addoption("--rate-limit-burst", type=int, default=DEFAULT_BURST,
+                    help="Requests that may be sent back to back before --rate-limit pacing applies.")
+    group.addoption("--rate-limit-backoff", type=float, default=DEFAULT_BACKOFF,
+                    help="Seconds every worker pauses after a 429/503 without a Retry-After header.")
+    group.addoption("--retry-budget", type=int, default=DEFAULT_RETRY_BUDGET,
+                    help="Max transient-error retries of the whole session, all workers together (0 disables retries).")
+    group.addoption("--retry-base-delay", type=float, default=DEFAULT_BASE_DELAY,
+                    help="Base of the jittered exponential backoff between retries, in seconds.")
+    group.addoption("--latency-budget-mode", choices=BUDGET_MODES, default=BUDGET_MODES[0],
+                    help="fail: a test over its latency budget fails, warn: it passes with a LatencyBudgetWarning.")
+    parser.addini("latency_budgets", type="linelist", default=[],
+                  help="Per-marker latency budgets, one '<marker>: p50_ms=<ms> p95_ms=<ms> max_ms=<ms>' per line.")
+    group.addoption("--duration-history", default=os.path.join(ROOT_WORKING_DIRECTORY, LOGS_FOLDER,
+                                                                DURATION_HISTORY_FILE),
+                    help="SQLite file the duration, retries and requests of every test are recorded to.")
+    group.addoption("--lpt-schedule", action="store_true", default=False,
+                    help="With -n (--dist load), balance workers longest-processing-time-first from the duration "
+                         "history.")
+    group.addoption("--prefetch", action="store_true", default=False,
+                    help="Fetch the queries of @pytest.mark.cad_prefetch tests concurrently before the first test "
+                         "(under -n only together with --response-store).")
+    group.addoption("--prefetch-concurrency", type=int, default=DEFAULT_PREFETCH_CONCURRENCY,
+                    help="Prefetch requests in flight at once.")
+    group.addoption("--cad-log-level", type=str.upper, default="DEBUG",
+                    choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                    help="Level of pytest-logger and the urllib3/requests/http.client loggers.")
+    parser.addini("marker_log_levels", type="linelist", default=[],
+                  help="Per-marker log levels, one '<marker>: <LEVEL>' per line; a test with several configured "
+                       "markers logs at the most verbose of them.")
+    group.addoption("--log-body-limit", type=int, default=DEFAULT_BODY_LIMIT,
+                    help="Characters of a response body written to the log before it is cut.")
+    group.addoption("--profile-hotpaths", action="store_true", default=False,
+                    help="Profile every test call with cProfile: a .prof and a collapsed-stack file per test under "
+                         "output/profiles/<session>/ and the top cumulative functions at the end.")
+    group.addoption("--profile-memory", action="store_true", default=False,
+                    help="With --profile-hotpaths, also trace allocations (tracemalloc) and report peaks per test.")
+    group.addoption("--profile-top", type=int, default=DEFAULT_TOP_FUNCTIONS,
+                    help="Functions and tests listed in the --profile-hotpaths summary.")
+    group.addoption("--cad-mode", choices=[mode.value for mode in CadModes], default=CadModes.LIVE.value,
+                    help="live: hit the CAD API, record: hit it and save every response to the cassette, "
+                         "replay: serve responses from the cassette without any network access.")
+    group.addoption("--cad-cassette", default=os.path.join(ROOT_WORKING_DIRECTORY, CASSETTES_FOLDER,
+                                                           DEFAULT_CASSETTE_NAME),
+                    help="Cassette path (without extension) used by --cad-mode=record|replay.")
+    group.addoption("--cad-base-url", default=None,
+                    help="Override AsteroidAPIController.BASE_URL, e.g. to target a local stand-in server.")
+    group.addoption("--cad-stand-in", action="store_true", default=False,
+                    help="Start the local CAD stand-in server for this session and point the suite at it.")
+    group.addoption("--cad-stand-in-rate", type=float, default=50,
+                    help="Requests per second the stand-in serves before answering 503 (0 = unlimited).")
+    group.addoption("--cad-stand-in-snapshot", default=None,
+                    help="Serve the stand-in from a columnar snapshot directory (helpers/snapshot_downloader.py) or "
+                         "a saved JSON response instead of synthetic rows.")
 
 
 def pytest_configure(config):
@@ -30,49 +130,311 @@ def pytest_configure(config):
     else:
         log_file = os.environ["PYTEST_LOG_FILE"]  # all the other workers use the same file
 
-    logger = logging.getLogger("pytest-logger")
-    logger.setLevel(logging.DEBUG)
-
-    if not logger.handlers:
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
-        file_formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
-        file_handler.setFormatter(file_formatter)
-        file_handler.setLevel(logging.DEBUG)
-        logger.addHandler(file_handler)
-
-        console_handler = logging.StreamHandler()
-        console_formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
-        console_handler.setFormatter(console_formatter)
-        console_handler.setLevel(logging.DEBUG)
-        logger.addHandler(console_handler)
-
-        for ext_logger_name in ["urllib3", "requests", "http.client"]:
-            ext_logger = logging.getLogger(ext_logger_name)
-            ext_logger.setLevel(logging.DEBUG)
-            ext_logger.addHandler(file_handler)
-            ext_logger.propagate = False  # Avoid double logging
+    if not os.environ.get("PYTEST_SESSION_ID"):
+        os.environ["PYTEST_SESSION_ID"] = f"{os.path.splitext(os.path.basename(log_file))[0]}-{os.getpid()}"
 
+    # every process logs through a queue into its own segment; the controlling process merges them into log_file
+    if get_log_pipeline() is None:
+        worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        session = os.path.splitext(os.path.basename(log_file))[0]
+        configure_log_pipeline(
+            os.path.join(log_dir, LOG_SEGMENTS_FOLDER, f"{session}.{worker}.log"),
+            loggers=["pytest-logger"],
+            quiet=["urllib3", "requests", "http.client"],  # file only, as before
+            level=config.getoption("cad_log_level"),
+            body_limit=config.getoption("log_body_limit"),
+        )
+    config._cad_marker_log_levels = parse_marker_levels(config.getini("marker_log_levels"))
+
+    logger = logging.getLogger("pytest-logger")
     pytest.logger = logger
 
+    configure_transport(
+        pool_size=config.getoption("http_pool_size"),
+        connect_timeout=config.getoption("http_connect_timeout"),
+        read_timeout=config.getoption("http_read_timeout"),
+        keep_alive=not config.getoption("http_no_keep_alive"),
+    )
+    if not os.environ.get("PYTEST_RETRY_BUDGET_FILE"):
+        os.environ["PYTEST_RETRY_BUDGET_FILE"] = os.path.join(
+            log_dir, RETRY_BUDGET_FOLDER, f"{os.environ['PYTEST_SESSION_ID']}.retries"
+        )
+    retry_engine = configure_retry_engine(
+        budget_path=os.environ["PYTEST_RETRY_BUDGET_FILE"],
+        budget=config.getoption("retry_budget"),
+        base_delay=config.getoption("retry_base_delay"),
+    )
+    if not hasattr(config, "workerinput"):
+        retry_engine.shared_budget.reset()  # the budget is for the whole session, shared by every worker
+    configure_response_cache(
+        max_entries=config.getoption("response_cache_size"),
+        ttl=config.getoption("response_cache_ttl"),
+    )
+    if config.getoption("response_store"):
+        store = configure_response_store(
+            root=os.path.join(log_dir, STORE_FOLDER),
+            ttl=config.getoption("response_store_ttl"),
+            max_bytes=config.getoption("response_store_max_mb") * 1024 * 1024,
+        )
+        if not hasattr(config, "workerinput"):
+            store.evict()  # only the controlling process prunes, before any worker reads
+
+    if config.getoption("rate_limit"):
+        if not os.environ.get("PYTEST_RATE_LIMIT_FILE"):
+            os.environ["PYTEST_RATE_LIMIT_FILE"] = os.path.join(
+                log_dir, RATE_LIMIT_FOLDER, f"{os.environ['PYTEST_SESSION_ID']}.bucket"
+            )
+        limiter = configure_rate_limiter(
+            os.environ["PYTEST_RATE_LIMIT_FILE"],
+            rate=config.getoption("rate_limit"),
+            burst=config.getoption("rate_limit_burst"),
+            backoff=config.getoption("rate_limit_backoff"),
+        )
+        if not hasattr(config, "workerinput"):
+            limiter.reset()  # workers share the bucket file the controlling process created
+
+    if config.getoption("cad_stand_in") and not hasattr(config, "workerinput"):
+        # started once in the controlling process; workers inherit the URL through the environment
+        server = CadStandInServer(build_dataset(config.getoption("cad_stand_in_snapshot")),
+                                  rate=config.getoption("cad_stand_in_rate")).start()
+        config._cad_stand_in = server
+        os.environ["CAD_API_BASE_URL"] = server.base_url
+        logger.info(f"CAD stand-in serving {len(server.dataset)} rows on {server.base_url}")
+    base_url = config.getoption("cad_base_url") or os.environ.get("CAD_API_BASE_URL")
+    if base_url:
+        os.environ["CAD_API_BASE_URL"] = base_url
+        AsteroidAPIController.BASE_URL = base_url
+
+    cad_mode = CadModes(config.getoption("cad_mode"))
+    cassette = Cassette(config.getoption("cad_cassette")) if cad_mode != CadModes.LIVE else None
+    if cad_mode == CadModes.RECORD and not hasattr(config, "workerinput"):
+        cassette.reset()
+    AsteroidAPIController.use_cassette(cad_mode, cassette)
+
+    if config.getoption("lpt_schedule") and config.getoption("dist") == "load" and not hasattr(config, "workerinput"):
+        # workers re-parse the command line, so they learn it from here
+        os.environ["PYTEST_LPT_PLAN_FILE"] = os.path.join(log_dir, LPT_PLANS_FOLDER,
+                                                          f"{os.environ['PYTEST_SESSION_ID']}.json")
+    config.pluginmanager.register(
+        DurationHistoryPlugin(
+            config, config.getoption("duration_history"),
+            record=cad_mode != CadModes.REPLAY,  # replayed runs say nothing about live durations
+            plan_path=os.environ.get("PYTEST_LPT_PLAN_FILE"),
+        ),
+        DurationHistoryPlugin.name,
+    )
+
     # register a custom marker: flaky + regression
     config.addinivalue_line("markers", "flaky_regression: Combines regression + flaky retry for unstable tests")
     setattr(pytest.mark, "flaky_regression",
             pytest.mark.regression(pytest.mark.flaky(reruns=3, reruns_delay=1)))
 
+    # per-request latency SLOs: @pytest.mark.latency_budget and the per-marker `latency_budgets` ini groups
+    # profiling slows every request down (tracemalloc also traces an in-process stand-in), so budgets only warn
+    budget_mode = "warn" if config.getoption("profile_hotpaths") else config.getoption("latency_budget_mode")
+    config.pluginmanager.register(
+        LatencyBudgetPlugin(parse_budget_groups(config.getini("latency_budgets")), budget_mode),
+        LatencyBudgetPlugin.name,
+    )
+
+    if config.getoption("profile_hotpaths"):
+        config.pluginmanager.register(
+            HotPathProfilerPlugin(config, os.path.join(log_dir, PROFILES_FOLDER, os.environ["PYTEST_SESSION_ID"]),
+                                  memory=config.getoption("profile_memory"), top=config.getoption("profile_top")),
+            HotPathProfilerPlugin.name,
+        )
+
+    # collection-time prefetch of the queries declared with @pytest.mark.cad_prefetch; a replay needs no warming
+    if config.getoption("prefetch") and cad_mode != CadModes.REPLAY:
+        config.pluginmanager.register(PrefetchPlugin(config, config.getoption("prefetch_concurrency")),
+                                      PrefetchPlugin.name)
 
+
+def pytest_runtest_setup(item):
+    """
+    Sets the log level of the test from `marker_log_levels`.
+    Turns off helper-level retries while pytest-rerunfailures re-runs a test, so one failure is retried by the
+    rerun or by the retry engine, not by both multiplied.
+    """
+    get_retry_engine().in_rerun = getattr(item, "execution_count", 1) > 1
+    get_log_pipeline().set_level(level_for({marker.name for marker in item.iter_markers()},
+                                           item.config._cad_marker_log_levels, item.config.getoption("cad_log_level")))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    """Restores `--cad-log-level` once the test's fixtures are torn down, so session-level logging keeps it."""
+    yield
+    get_log_pipeline().set_level(item.config.getoption("cad_log_level"))
+
+
+MAX_TIMING_ROWS = 50  # per-request rows in the HTML details; load tests send hundreds
+
+
+@pytest.hookimpl(hookwrapper=True)
 def pytest_runtest_call(item):
     """
     Hook to log test docstrings before execution.
+    Collects the timing breakdown of every CAD request the test sends and attaches the totals as `cad_*` user
+    properties, which pytest writes as `<property>` entries into the JUnit XML report (once per test, reruns included).
     """
     test_docstring = item.function.__doc__
     if test_docstring:
         pytest.logger.info(f"\nRunning Test: {item.name}\n{test_docstring.strip()}\n")
+    timer = get_request_timer()
+    timer.begin()
+    retries = get_retry_engine().retries
+    yield
+    summary = {**timer.summary(), "retries": get_retry_engine().retries - retries}
+    # a rerun calls the same item again: its properties replace those of the failed run
+    names = {f"{PROPERTY_PREFIX}{key}" for key in summary}
+    item.user_properties[:] = [(name, value) for name, value in item.user_properties if name not in names]
+    if summary["requests"] or summary["decode_s"] or summary["validate_s"]:
+        item.user_properties.extend((f"{PROPERTY_PREFIX}{key}", value) for key, value in summary.items())
+        item._cad_request_timings = timer.timings()
+    item._cad_fingerprints = sorted(timer.fingerprints)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Adds the per-request timing table of the call phase to the pytest-html report details, and the request
+    fingerprints of the test to the report (read by the duration history in the controlling process).
+    """
+    outcome = yield
+    if call.when != "call":
+        return
+    report = outcome.get_result()
+    report.cad_fingerprints = getattr(item, "_cad_fingerprints", [])
+    timings = getattr(item, "_cad_request_timings", None)
+    if timings is None:
+        return
+    details = _timings_html(timings, _request_timing_properties(report), report.duration)
+    report.extras = getattr(report, "extras", []) + [html_extras.html(details)]
+
+
+def _request_timing_properties(report):
+    return {name[len(PROPERTY_PREFIX):]: value for name, value in getattr(report, "user_properties", [])
+            if isinstance(name, str) and name.startswith(PROPERTY_PREFIX)}
+
+
+def _timings_html(timings, totals, duration):
+    phases = NETWORK_PHASES + CLIENT_PHASES
+    header = "".join(f"<th>{phase} (ms)</th>" for phase in phases)
+    rows = []
+    for timing in timings[:MAX_TIMING_ROWS]:
+        values = [getattr(timing, phase) for phase in phases]
+        cells = "".join("<td>-</td>" if value is None else f"<td>{value * 1000:.1f}</td>" for value in values)
+        size = "-" if timing.size_bytes is None else f"{timing.size_bytes:,}"
+        rows.append(f"<tr><td>{timing.status_code}</td><td>{escape(timing.url)}</td>{cells}<td>{size}</td></tr>")
+    spent = totals["network_s"] + totals["decode_s"] + totals["validate_s"]
+    more = f" (first {MAX_TIMING_ROWS} shown)" if len(timings) > MAX_TIMING_ROWS else ""
+    return (f"<div><p>CAD requests: {len(timings)}{more} | in requests, decoding and validation: {spent:.3f} s | "
+            f"rest of the test (assertions, logging, retry sleeps): {max(duration - spent, 0.0):.3f} s</p>"
+            f"<table><tr><th>status</th><th>url</th>{header}<th>bytes</th></tr>{''.join(rows)}</table></div>")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_table_header(cells):
+    cells.insert(2, "<th>CAD requests</th>")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_table_row(report, cells):
+    """`requests: network / client seconds`, so a slow API is told apart from slow client-side work."""
+    timing = _request_timing_properties(report)
+    text = (f"{timing['requests']}: {timing['network_s']:.3f} s / {timing['decode_s'] + timing['validate_s']:.3f} s"
+            if timing else "")
+    cells.insert(2, f"<td>{text}</td>")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """
+    Logs connection reuse stats of this process' pooled transport and response cache, then drains its log queue.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    stats = get_transport().stats()
+    if stats["requests"]:
+        pytest.logger.info(f"[{worker}] HTTP transport stats: {stats}")
+    cache_stats = get_response_cache().stats()
+    if cache_stats["hits"] or cache_stats["misses"]:
+        pytest.logger.info(f"[{worker}] Response cache stats: {cache_stats}")
+    retry_stats = get_retry_engine().stats()
+    if retry_stats["retries"] or retry_stats["budget_exhausted"]:
+        pytest.logger.info(f"[{worker}] Retry engine stats: {retry_stats}")
+    limiter = get_rate_limiter()
+    if limiter is not None and limiter.acquired:
+        pytest.logger.info(f"[{worker}] Rate limiter stats: {limiter.stats()}")
+    store = get_response_store()
+    if store is not None:
+        store.dump_stats(os.environ["PYTEST_SESSION_ID"], worker)
+    get_log_pipeline().drain()  # a worker's segment is complete before it reports back to the controlling process
+
+
+def pytest_unconfigure(config):
+    server = getattr(config, "_cad_stand_in", None)
+    if server is not None:
+        server.stop()
+    if not hasattr(config, "workerinput"):
+        budget = get_retry_engine().shared_budget
+        if budget is not None:
+            budget.close()
+            os.remove(budget.path)
+        limiter = get_rate_limiter()
+        if limiter is not None:
+            limiter.close()
+            os.remove(limiter.path)
+    pipeline = get_log_pipeline()
+    if pipeline is not None and not hasattr(config, "workerinput"):
+        pipeline.close()
+        log_file = os.environ["PYTEST_LOG_FILE"]
+        merge_segments(log_file, session_segments(os.path.dirname(pipeline.segment),
+                                                  os.path.splitext(os.path.basename(log_file))[0]))
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """
+    Prints the hit-rate of the shared response store and the time spent rate-limited, aggregated over all workers.
+    """
+    if hasattr(config, "workerinput"):
+        return
+    limiter = get_rate_limiter()
+    if limiter is not None:
+        stats = limiter.stats()
+        terminalreporter.write_sep("-", "rate limiter")
+        terminalreporter.write_line(
+            f"throttled: {stats['session_throttled_s']:.1f} s | back-offs on 429/503: {stats['session_backoffs']} | "
+            f"rate at end: {stats['current_rate']} rps"
+        )
+    store = get_response_store()
+    if store is None:
+        return
+    summary = store.session_summary(os.environ["PYTEST_SESSION_ID"])
+    terminalreporter.write_sep("-", "response store")
+    terminalreporter.write_line(
+        f"hits: {summary['hits']} | waited on another worker: {summary['waited']} | "
+        f"fetched: {summary['misses']} | hit rate: {summary['hit_rate']:.1%}"
+    )
 
 
 def pytest_collection_modifyitems(session, config, items):
     """
-    Ensures that smoke tests run first in any test run.
+    Ensures that smoke tests run first in any test run (with --lpt-schedule: first within each worker's group).
+    Performance tests are skipped in replay mode, since a cassette cannot reproduce load behaviour.
+    Capacity discovery runs only when selected explicitly with `-m capacity`.
     """
+    if AsteroidAPIController.mode == CadModes.REPLAY:
+        skip_replay = pytest.mark.skip(reason="performance tests need the live API (--cad-mode=replay)")
+        for item in items:
+            if "performance" in item.keywords:
+                item.add_marker(skip_replay)
+
+    if not re.search(r"\bcapacity\b", config.getoption("markexpr") or ""):
+        skip_capacity = pytest.mark.skip(reason="capacity discovery runs on demand (-m capacity)")
+        for item in items:
+            if "capacity" in item.keywords:
+                item.add_marker(skip_capacity)
+
     smoke_tests = [item for item in items if "smoke" in item.keywords]
     other_tests = [item for item in items if "smoke" not in item.keywords]
 
@@ -91,5 +453,9 @@ def helper_thread():
 
 
 @pytest.fixture
-def faker_fixture():
-    return Faker()
+def faker_fixture(request):
+    fake = Faker()
+    if AsteroidAPIController.mode != CadModes.LIVE:
+        # recorded and replayed runs must generate the same "random" params to hit the same cassette entries
+        fake.seed_instance(request.node.nodeid)
+    return fake
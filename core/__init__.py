@@ -1,3 +1,4 @@
 from core.retry import retry
 from core.constants import *
+from core.transport import HttpTransport, configure_transport, get_transport
 from core.request_builder import get_request
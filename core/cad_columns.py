@@ -0,0 +1,73 @@
+import numpy as np
+
+from core.constants import AsteroidDataFields, ResponseKeys
+
+FIELDS_KEY = "fields"
+NUMERIC_FIELDS = frozenset({"jd", "dist", "dist_min", "dist_max", "v_rel", "v_inf", "h", "diameter", "diameter_sigma"})
+DEFAULT_FIELDS = [field.name.lower() for field in AsteroidDataFields]
+DEFAULT_FIELDS[AsteroidDataFields.ORB] = "orbit_id"
+
+
+class CadColumns:
+    """
+    Column-oriented view of a CAD `fields`/`data` payload.
+
+    Each column is extracted and converted once, on first access, to a float64 array (numeric fields, `null` becomes
+    NaN) or a NumPy string array (`des`, `cd`, ...), so bound checks run over whole columns and report every offending
+    row instead of calling `float()` per row and stopping at the first failure.
+    """
+    def __init__(self, fields, data, offset=0):
+        self.fields = list(fields)
+        self.offset = offset  # index of the first row in the full response, for batches of a stream
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        self.data = data
+        self._columns = {}
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Builds the columns from a decoded response, using its `fields` list (or the default CAD layout)."""
+        return cls(payload.get(FIELDS_KEY) or DEFAULT_FIELDS, payload.get(ResponseKeys.DATA.value) or [])
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __getitem__(self, name):
+        column = self._columns.get(name)
+        if column is None:
+            position = self._index[name]
+            raw = [row[position] for row in self.data]
+            if name in NUMERIC_FIELDS:
+                column = np.array(raw, dtype=np.float64)
+            else:
+                column = np.array(["" if value is None else value for value in raw], dtype=np.str_)
+            self._columns[name] = column
+        return column
+
+    def row(self, index):
+        return dict(zip(self.fields, self.data[index]))
+
+    def violations(self, name, lower=None, upper=None):
+        """
+        Indices of rows whose `name` value is below `lower` or above `upper` (both inclusive bounds).
+        Missing or unparsable values (NaN) count as violations whenever a bound is given.
+        """
+        values = self[name]
+        within = np.ones(len(values), dtype=bool)
+        if lower is not None:
+            within &= values >= float(lower)
+        if upper is not None:
+            within &= values <= float(upper)
+        return np.flatnonzero(~within)
+
+    def describe(self, indices, name, limit=5):
+        """Readable summary of the first `limit` offending rows (numbered from `offset`), for assertion messages."""
+        position, des = self._index[name], self._index.get("des")
+        shown = ", ".join(
+            f"row {self.offset + i} ({'?' if des is None else self.data[i][des]}: {name}={self.data[i][position]})"
+            for i in indices[:limit]
+        )
+        more = f" and {len(indices) - limit} more" if len(indices) > limit else ""
+        return f"{len(indices)} of {len(self)} rows out of bounds for {name}: {shown}{more}"
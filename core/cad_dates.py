@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from core.constants import NASA_CLOSE_APPROACH_DATE_FORMAT
+
+UNIX_EPOCH_JD = 2440587.5
+MONTH_ABBREVIATIONS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+MONTHS = {abbreviation: number for number, abbreviation in enumerate(MONTH_ABBREVIATIONS, start=1)}
+
+# fixed `YYYY-Mon-DD HH:MM` layout: separator positions and the digit positions of each component
+CD_LENGTH = 17
+_SEPARATORS = {4: "-", 8: "-", 11: " ", 14: ":"}
+_DIGITS = [0, 1, 2, 3, 9, 10, 12, 13, 15, 16]
+_MONTH_KEYS = np.array([sum(ord(char) << (8 * i) for i, char in enumerate(name)) for name in MONTH_ABBREVIATIONS])
+_MONTH_ORDER = np.argsort(_MONTH_KEYS)
+
+
+def _format_error(value):
+    return ValueError(f"time data {value!r} does not match format {NASA_CLOSE_APPROACH_DATE_FORMAT!r}")
+
+
+def parse_cd(value):
+    """
+    Parses a CAD close-approach date (`2025-Jan-01 13:45`) by fixed positions and a month table, without strptime's
+    locale and regex machinery. Raises `ValueError` like `datetime.strptime` for anything else.
+    """
+    if not isinstance(value, str) or len(value) != CD_LENGTH \
+            or any(value[position] != separator for position, separator in _SEPARATORS.items()) \
+            or not all(value[position].isascii() and value[position].isdigit() for position in _DIGITS):
+        raise _format_error(value)
+    month = MONTHS.get(value[5:8])
+    if month is None:
+        raise _format_error(value)
+    try:
+        return datetime(int(value[0:4]), month, int(value[9:11]), int(value[12:14]), int(value[15:17]))
+    except ValueError:
+        raise _format_error(value) from None
+
+
+def parse_cd_array(values):
+    """
+    Vectorised `parse_cd`: returns a `datetime64[m]` array for a sequence of CAD dates.
+
+    The strings are viewed as a `(rows, 17)` matrix of code points and every component is computed column-wise.
+    Raises `ValueError` naming the first malformed row (wrong layout, unknown month, impossible day or time).
+    """
+    strings = np.asarray(values, dtype=np.str_)
+    if not strings.size:
+        return np.array([], dtype="datetime64[m]")
+    lengths = np.char.str_len(strings)
+    valid = lengths == CD_LENGTH
+    chars = np.zeros((strings.size, CD_LENGTH), dtype=np.int64)
+    width = min(strings.dtype.itemsize // 4, CD_LENGTH)
+    chars[:, :width] = strings.astype(f"U{width}").view(np.uint32).reshape(-1, width)
+
+    for position, separator in _SEPARATORS.items():
+        valid &= chars[:, position] == ord(separator)
+    digits = chars[:, _DIGITS] - ord("0")
+    valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+
+    month_keys = chars[:, 5] | (chars[:, 6] << 8) | (chars[:, 7] << 16)
+    slots = np.searchsorted(_MONTH_KEYS[_MONTH_ORDER], month_keys).clip(0, len(MONTH_ABBREVIATIONS) - 1)
+    months = _MONTH_ORDER[slots]
+    valid &= _MONTH_KEYS[months] == month_keys
+
+    years = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    days = digits[:, 4] * 10 + digits[:, 5]
+    hours = digits[:, 6] * 10 + digits[:, 7]
+    minutes = digits[:, 8] * 10 + digits[:, 9]
+    month_start = (years - 1970) * 12 + months
+    next_month_start = month_start + 1
+    days_in_month = (next_month_start.astype("datetime64[M]").astype("datetime64[D]")
+                     - month_start.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64)
+    valid &= (years >= 1) & (days >= 1) & (days <= days_in_month) & (hours <= 23) & (minutes <= 59)
+
+    if not valid.all():
+        index = int(np.flatnonzero(~valid)[0])
+        raise ValueError(f"row {index}: {_format_error(values[index])}")
+
+    dates = month_start.astype("datetime64[M]").astype("datetime64[m]")
+    return dates + ((days - 1) * 1440 + hours * 60 + minutes).astype("timedelta64[m]")
+
+
+def first_unsorted(values):
+    """Index of the first element smaller than its predecessor (None when ascending), in one O(n) pass."""
+    values = np.asarray(values)
+    decreasing = np.flatnonzero(values[1:] < values[:-1])
+    return int(decreasing[0]) + 1 if decreasing.size else None
+
+
+def datetime_to_jd(value):
+    return UNIX_EPOCH_JD + value.replace(tzinfo=timezone.utc).timestamp() / 86400.0
+
+
+def jd_to_datetime(jd):
+    return datetime.fromtimestamp((jd - UNIX_EPOCH_JD) * 86400.0, tz=timezone.utc).replace(tzinfo=None)
+
+
+def jd_range_violations(jd, start, end, tolerance_minutes=1.0):
+    """
+    Indices of `jd` values outside `[start, end]` (datetimes). `cd` is `jd` rounded to the minute, so the bounds are
+    widened by `tolerance_minutes` to accept the rows the API selected by their rounded date.
+    """
+    jd = np.asarray(jd, dtype=np.float64)
+    tolerance = tolerance_minutes / 1440.0
+    return np.flatnonzero((jd < datetime_to_jd(start) - tolerance) | (jd > datetime_to_jd(end) + tolerance))
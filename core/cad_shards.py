@@ -0,0 +1,56 @@
+import heapq
+import math
+from datetime import datetime, timedelta
+
+from core.constants import DATE_FORMAT_ISO
+
+DATE_MIN_PARAM = "date-min"
+DATE_MAX_PARAM = "date-max"
+
+
+def parse_window_date(value):
+    """Absolute `YYYY-MM-DD` bound of a date window; relative CAD dates (`now`, `+60`) cannot be sharded."""
+    try:
+        return datetime.strptime(value, DATE_FORMAT_ISO)
+    except (TypeError, ValueError):
+        raise ValueError(f"Date windows need absolute {DATE_FORMAT_ISO} bounds, got {value!r}") from None
+
+
+def window_params(params, start, end):
+    """Copy of `params` restricted to `[start, end]`."""
+    return {**params, DATE_MIN_PARAM: start.strftime(DATE_FORMAT_ISO), DATE_MAX_PARAM: end.strftime(DATE_FORMAT_ISO)}
+
+
+def split_date_range(start, end, shards):
+    """
+    Splits `[start, end]` into at most `shards` consecutive whole-day windows.
+    Neighbouring windows share their boundary date (CAD bounds are inclusive), so rows exactly on a boundary can be
+    returned twice; `merge_by_jd` drops those duplicates.
+    """
+    days = max((end - start).days, 1)
+    window_days = max(math.ceil(days / max(shards, 1)), 1)
+    windows, cursor = [], start
+    while True:
+        window_end = min(cursor + timedelta(days=window_days), end)
+        windows.append((cursor, window_end))
+        if window_end >= end:
+            return windows
+        cursor = window_end
+
+
+def merge_by_jd(fields, windows):
+    """
+    k-way heap merge of per-window `data` arrays (each already sorted by `jd`) into one `jd`-ordered stream,
+    skipping repeats of the same (`des`, `orbit_id`, `jd`) row. Duplicates share a `jd`, so only the keys seen at the
+    current `jd` are remembered.
+    """
+    jd_index, des_index, orbit_index = fields.index("jd"), fields.index("des"), fields.index("orbit_id")
+    current_jd, seen = None, set()
+    for row in heapq.merge(*windows, key=lambda row: float(row[jd_index])):
+        if row[jd_index] != current_jd:
+            current_jd, seen = row[jd_index], set()
+        key = (row[des_index], row[orbit_index])
+        if key in seen:
+            continue
+        seen.add(key)
+        yield row
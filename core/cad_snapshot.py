@@ -0,0 +1,231 @@
+import json
+import math
+import os
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from core.cad_columns import CadColumns
+
+SNAPSHOT_VERSION = 1
+SNAPSHOTS_FOLDER = "snapshots"
+NUMERIC_COLUMNS = ("jd", "dist", "dist_min", "dist_max", "v_rel", "v_inf", "h", "diameter", "diameter_sigma")
+STRING_COLUMNS = ("des", "orbit_id", "cd", "t_sigma_f", "fullname")
+NULL_STRING = 0xFFFFFFFF  # string code of a missing value
+
+_NUMERIC_DTYPE = np.dtype("<f8")
+_CODE_DTYPE = np.dtype("<u4")
+_OFFSET_DTYPE = np.dtype("<u8")
+# designation hash index slot: string code of the designation, and its rows in `des.rows`
+_SLOT_DTYPE = np.dtype([("code", "<u4"), ("count", "<u4"), ("start", "<u8")])
+
+_MANIFEST = "manifest.json"
+_STRING_DATA = "strings.bin"
+_STRING_OFFSETS = "strings.off"
+_DES_SLOTS = "des.hash"
+_DES_ROWS = "des.rows"
+
+
+def _column_file(name):
+    return f"{name}.col"
+
+
+def designation_hash(des):
+    """Stable across processes and Python versions, unlike `hash()`."""
+    return zlib.crc32(des.encode("utf-8"))
+
+
+class SnapshotWriter:
+    """
+    Writes CAD rows, in `jd` order, into a snapshot directory opened later with `CadSnapshot`.
+
+    Every column goes to its own little-endian file as it arrives, so a download of any size never sits in memory:
+    numeric columns as float64 (`null` is NaN), string columns as uint32 codes into one shared string table.
+    Designations, orbit ids, `t_sigma_f` and full names are interned for the whole snapshot; `cd` values only within
+    one `append` call, since equal dates are adjacent in `jd` order and a global table would hold every row's date.
+    The manifest is written last by `close`, so a directory without one is an unfinished download.
+    """
+    def __init__(self, path, source=None):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.source = source
+        self.rows = 0
+        self.last_jd = -math.inf
+        self._columns = {name: open(os.path.join(path, _column_file(name)), "wb")
+                         for name in NUMERIC_COLUMNS + STRING_COLUMNS}
+        self._strings = open(os.path.join(path, _STRING_DATA), "wb")
+        self._offsets = open(os.path.join(path, _STRING_OFFSETS), "wb")
+        self._offsets.write(np.zeros(1, dtype=_OFFSET_DTYPE).tobytes())
+        self._string_count = 0
+        self._string_bytes = 0
+        self._interned = {}
+
+    def _code(self, value, table):
+        if value is None:
+            return NULL_STRING
+        code = table.get(value)
+        if code is None:
+            encoded = value.encode("utf-8")
+            self._strings.write(encoded)
+            self._string_bytes += len(encoded)
+            self._offsets.write(np.array([self._string_bytes], dtype=_OFFSET_DTYPE).tobytes())
+            code = table[value] = self._string_count
+            self._string_count += 1
+        return code
+
+    def append(self, fields, data):
+        """Appends `data` rows of a CAD response with layout `fields`; they must continue the `jd` order."""
+        if not data:
+            return
+        columns = CadColumns(fields, data)
+        jd = columns["jd"]
+        if jd[0] < self.last_jd or np.any(np.diff(jd) < 0):
+            raise ValueError("Snapshot rows must be appended in jd order")
+        for name in NUMERIC_COLUMNS:
+            values = columns[name] if name in columns else np.full(len(data), np.nan)
+            self._columns[name].write(values.astype(_NUMERIC_DTYPE).tobytes())
+        dates = {}
+        for name in STRING_COLUMNS:
+            table = dates if name == "cd" else self._interned.setdefault(name, {})
+            position = fields.index(name) if name in fields else None
+            codes = np.fromiter((NULL_STRING if position is None else self._code(row[position], table)
+                                 for row in data), dtype=_CODE_DTYPE, count=len(data))
+            self._columns[name].write(codes.tobytes())
+        self.rows += len(data)
+        self.last_jd = float(jd[-1])
+
+    def close(self):
+        for file in (*self._columns.values(), self._strings, self._offsets):
+            file.close()
+        self._write_designation_index()
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "rows": self.rows,
+            "strings": self._string_count,
+            "numeric_columns": list(NUMERIC_COLUMNS),
+            "string_columns": list(STRING_COLUMNS),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "source": self.source,
+        }
+        temporary = os.path.join(self.path, f"{_MANIFEST}.tmp")
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=1)
+        os.replace(temporary, os.path.join(self.path, _MANIFEST))
+
+    def _write_designation_index(self):
+        """
+        Open-addressing hash table (linear probing, at most half full) from a designation to the slice of `des.rows`
+        listing its rows in `jd` order. Rows without a designation (`NULL_STRING`, e.g. no `des` field) are not
+        indexed.
+        """
+        codes = np.fromfile(os.path.join(self.path, _column_file("des")), dtype=_CODE_DTYPE)
+        order = np.argsort(codes, kind="stable").astype("<u8")
+        unique, starts, counts = np.unique(codes[order], return_index=True, return_counts=True)
+        indexed = unique != NULL_STRING
+        unique, starts, counts = unique[indexed], starts[indexed], counts[indexed]
+        slots = np.zeros(1 << max(math.ceil(math.log2(max(len(unique), 1) * 2)), 1), dtype=_SLOT_DTYPE)
+        slots["code"] = NULL_STRING
+        mask = len(slots) - 1
+        designations = {code: des for des, code in self._interned.get("des", {}).items()}
+        for code, start, count in zip(unique.tolist(), starts.tolist(), counts.tolist()):
+            index = designation_hash(designations[code]) & mask
+            while slots[index]["code"] != NULL_STRING:
+                index = (index + 1) & mask
+            slots[index] = (code, count, start)
+        order.tofile(os.path.join(self.path, _DES_ROWS))
+        slots.tofile(os.path.join(self.path, _DES_SLOTS))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            for file in (*self._columns.values(), self._strings, self._offsets):
+                file.close()
+
+
+class CadSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot directory written by `SnapshotWriter`.
+
+    Opening reads only the manifest; every column, the string table and the indexes are mapped on first use and
+    paged in by the OS as they are touched, so tens of millions of rows cost no load time and little RAM. Rows are
+    stored in `jd` order, so the `jd` column itself is the range index (`jd_range` is two binary searches), and
+    `rows_for` looks a designation up in the hash index.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, _MANIFEST), encoding="utf-8") as file:
+            self.manifest = json.load(file)
+        if self.manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {self.manifest.get('version')!r} in {path}")
+        self.rows = self.manifest["rows"]
+        self._maps = {}
+
+    def __len__(self):
+        return self.rows
+
+    def _map(self, filename, dtype, length):
+        mapped = self._maps.get(filename)
+        if mapped is None:
+            # np.memmap refuses empty files
+            mapped = np.memmap(os.path.join(self.path, filename), dtype=dtype, mode="r", shape=(length,)) \
+                if length else np.empty(0, dtype=dtype)
+            self._maps[filename] = mapped
+        return mapped
+
+    def column(self, name):
+        """float64 values of a numeric column or uint32 string codes of a string column, memory-mapped."""
+        if name in NUMERIC_COLUMNS:
+            return self._map(_column_file(name), _NUMERIC_DTYPE, self.rows)
+        if name in STRING_COLUMNS:
+            return self._map(_column_file(name), _CODE_DTYPE, self.rows)
+        raise KeyError(name)
+
+    def string(self, code):
+        """The interned string of `code` (None for `NULL_STRING`)."""
+        if code == NULL_STRING:
+            return None
+        offsets = self._map(_STRING_OFFSETS, _OFFSET_DTYPE, self.manifest["strings"] + 1)
+        start, end = int(offsets[code]), int(offsets[code + 1])
+        return bytes(self._map(_STRING_DATA, np.uint8, int(offsets[-1]))[start:end]).decode("utf-8")
+
+    def strings(self, name, indices):
+        codes = self.column(name)
+        return [self.string(int(codes[index])) for index in indices]
+
+    def jd_range(self, jd_min, jd_max):
+        """The `slice` of rows with `jd_min <= jd <= jd_max`."""
+        jd = self.column("jd")
+        return slice(int(np.searchsorted(jd, jd_min, side="left")), int(np.searchsorted(jd, jd_max, side="right")))
+
+    def rows_for(self, des):
+        """Row indices of designation `des`, in `jd` order (empty when it is not in the snapshot)."""
+        slots = self._map(_DES_SLOTS, _SLOT_DTYPE, os.path.getsize(os.path.join(self.path, _DES_SLOTS))
+                          // _SLOT_DTYPE.itemsize)
+        mask = len(slots) - 1
+        index = designation_hash(des) & mask
+        while True:
+            code, count, start = slots[index]
+            if code == NULL_STRING:
+                return np.empty(0, dtype="<u8")
+            if self.string(int(code)) == des:
+                return self._map(_DES_ROWS, "<u8", self.rows)[int(start):int(start) + int(count)]
+            index = (index + 1) & mask
+
+    def row(self, index):
+        """One row as a dict, with the CAD field names."""
+        values = {}
+        for name in NUMERIC_COLUMNS:
+            value = float(self.column(name)[index])
+            values[name] = None if math.isnan(value) else value
+        for name in STRING_COLUMNS:
+            values[name] = self.string(int(self.column(name)[index]))
+        return values
+
+    def close(self):
+        """Drops the mappings; the files stay open until the arrays are garbage-collected."""
+        self._maps.clear()
@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, List, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from core.constants import CadEntry
+from core.request_timing import get_request_timer
+
+DEFAULT_MAX_FAILING_ROWS = 5
+
+
+@dataclass
+class RowFailure:
+    """One `CadEntry` violation: the row index in `data`, the field name, pydantic's message and the bad value."""
+    row: int
+    field: str
+    message: str
+    value: Any = None
+
+    def __str__(self):
+        return f"row {self.row}: {self.field} = {self.value!r} ({self.message})"
+
+
+@lru_cache(maxsize=32)
+def _rows_adapter(fields):
+    """
+    `TypeAdapter(List[Tuple[...]])` with each position typed as the matching `CadEntry` field, so a whole `data`
+    array is validated by pydantic-core in one call without building a dict per row. Unknown fields are `Any`.
+    """
+    annotations = tuple(CadEntry.model_fields[name].annotation if name in CadEntry.model_fields else Any
+                        for name in fields)
+    return TypeAdapter(List[Tuple[annotations]])
+
+
+@lru_cache(maxsize=32)
+def _has_required_fields(fields):
+    """Whether `fields` names every required `CadEntry` field; the batched check cannot see a missing column."""
+    return all(name in fields for name, field in CadEntry.model_fields.items() if field.is_required())
+
+
+def validate_cad_rows(fields, data, max_rows=DEFAULT_MAX_FAILING_ROWS):
+    """
+    Validates every row of a CAD `data` array against the `CadEntry` contract in one batched call.
+
+    Returns a `RowFailure` per invalid field of the first `max_rows` failing rows (empty when all rows are valid).
+    Rows rejected by the batched check are re-checked with `CadEntry.model_validate(dict(zip(fields, row)))`, so the
+    verdict and messages are exactly those of the per-row path (e.g. missing required fields, extra trailing values).
+    When `fields` lacks a required `CadEntry` field, every row is checked on the per-row path.
+    """
+    fields = tuple(fields)
+    if not _has_required_fields(fields):
+        suspect_rows = range(len(data))
+    else:
+        try:
+            with get_request_timer().phase("validate"):
+                _rows_adapter(fields).validate_python(data)
+            return []
+        except ValidationError as e:
+            suspect_rows = sorted({error["loc"][0] for error in e.errors() if error["loc"]})
+
+    failures, failing_rows = [], 0
+    for index in suspect_rows:
+        try:
+            CadEntry.model_validate(dict(zip(fields, data[index])))
+        except ValidationError as e:
+            for error in e.errors():
+                field = str(error["loc"][0]) if error["loc"] else "<row>"
+                value = None if error["type"] == "missing" else error.get("input")
+                failures.append(RowFailure(index, field, error["msg"], value))
+            failing_rows += 1
+            if failing_rows >= max_rows:
+                break
+    return failures
+
+
+def format_failures(failures):
+    return "; ".join(str(failure) for failure in failures)
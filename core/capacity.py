@@ -0,0 +1,145 @@
+import csv
+import json
+import os
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+
+
+@dataclass
+class CapacityPoint:
+    """One probed request rate (at one in-flight limit, when searched) of the throughput-vs-latency curve."""
+    rate: float
+    throughput: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    error_ratio: float
+    status_counts: dict
+    dropped: int
+    passed: bool = True
+    reason: str = ""
+    concurrency: int = None
+
+
+@dataclass
+class CapacityResult:
+    knee_rps: float
+    criteria: dict
+    points: list = field(default_factory=list)
+    artifacts: tuple = ()
+    knee_concurrency: int = None
+    knees: dict = field(default_factory=dict)
+
+    def write_artifacts(self, directory, name=None):
+        """Writes `<name>.json` (knee + full curve) and `<name>.csv` (one row per probed point); returns both paths."""
+        os.makedirs(directory, exist_ok=True)
+        name = name or f"capacity-{datetime.now().isoformat(timespec='seconds').replace(':', '-')}"
+        json_path = os.path.join(directory, f"{name}.json")
+        csv_path = os.path.join(directory, f"{name}.csv")
+
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"knee_rps": self.knee_rps, "knee_concurrency": self.knee_concurrency,
+                       "knees": {str(concurrency): knee for concurrency, knee in self.knees.items()},
+                       "criteria": self.criteria, "points": [asdict(point) for point in self.points]}, f, indent=2)
+
+        columns = ["concurrency", "rate", "throughput", "p50_ms", "p90_ms", "p99_ms", "error_ratio", "dropped",
+                   "passed", "reason"]
+        with open(csv_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+            writer.writeheader()
+            for point in self.points:
+                writer.writerow(asdict(point))
+        self.artifacts = (json_path, csv_path)
+        return self.artifacts
+
+
+async def find_capacity(run_step, start_rate=1.0, max_rate=1000.0, growth=2.0, search_steps=5, tolerance=0.05,
+                        max_error_ratio=0.0, p99_limit_ms=None, blowup_factor=3.0, latency_slack_ms=50.0,
+                        expected_status=200, concurrency_levels=None):
+    """
+    Finds the highest request rate the target sustains: first ramps geometrically from `start_rate` until a step
+    fails, then binary-searches between the last passing and the first failing rate.
+
+    `run_step(rate)` is awaited once per probe and must return a `LoadReport` from an open-loop run at that rate.
+    A step fails when more than `max_error_ratio` of the responses are not `expected_status` (503s, errors), when
+    requests had to be dropped, when p99 exceeds `p99_limit_ms`, or when p99 blows up to more than `blowup_factor`
+    times (and `latency_slack_ms` above) the best p99 of the passing steps.
+
+    With `concurrency_levels` the search is repeated for every in-flight limit, `run_step(rate, concurrency)` is
+    awaited instead, and `knees` holds each level's knee; `knee_rps` and `knee_concurrency` are the highest knee and
+    the lowest limit reaching it.
+    """
+    criteria = {
+        "max_error_ratio": max_error_ratio, "p99_limit_ms": p99_limit_ms,
+        "blowup_factor": blowup_factor, "latency_slack_ms": latency_slack_ms,
+    }
+    points = []
+    knees = {}
+    for concurrency in sorted(concurrency_levels) if concurrency_levels else [None]:
+        step = run_step if concurrency is None else lambda rate, limit=concurrency: run_step(rate, limit)
+        knees[concurrency] = await _search_rate(step, points, concurrency, start_rate, max_rate, growth, search_steps,
+                                                tolerance, criteria, expected_status)
+
+    knee_concurrency = max(knees, key=lambda concurrency: knees[concurrency])
+    return CapacityResult(knee_rps=knees[knee_concurrency], criteria=criteria,
+                          points=sorted(points, key=lambda point: (point.concurrency or 0, point.rate)),
+                          knee_concurrency=knee_concurrency, knees=knees if concurrency_levels else {})
+
+
+async def _search_rate(run_step, points, concurrency, start_rate, max_rate, growth, search_steps, tolerance, criteria,
+                       expected_status):
+    """Ramp and binary search of `find_capacity` at one in-flight limit; appends to `points`, returns the knee."""
+    max_error_ratio, p99_limit_ms = criteria["max_error_ratio"], criteria["p99_limit_ms"]
+    blowup_factor, latency_slack_ms = criteria["blowup_factor"], criteria["latency_slack_ms"]
+    baseline_p99 = None
+
+    async def probe(rate):
+        nonlocal baseline_p99
+        report = await run_step(rate)
+        completed = report.completed
+        error_ratio = (completed - report.status_counts[expected_status]) / completed if completed else 1.0
+        point = CapacityPoint(
+            rate=round(rate, 3),
+            throughput=round(report.throughput, 3),
+            p50_ms=round(report.percentile(50), 3),
+            p90_ms=round(report.percentile(90), 3),
+            p99_ms=round(report.percentile(99), 3),
+            error_ratio=round(error_ratio, 4),
+            status_counts={str(status): count for status, count in report.status_counts.items()},
+            dropped=report.dropped,
+            concurrency=concurrency,
+        )
+        if error_ratio > max_error_ratio:
+            point.passed, point.reason = False, f"error ratio {error_ratio:.2%}"
+        elif report.dropped:
+            point.passed, point.reason = False, f"{report.dropped} requests dropped"
+        elif p99_limit_ms is not None and point.p99_ms > p99_limit_ms:
+            point.passed, point.reason = False, f"p99 {point.p99_ms:.1f} ms over limit"
+        elif baseline_p99 is not None and point.p99_ms > max(baseline_p99 * blowup_factor,
+                                                              baseline_p99 + latency_slack_ms):
+            point.passed, point.reason = False, f"p99 blew up from {baseline_p99:.1f} to {point.p99_ms:.1f} ms"
+        if point.passed:
+            # the best p99 seen so far, so a cold first step (connection setup) does not inflate the baseline
+            baseline_p99 = point.p99_ms if baseline_p99 is None else min(baseline_p99, point.p99_ms)
+        points.append(point)
+        return point
+
+    good, bad, rate = None, None, start_rate
+    while rate <= max_rate:
+        if (await probe(rate)).passed:
+            good, rate = rate, rate * growth
+        else:
+            bad = rate
+            break
+
+    if good is not None and bad is not None:
+        for _ in range(search_steps):
+            if (bad - good) / good <= tolerance:
+                break
+            middle = (good + bad) / 2
+            if (await probe(middle)).passed:
+                good = middle
+            else:
+                bad = middle
+
+    return round(good or 0.0, 3)
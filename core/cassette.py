@@ -0,0 +1,106 @@
+import fcntl
+import json
+import mmap
+import os
+import threading
+import zlib
+from urllib.parse import urlsplit
+
+from core.response_store import request_fingerprint
+from core.responses import BufferedResponse
+
+CASSETTES_FOLDER = "cassettes"
+DEFAULT_CASSETTE_NAME = "cad_api"
+RECORDED_HEADERS = ("Content-Type", "Retry-After")
+
+
+def cassette_key(url, params):
+    """
+    Fingerprint of the request path and canonical params. Scheme, host and port are left out, so a cassette recorded
+    against a stand-in on a random port replays against any other.
+    """
+    return request_fingerprint(urlsplit(url).path, params)
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class Cassette:
+    """
+    Compact indexed recording of CAD request/response pairs.
+
+    A cassette is two files: `<path>.dat` holds the zlib-compressed bodies back to back and `<path>.idx` holds one
+    JSON line per request (fingerprint, offset, length, status, headers). Recording appends under an exclusive
+    `flock`, so xdist workers can share a cassette; replay loads the index once per process and slices bodies
+    straight out of a memory map of the data file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.data_path = f"{path}.dat"
+        self.index_path = f"{path}.idx"
+        self._lock = threading.Lock()
+        self._index = None
+        self._data_file = None
+        self._data_map = None
+
+    def reset(self):
+        """Truncates the cassette; done once by the controlling process before recording starts."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        for file_path in (self.data_path, self.index_path):
+            open(file_path, "wb").close()
+
+    def record(self, url, params, response):
+        body = zlib.compress(response.content, 6)
+        entry = {
+            "key": cassette_key(url, params),
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            "params": {str(key): str(value) for key, value in (params or {}).items()},
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock, open(self.index_path, "ab") as index_file:
+            fcntl.flock(index_file, fcntl.LOCK_EX)
+            try:
+                with open(self.data_path, "ab") as data_file:
+                    entry["offset"] = data_file.tell()
+                    entry["length"] = len(body)
+                    data_file.write(body)
+                index_file.write(json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n")
+            finally:
+                fcntl.flock(index_file, fcntl.LOCK_UN)
+
+    def replay(self, url, params):
+        key = cassette_key(url, params)
+        entry = self._load_index().get(key)
+        if entry is None:
+            raise CassetteMiss(f"No recording for {url} with params {params} in cassette '{self.path}'")
+        start = entry["offset"]
+        content = zlib.decompress(self._data_map[start:start + entry["length"]])
+        return BufferedResponse(url, entry["status"], content, entry.get("headers"))
+
+    def _load_index(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    index = {}
+                    with open(self.index_path, "rb") as index_file:
+                        for line in index_file:
+                            if line.strip():
+                                entry = json.loads(line)
+                                index[entry["key"]] = entry  # re-recorded requests: last one wins
+                    self._data_file = open(self.data_path, "rb")
+                    if index:
+                        self._data_map = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._index = index
+        return self._index
+
+    def __len__(self):
+        return len(self._load_index())
+
+    def close(self):
+        if self._data_map is not None:
+            self._data_map.close()
+        if self._data_file is not None:
+            self._data_file.close()
+        self._index = self._data_map = self._data_file = None
@@ -13,10 +13,18 @@ class HTTPStatusCodes(Enum):
     OK = 200
     BAD_REQUEST = 400
     NOT_FOUND = 404
+    TOO_MANY_REQUESTS = 429
     INTERNAL_SERVER_ERROR = 500
     SERVICE_UNAVAILABLE = 503
 
 
+class CadModes(str, Enum):
+    """How AsteroidAPIController serves requests: hit the API, hit it and record, or replay a cassette"""
+    LIVE = "live"
+    RECORD = "record"
+    REPLAY = "replay"
+
+
 class ResponseKeys(Enum):
     """Top-level response keys returned"""
     COUNT = "count"
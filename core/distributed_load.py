@@ -0,0 +1,193 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+
+from core.load_engine import AsyncLoadEngine, LoadReport
+
+DEFAULT_REPORT_INTERVAL = 1.0
+DEFAULT_CONNECT_TIMEOUT = 60.0
+
+
+def _send(sock_file, message):
+    sock_file.write(json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n")
+    sock_file.flush()
+
+
+def _receive(sock_file):
+    line = sock_file.readline()
+    if not line:
+        raise ConnectionError("Load coordinator connection closed")
+    return json.loads(line)
+
+
+class LoadCoordinator:
+    """
+    Fans one load job out to `workers` processes (local or on other hosts) and merges what they send back.
+
+    Workers connect over TCP and speak newline-delimited JSON: the coordinator sends each one its share of the
+    job (`rate` or `requests` split evenly) once all of them are connected, followed by a common `start`; workers
+    then stream cumulative `LoadReport` snapshots every `report_interval` seconds and a `final` one when done.
+    Because latency histograms and counters merge by addition, `report()` is the exact aggregate. If not every
+    worker connects within `connect_timeout` seconds, the job is never sent and `wait()` raises `TimeoutError`.
+    """
+    def __init__(self, job, workers, host="127.0.0.1", port=0, connect_timeout=DEFAULT_CONNECT_TIMEOUT):
+        self.job = job
+        self.workers = workers
+        self.connect_timeout = connect_timeout
+        self._server = socket.create_server((host, port))
+        self._server.settimeout(connect_timeout)
+        self._error = None
+        self.host, self.port = self._server.getsockname()[:2]
+        self._snapshots = {}
+        self._finished = set()
+        self._lock = threading.Lock()
+        self._all_finished = threading.Event()
+        self._thread = None
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, name="load-coordinator", daemon=True)
+        self._thread.start()
+        return self
+
+    def _serve(self):
+        connections = []
+        try:
+            while len(connections) < self.workers:
+                try:
+                    connection, _ = self._server.accept()
+                except socket.timeout:
+                    self._error = TimeoutError(
+                        f"Only {len(connections)} of {self.workers} load workers connected to {self.address} "
+                        f"within {self.connect_timeout} s"
+                    )
+                    for accepted in connections:
+                        accepted.close()
+                    return
+                connections.append(connection)
+            writers = [connection.makefile("wb") for connection in connections]
+            for index, writer in enumerate(writers):
+                _send(writer, {"type": "job", "worker": index, "job": self._share(index)})
+            for writer in writers:
+                _send(writer, {"type": "start"})
+            readers = [threading.Thread(target=self._read_worker, args=(index, connection), daemon=True)
+                       for index, connection in enumerate(connections)]
+            for reader in readers:
+                reader.start()
+            for reader in readers:
+                reader.join()
+        finally:
+            self._server.close()
+            self._all_finished.set()
+
+    def _share(self, index):
+        share = dict(self.job)
+        if "rate" in share:
+            share["rate"] = share["rate"] / self.workers
+            share.setdefault("requests", int(self.job["rate"] * self.job["duration"]))
+        if "requests" in share:
+            base, extra = divmod(share["requests"], self.workers)
+            share["requests"] = base + (1 if index < extra else 0)
+        return share
+
+    def _read_worker(self, index, connection):
+        reader = connection.makefile("rb")
+        try:
+            while True:
+                message = _receive(reader)
+                with self._lock:
+                    self._snapshots[index] = message["report"]
+                    if message["type"] == "final":
+                        self._finished.add(index)
+                        return
+        except (ConnectionError, ValueError):
+            return  # a dead worker keeps its last snapshot
+        finally:
+            connection.close()
+
+    def report(self):
+        """Merged report of the latest snapshot of every worker (complete once `wait()` returned)."""
+        with self._lock:
+            snapshots = list(self._snapshots.values())
+        merged = LoadReport()
+        for snapshot in snapshots:
+            merged.merge(LoadReport.from_dict(snapshot))
+        return merged
+
+    def wait(self, timeout=None):
+        """Blocks until every worker sent its final report (or disconnected) and returns the merged report."""
+        self._all_finished.wait(timeout)
+        if self._error is not None:
+            raise self._error
+        return self.report()
+
+    @property
+    def finished_workers(self):
+        with self._lock:
+            return len(self._finished)
+
+
+async def run_load_worker(address, make_request_fn, report_interval=DEFAULT_REPORT_INTERVAL):
+    """
+    Worker side: connects to the coordinator at `host:port`, runs its share of the job and streams reports back.
+
+    `make_request_fn(job)` is an async context manager factory yielding the `request_fn` the engine should call,
+    so each worker owns its HTTP session. Jobs are `{"mode": "open_loop", "rate", "duration", "requests"}` or
+    `{"mode": "closed_loop", "requests"}`, plus `concurrency` and whatever the factory needs (URL, params).
+    """
+    host, port = address.rsplit(":", 1)
+    reader, writer = await asyncio.open_connection(host, int(port))
+
+    async def receive():
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Load coordinator connection closed")
+        return json.loads(line)
+
+    async def send(message_type, report):
+        writer.write(json.dumps({"type": message_type, "report": report.to_dict()}).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    job = (await receive())["job"]
+    await receive()  # start barrier, so all workers begin together
+
+    engine = AsyncLoadEngine(concurrency=job.get("concurrency", 100))
+
+    async def stream_progress():
+        while True:
+            await asyncio.sleep(report_interval)
+            if engine.report is not None:
+                await send("progress", engine.report)
+
+    async with make_request_fn(job) as request_fn:
+        progress = asyncio.create_task(stream_progress())
+        try:
+            if job["mode"] == "open_loop":
+                report = await engine.run_open_loop(request_fn, job["rate"], job["duration"],
+                                                    max_in_flight=job.get("max_in_flight"),
+                                                    total_requests=job.get("requests"))
+            else:
+                report = await engine.run(request_fn, job["requests"], timeout=job.get("timeout"))
+        finally:
+            progress.cancel()
+    await send("final", report)
+    writer.close()
+    await writer.wait_closed()
+    return report
+
+
+def wait_for_workers(coordinator, processes, timeout=None):
+    """Waits for the coordinator, then reaps local worker processes; returns the merged report."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        return coordinator.wait(timeout)
+    finally:
+        for process in processes:
+            process.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,83 @@
+import json
+import os
+import sqlite3
+import statistics
+import time
+
+DEFAULT_HISTORY_WINDOW = 5  # most recent runs a duration estimate is based on
+DEFAULT_KEPT_SESSIONS = 30
+DURATION_HISTORY_FILE = "duration_history.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS durations (
+    nodeid TEXT NOT NULL,
+    session TEXT NOT NULL,
+    recorded REAL NOT NULL,
+    duration REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    retries INTEGER NOT NULL DEFAULT 0,
+    reruns INTEGER NOT NULL DEFAULT 0,
+    requests INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS durations_by_nodeid ON durations (nodeid, recorded);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    nodeid TEXT PRIMARY KEY,
+    keys TEXT NOT NULL
+);
+"""
+
+
+class DurationHistory:
+    """
+    Per-test durations of past runs in a local SQLite file, written once per session by the controlling process.
+
+    Besides the wall time of every test (setup + call + teardown, reruns included) a row keeps its outcome, helper
+    retries, pytest-rerunfailures reruns and CAD request count. `fingerprints` keeps, per test, the request
+    fingerprints of its last run, so tests that fetch the same query can be scheduled together.
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.executescript(_SCHEMA)
+
+    def record(self, session, results, kept_sessions=DEFAULT_KEPT_SESSIONS):
+        """
+        Stores one session. `results` maps a nodeid to a dict with `duration`, `outcome` and optionally `retries`,
+        `reruns`, `requests` and `fingerprints`. Sessions beyond the `kept_sessions` newest are pruned.
+        """
+        now = time.time()
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO durations (nodeid, session, recorded, duration, outcome, retries, reruns, requests) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(nodeid, session, now, result["duration"], result["outcome"], result.get("retries", 0),
+                  result.get("reruns", 0), result.get("requests", 0)) for nodeid, result in results.items()]
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO fingerprints (nodeid, keys) VALUES (?, ?)",
+                [(nodeid, json.dumps(sorted(result["fingerprints"]))) for nodeid, result in results.items()
+                 if result.get("fingerprints")]
+            )
+            self._connection.execute(
+                "DELETE FROM durations WHERE session NOT IN (SELECT session FROM durations GROUP BY session "
+                "ORDER BY MAX(recorded) DESC LIMIT ?)", (kept_sessions,)
+            )
+
+    def estimates(self, window=DEFAULT_HISTORY_WINDOW):
+        """`{nodeid: seconds}`: the median duration of each test over its `window` most recent runs."""
+        recent = {}
+        for nodeid, duration in self._connection.execute(
+                "SELECT nodeid, duration FROM durations ORDER BY recorded DESC"):
+            durations = recent.setdefault(nodeid, [])
+            if len(durations) < window:
+                durations.append(duration)
+        return {nodeid: statistics.median(durations) for nodeid, durations in recent.items()}
+
+    def fingerprints(self):
+        """`{nodeid: [fingerprint, ...]}` from each test's last recorded run."""
+        return {nodeid: json.loads(keys) for nodeid, keys in self._connection.execute(
+            "SELECT nodeid, keys FROM fingerprints")}
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,145 @@
+import codecs
+import json
+import re
+
+from core.cad_columns import CadColumns, DEFAULT_FIELDS, FIELDS_KEY
+from core.constants import ResponseKeys
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_BATCH_SIZE = 10_000
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class CadStream:
+    """
+    Incremental parser for a CAD response body arriving as byte chunks (e.g. `response.iter_content()`).
+
+    Everything the API sends before `data` (`signature`, `count`, `fields`) is parsed on construction and available
+    in `header`; rows are then decoded one at a time while the body is still downloading, so memory stays bounded by
+    the chunk and batch size instead of the whole response. Keys sent after `data` are added to `header` once the
+    rows are exhausted.
+    """
+    def __init__(self, chunks, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.header = {}
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._consumed = False
+        self._expect("{")
+        self._has_data = self._read_members()
+
+    @property
+    def count(self):
+        return int(self.header.get(ResponseKeys.COUNT.value, 0))
+
+    @property
+    def fields(self):
+        return self.header.get(FIELDS_KEY) or DEFAULT_FIELDS
+
+    def rows(self):
+        """Yields each `data` row as soon as it is fully received; the stream can only be iterated once."""
+        if self._consumed:
+            raise RuntimeError("CAD stream rows were already consumed")
+        self._consumed = True
+        if not self._has_data:
+            return
+        if self._peek() == "]":
+            self._pos += 1
+        else:
+            while True:
+                yield self._value()
+                separator = self._peek()
+                self._pos += 1
+                if separator == "]":
+                    break
+                if separator != ",":
+                    raise ValueError(f"Malformed CAD data array near offset {self._pos}")
+        if self._peek() == ",":
+            self._pos += 1
+            self._read_members()
+        else:
+            self._expect("}")
+
+    def batches(self, batch_size=None):
+        """Yields `CadColumns` over consecutive blocks of `batch_size` rows, with `offset` set to the first row."""
+        batch_size = batch_size or self.batch_size
+        batch, offset = [], 0
+        for row in self.rows():
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield CadColumns(self.fields, batch, offset=offset)
+                batch, offset = [], offset + batch_size
+        if batch:
+            yield CadColumns(self.fields, batch, offset=offset)
+
+    def violations(self, name, lower=None, upper=None, limit=None):
+        """
+        Streams the rows and returns `(row_index, row)` for every row whose `name` value is out of bounds
+        (see `CadColumns.violations`), keeping at most `limit` of them.
+        """
+        offending = []
+        for batch in self.batches():
+            for index in batch.violations(name, lower, upper):
+                offending.append((batch.offset + int(index), batch.data[index]))
+                if limit is not None and len(offending) >= limit:
+                    return offending
+        return offending
+
+    def _read_members(self):
+        """Parses `"key": value` pairs into `header` up to the closing brace; stops early (True) at `data`."""
+        while True:
+            if self._peek() == "}":
+                self._pos += 1
+                return False
+            key = self._value()
+            self._expect(":")
+            if key == ResponseKeys.DATA.value:
+                self._expect("[")
+                return True
+            self.header[key] = self._value()
+            if self._peek() == ",":
+                self._pos += 1
+
+    def _fill(self):
+        if self._eof:
+            return False
+        if self._pos > DEFAULT_CHUNK_SIZE:
+            self._buffer, self._pos = self._buffer[self._pos:], 0
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            self._buffer += self._decoder.decode(b"", final=True)
+        else:
+            self._buffer += self._decoder.decode(chunk)
+        return True
+
+    def _peek(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of CAD response body")
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"Expected '{char}' in CAD response near offset {self._pos}")
+        self._pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a value touching the end of the buffer (e.g. a number) may continue in the next chunk
+            if end < len(self._buffer) or not self._fill():
+                self._pos = end
+                return value
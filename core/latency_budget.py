@@ -0,0 +1,69 @@
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from core.latency_histogram import LatencyHistogram
+
+BUDGET_MODES = ("fail", "warn")
+BUDGET_KEYS = ("p50_ms", "p95_ms", "max_ms")
+
+
+@dataclass(frozen=True)
+class LatencyBudget:
+    """Per-request latency limits of one test, in milliseconds; None means that limit is not checked."""
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    max_ms: Optional[float] = None
+
+    @classmethod
+    def parse(cls, text):
+        """Parses `p95_ms=800 max_ms=2000` (the `latency_budgets` ini format); raises `ValueError` on unknown keys."""
+        limits = {}
+        for pair in text.replace(",", " ").split():
+            key, _, value = pair.partition("=")
+            if key not in BUDGET_KEYS or not value:
+                raise ValueError(f"Invalid latency budget {pair!r}, expected one of {', '.join(BUDGET_KEYS)}=<ms>")
+            limits[key] = float(value)
+        return cls(**limits)
+
+    def __bool__(self):
+        return any(getattr(self, key) is not None for key in BUDGET_KEYS)
+
+    def tightened(self, other):
+        """The stricter of both budgets, limit by limit (a test in several budgeted groups meets all of them)."""
+        return LatencyBudget(**{key: min((value for value in (getattr(self, key), getattr(other, key))
+                                          if value is not None), default=None) for key in BUDGET_KEYS})
+
+    def overridden(self, **limits):
+        """Copy with the limits given explicitly (e.g. by the marker) replacing the inherited ones."""
+        unknown = set(limits) - set(BUDGET_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown latency budget limits {sorted(unknown)}, expected {', '.join(BUDGET_KEYS)}")
+        return replace(self, **{key: value for key, value in limits.items() if value is not None})
+
+    def check(self, latencies):
+        """
+        Returns `(observed, exceeded)` for per-request `latencies` in seconds: the observed p50/p95/max in
+        milliseconds, and one readable message per limit that was exceeded.
+        """
+        histogram = LatencyHistogram()
+        for seconds in latencies:
+            histogram.record(seconds)
+        observed = {
+            "p50_ms": round(histogram.percentile(50), 3),
+            "p95_ms": round(histogram.percentile(95), 3),
+            "max_ms": histogram.max_us / 1000.0,
+        }
+        exceeded = [f"{key[:-3]} {observed[key]:.1f} ms > {getattr(self, key):g} ms"
+                    for key in BUDGET_KEYS if getattr(self, key) is not None and observed[key] > getattr(self, key)]
+        return observed, exceeded
+
+
+def parse_budget_groups(lines):
+    """`{marker: LatencyBudget}` from `latency_budgets` ini lines such as `smoke: p95_ms=1500 max_ms=5000`."""
+    groups = {}
+    for line in lines:
+        marker, separator, limits = line.partition(":")
+        if not separator or not marker.strip():
+            raise ValueError(f"Invalid latency_budgets line {line!r}, expected '<marker>: p95_ms=<ms> ...'")
+        groups[marker.strip()] = LatencyBudget.parse(limits)
+    return groups
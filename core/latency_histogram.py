@@ -0,0 +1,103 @@
+import math
+from array import array
+
+DEFAULT_LOWEST_US = 1
+DEFAULT_HIGHEST_US = 3_600_000_000  # one hour
+DEFAULT_PRECISION = 0.01
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory latency histogram with logarithmic buckets (HDR-style).
+
+    Every bucket is `precision` wider than the previous one, so any recorded value is reported within that relative
+    error no matter how many samples are stored (1 µs - 1 h at 1% is ~2,200 counters). Histograms built with the same
+    settings merge by adding counters, which is how per-worker results are aggregated.
+    """
+    def __init__(self, lowest_us=DEFAULT_LOWEST_US, highest_us=DEFAULT_HIGHEST_US, precision=DEFAULT_PRECISION):
+        self.lowest_us = lowest_us
+        self.highest_us = highest_us
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.counts = array("Q", [0]) * (self._index(highest_us) + 1)
+        self.total = 0
+        self.sum_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def _index(self, value_us):
+        return int(math.log(max(value_us, self.lowest_us) / self.lowest_us) / self._log_base)
+
+    def _upper_bound(self, index):
+        return self.lowest_us * math.exp((index + 1) * self._log_base)
+
+    def record(self, seconds):
+        value_us = min(max(int(seconds * 1_000_000), self.lowest_us), self.highest_us)
+        self.counts[self._index(value_us)] += 1
+        self.total += 1
+        self.sum_us += value_us
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = max(self.max_us, value_us)
+
+    def percentile(self, percent):
+        """Latency in milliseconds at or below which `percent`% of the samples fall."""
+        if not self.total:
+            return 0.0
+        threshold = max(math.ceil(self.total * percent / 100.0), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                return min(self._upper_bound(index), self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    @property
+    def mean(self):
+        return self.sum_us / self.total / 1000.0 if self.total else 0.0
+
+    def merge(self, other):
+        if (other.lowest_us, other.highest_us, other.precision) != (self.lowest_us, self.highest_us, self.precision):
+            raise ValueError("Cannot merge histograms recorded with different bucket settings")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+        self.sum_us += other.sum_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def summary(self):
+        return {
+            "count": self.total,
+            "min_ms": (self.min_us or 0) / 1000.0,
+            "mean_ms": round(self.mean, 3),
+            "p50_ms": round(self.percentile(50), 3),
+            "p90_ms": round(self.percentile(90), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "p99_9_ms": round(self.percentile(99.9), 3),
+            "max_ms": self.max_us / 1000.0,
+        }
+
+    def to_dict(self):
+        """Sparse, JSON-serialisable form (only non-empty buckets) for shipping between processes."""
+        return {
+            "settings": [self.lowest_us, self.highest_us, self.precision],
+            "buckets": {str(index): count for index, count in enumerate(self.counts) if count},
+            "total": self.total,
+            "sum_us": self.sum_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+        }
+
+    @classmethod
+    def from_dict(cls, payload):
+        histogram = cls(*payload["settings"])
+        for index, count in payload["buckets"].items():
+            histogram.counts[int(index)] = count
+        histogram.total = payload["total"]
+        histogram.sum_us = payload["sum_us"]
+        histogram.min_us = payload["min_us"]
+        histogram.max_us = payload["max_us"]
+        return histogram
@@ -0,0 +1,231 @@
+import asyncio
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+from core.latency_histogram import LatencyHistogram
+
+
+@dataclass
+class LoadReport:
+    """
+    Outcome of a load run: status code mix, transport errors, latency histograms (of every call and of the 2xx
+    responses alone) and a per-second timeline.
+
+    For open-loop runs `target_rate` is set and latencies are measured from each request's *intended* send time,
+    so a stalled server shows up as queueing delay instead of silently lowering the offered load.
+    """
+    status_counts: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    success_histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    timeline: dict = field(default_factory=lambda: defaultdict(Counter))
+    cancelled: int = 0
+    dropped: int = 0
+    elapsed: float = 0.0
+    target_rate: float = None
+
+    @property
+    def completed(self):
+        return sum(self.status_counts.values()) + sum(self.errors.values())
+
+    @property
+    def throughput(self):
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    def add(self, status_code, latency, second=0):
+        self.status_counts[status_code] += 1
+        self.timeline[second][status_code] += 1
+        self.histogram.record(latency)
+        if 200 <= status_code < 300:
+            self.success_histogram.record(latency)
+
+    def add_error(self, error, latency, second=0):
+        self.errors[type(error).__name__] += 1
+        self.timeline[second]["error"] += 1
+        self.histogram.record(latency)
+
+    def percentile(self, percent, successful=False):
+        """Latency percentile in milliseconds, of every call or (`successful=True`) of the 2xx responses only."""
+        return (self.success_histogram if successful else self.histogram).percentile(percent)
+
+    def classify(self, expected_success, expected_failure):
+        """Returns `(successes, failures, others)`, counting transport errors as others."""
+        successes = self.status_counts[expected_success]
+        failures = self.status_counts[expected_failure]
+        return successes, failures, self.completed - successes - failures
+
+    def summary(self):
+        return {
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "dropped": self.dropped,
+            "elapsed_s": round(self.elapsed, 3),
+            "target_rps": self.target_rate,
+            "throughput_rps": round(self.throughput, 1),
+            "latency_ms": self.histogram.summary(),
+            "status_counts": dict(self.status_counts),
+            "errors": dict(self.errors),
+        }
+
+    def merge(self, other):
+        """Adds another report's counters into this one (e.g. from another load worker process)."""
+        self.status_counts.update(other.status_counts)
+        self.errors.update(other.errors)
+        self.histogram.merge(other.histogram)
+        self.success_histogram.merge(other.success_histogram)
+        for second, counts in other.timeline.items():
+            self.timeline[second].update(counts)
+        self.cancelled += other.cancelled
+        self.dropped += other.dropped
+        self.elapsed = max(self.elapsed, other.elapsed)
+        if other.target_rate is not None:
+            self.target_rate = (self.target_rate or 0) + other.target_rate
+        return self
+
+    def to_dict(self):
+        """JSON-serialisable form, mergeable on the receiving side via `from_dict(...).merge(...)`."""
+        return {
+            "status_counts": {str(status): count for status, count in self.status_counts.items()},
+            "errors": dict(self.errors),
+            "histogram": self.histogram.to_dict(),
+            "success_histogram": self.success_histogram.to_dict(),
+            "timeline": {str(second): {str(key): value for key, value in counts.items()}
+                         for second, counts in self.timeline.items()},
+            "cancelled": self.cancelled,
+            "dropped": self.dropped,
+            "elapsed": self.elapsed,
+            "target_rate": self.target_rate,
+        }
+
+    @classmethod
+    def from_dict(cls, payload):
+        def status_key(key):
+            return int(key) if key.isdigit() else key
+
+        report = cls(
+            status_counts=Counter({status_key(key): count for key, count in payload["status_counts"].items()}),
+            errors=Counter(payload["errors"]),
+            histogram=LatencyHistogram.from_dict(payload["histogram"]),
+            success_histogram=LatencyHistogram.from_dict(payload["success_histogram"]),
+            cancelled=payload["cancelled"],
+            dropped=payload["dropped"],
+            elapsed=payload["elapsed"],
+            target_rate=payload["target_rate"],
+        )
+        for second, counts in payload["timeline"].items():
+            report.timeline[int(second)].update({status_key(key): value for key, value in counts.items()})
+        return report
+
+    def timeline_rows(self):
+        """Per-second `{"second": n, "<status>": count, ...}` rows, in order, for status-mix-over-time reports."""
+        return [{"second": second, **{str(key): value for key, value in self.timeline[second].items()}}
+                for second in sorted(self.timeline)]
+
+
+class AsyncLoadEngine:
+    """
+    Drives an async request function from a single event loop.
+
+    `run` is closed-loop: `concurrency` worker coroutines pull from a shared request budget, so memory stays flat no
+    matter how many requests are issued. `run_open_loop` holds a target request rate for a duration regardless of
+    how fast responses come back. `cancel()` (thread-safe) or `timeout` stop either run gracefully: in-flight calls
+    are cancelled, unfinished requests are reported as `cancelled` and the partial report is still returned.
+    """
+    def __init__(self, concurrency=100):
+        self.concurrency = concurrency
+        self._loop = None
+        self._stopping = None
+        self.report = None  # the report of the current (or last) run, readable while it is in progress
+
+    def cancel(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    async def run(self, request_fn, total_requests, timeout=None):
+        """
+        Calls `await request_fn()` `total_requests` times, at most `concurrency` at once.
+        `request_fn` returns an HTTP status code; any exception it raises is counted as a transport error.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        report = self.report = LoadReport()
+        remaining = total_requests
+        started = time.perf_counter()
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0 and not self._stopping.is_set():
+                remaining -= 1
+                await self._call(request_fn, report, time.perf_counter(), started)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, total_requests))]
+        await self._wait(workers, timeout)
+        report.elapsed = time.perf_counter() - started
+        report.cancelled = total_requests - report.completed
+        return report
+
+    async def run_open_loop(self, request_fn, rate, duration, max_in_flight=None, drain_timeout=30,
+                            total_requests=None):
+        """
+        Starts `rate` requests per second for `duration` seconds on a fixed schedule (open loop).
+
+        A request is never delayed because earlier ones are still pending; when more than `max_in_flight`
+        (default `concurrency`) are outstanding it is counted as `dropped` instead. After the last send, pending
+        requests get `drain_timeout` seconds before they are cancelled. `total_requests` overrides the
+        `rate * duration` request count, e.g. for a worker's exact share of a distributed run.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        report = self.report = LoadReport(target_rate=rate)
+        max_in_flight = max_in_flight or self.concurrency
+        if total_requests is None:
+            total_requests = int(rate * duration)
+        in_flight = set()
+        started = time.perf_counter()
+
+        for i in range(total_requests):
+            intended = started + i / rate
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            if self._stopping.is_set():
+                break
+            if len(in_flight) >= max_in_flight:
+                report.dropped += 1
+                continue
+            task = asyncio.create_task(self._call(request_fn, report, intended, started))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        await self._wait(list(in_flight), drain_timeout)
+        report.elapsed = time.perf_counter() - started
+        report.cancelled = total_requests - report.completed - report.dropped
+        return report
+
+    @staticmethod
+    async def _call(request_fn, report, intended, started):
+        second = int(intended - started)
+        try:
+            status_code = await request_fn()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            report.add_error(e, time.perf_counter() - intended, second)
+        else:
+            report.add(status_code, time.perf_counter() - intended, second)
+
+    async def _wait(self, tasks, timeout):
+        if not tasks:
+            return
+        all_done = asyncio.gather(*tasks)
+        stop_waiter = asyncio.create_task(self._stopping.wait())
+        try:
+            await asyncio.wait([all_done, stop_waiter], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks + [stop_waiter]:
+                task.cancel()
+            await asyncio.gather(all_done, stop_waiter, return_exceptions=True)
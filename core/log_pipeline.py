@@ -0,0 +1,174 @@
+import glob
+import heapq
+import json
+import logging
+import os
+import queue
+import re
+from logging.handlers import QueueHandler, QueueListener
+
+DEFAULT_BODY_LIMIT = 2000  # characters of a logged response body kept before it is cut
+LOG_SEGMENTS_FOLDER = "log_segments"
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+# a record starts with its asctime; lines without one continue the record above (tracebacks, multi-line messages)
+_RECORD_START = re.compile(r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3} ")
+_TIMESTAMP_LENGTH = 23
+
+
+class LoggedBody:
+    """
+    A response body (or any value) for a `%s` log argument: only rendered when the record is emitted, as compact
+    JSON cut to `limit` characters, so a filtered-out DEBUG line costs nothing and a kept one stays small.
+    """
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value, limit=None):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self):
+        limit = self.limit if self.limit is not None else body_limit()
+        try:
+            text = json.dumps(self.value, separators=(",", ":"), default=str)
+        except (TypeError, ValueError):
+            text = repr(self.value)
+        if len(text) <= limit:
+            return text
+        return f"{text[:limit]}... ({len(text) - limit} more characters)"
+
+
+class LogPipeline:
+    """
+    Non-blocking logging for one process: the routed loggers only put records on a queue, and a `QueueListener`
+    thread formats and writes them to this process' segment file and the console (`quiet` loggers: file only).
+
+    Under xdist every worker writes its own segment, so no two processes append to one file; the controlling
+    process merges all segments of the session by timestamp with `merge_segments` once the workers are done.
+    """
+    def __init__(self, segment, loggers, quiet=(), level=logging.DEBUG, console=True, body_limit=DEFAULT_BODY_LIMIT):
+        os.makedirs(os.path.dirname(segment) or ".", exist_ok=True)
+        self.segment = segment
+        self.level = level
+        self.body_limit = body_limit
+        self.loggers = [logging.getLogger(name) for name in (*loggers, *quiet)]
+        for logger in self.loggers[len(loggers):]:
+            logger.propagate = False  # kept out of pytest's live log as well
+        formatter = logging.Formatter(LOG_FORMAT)
+        self.handlers = [logging.FileHandler(segment, encoding="utf-8")]
+        if console:
+            self.handlers.append(logging.StreamHandler())
+            self.handlers[-1].addFilter(lambda record: record.name not in quiet)
+        for handler in self.handlers:
+            handler.setFormatter(formatter)
+        self.queue_handler = QueueHandler(queue.SimpleQueue())
+        self.listener = QueueListener(self.queue_handler.queue, *self.handlers, respect_handler_level=True)
+        self.running = False
+
+    def start(self):
+        for logger in self.loggers:
+            logger.addHandler(self.queue_handler)
+        self.set_level(self.level)
+        self.listener.start()
+        self.running = True
+        return self
+
+    def set_level(self, level):
+        """Sets the level of every routed logger; records below it are dropped before any formatting."""
+        for logger in self.loggers:
+            logger.setLevel(level)
+
+    def drain(self):
+        """
+        Writes out everything queued and stops the listener thread. Records logged afterwards are written
+        synchronously by the same handlers.
+        """
+        if not self.running:
+            return
+        self.listener.stop()
+        self.running = False
+        for logger in self.loggers:
+            logger.removeHandler(self.queue_handler)
+            for handler in self.handlers:
+                logger.addHandler(handler)
+
+    def close(self):
+        self.drain()
+        for logger in self.loggers:
+            for handler in self.handlers:
+                logger.removeHandler(handler)
+        for handler in self.handlers:
+            handler.close()
+
+
+def _records(path):
+    """`(timestamp, text)` per record of a segment, continuation lines included."""
+    with open(path, encoding="utf-8", errors="replace") as file:
+        timestamp, lines = "", []
+        for line in file:
+            if _RECORD_START.match(line):
+                if lines:
+                    yield timestamp, "".join(lines)
+                timestamp, lines = line[:_TIMESTAMP_LENGTH], [line]
+            else:
+                lines.append(line)
+        if lines:
+            yield timestamp, "".join(lines)
+
+
+def merge_segments(target, segments, remove=True):
+    """
+    Appends the records of all `segments` to `target` in timestamp order (a k-way merge, streamed, so segments
+    of any size are never loaded whole). Returns the number of records written.
+    """
+    written = 0
+    with open(target, "a", encoding="utf-8") as out:
+        for _, text in heapq.merge(*(_records(path) for path in segments), key=lambda record: record[0]):
+            out.write(text)
+            written += 1
+    if remove:
+        for path in segments:
+            os.remove(path)
+    return written
+
+
+def session_segments(folder, session):
+    return sorted(glob.glob(os.path.join(folder, f"{session}.*.log")))
+
+
+def parse_marker_levels(lines):
+    """`{marker: level}` from ini lines like `performance: WARNING`."""
+    levels = {}
+    for line in lines:
+        marker, _, level = line.partition(":")
+        level = level.strip().upper()
+        if not marker.strip() or not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Invalid marker log level {line!r}, expected '<marker>: <LEVEL>'")
+        levels[marker.strip()] = logging.getLevelName(level)
+    return levels
+
+
+def level_for(markers, levels, default):
+    """The most verbose level configured for any of `markers`, or `default` when none is configured."""
+    matched = [levels[marker] for marker in markers if marker in levels]
+    return min(matched) if matched else default
+
+
+_pipeline = None
+
+
+def configure_log_pipeline(segment, loggers, **settings):
+    """Starts the per-process `LogPipeline`, replacing (and draining) a previous one."""
+    global _pipeline
+    if _pipeline is not None:
+        _pipeline.close()
+    _pipeline = LogPipeline(segment, loggers, **settings).start()
+    return _pipeline
+
+
+def get_log_pipeline():
+    return _pipeline
+
+
+def body_limit():
+    return _pipeline.body_limit if _pipeline is not None else DEFAULT_BODY_LIMIT
@@ -0,0 +1,79 @@
+import heapq
+import statistics
+
+DEFAULT_UNKNOWN_DURATION = 1.0  # seconds assumed for a test without history when nothing else is known
+DEFAULT_UNIT_SHARE = 0.5  # a fingerprint unit may grow to this share of one worker's ideal load
+
+
+def estimate_durations(keys, history, default=DEFAULT_UNKNOWN_DURATION):
+    """Duration per key from `history`; keys never seen before get the median of the known ones."""
+    known = [history[key] for key in keys if key in history]
+    fallback = statistics.median(known) if known else default
+    return [history.get(key, fallback) for key in keys]
+
+
+def group_units(durations, fingerprints, cap):
+    """
+    Joins items that share a request fingerprint into units (lists of item indices), so they land on the same worker
+    and its response cache serves the repeats. A join is skipped when the unit would exceed `cap` seconds, so a query
+    every test sends (e.g. the default one) cannot glue the whole suite onto one worker.
+    """
+    parent = list(range(len(durations)))
+    weight = list(durations)
+
+    def root(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    owner = {}
+    for index, keys in enumerate(fingerprints):
+        for key in keys:
+            if key not in owner:
+                owner[key] = index
+                continue
+            a, b = root(owner[key]), root(index)
+            if a != b and weight[a] + weight[b] <= cap:
+                parent[b] = a
+                weight[a] += weight[b]
+
+    units = {}
+    for index in range(len(durations)):
+        units.setdefault(root(index), []).append(index)
+    return list(units.values())
+
+
+def lpt_bins(durations, units, bins, first_wave=None):
+    """
+    Longest-processing-time-first: units sorted by total duration, each placed on the currently lightest bin.
+    The makespan is within 4/3 of the optimum. Units holding a `first_wave` item (flags per item index) are placed
+    before all others, which spreads them over every bin. Returns `(bin per item index, load per bin)`; ties go to
+    the lower bin and the earlier unit, so every xdist worker computes the same plan.
+    """
+    first_wave = first_wave or [False] * len(durations)
+    loads = [(0.0, number) for number in range(bins)]
+    totals = [0.0] * bins
+    assignment = [0] * len(durations)
+    ordered = sorted(units, key=lambda unit: (not any(first_wave[index] for index in unit),
+                                              -sum(durations[index] for index in unit), unit[0]))
+    for unit in ordered:
+        load, number = heapq.heappop(loads)
+        unit_total = sum(durations[index] for index in unit)
+        for index in unit:
+            assignment[index] = number
+        totals[number] = load + unit_total
+        heapq.heappush(loads, (totals[number], number))
+    return assignment, totals
+
+
+def plan_schedule(keys, history, fingerprints, bins, first_wave=None, unit_share=DEFAULT_UNIT_SHARE):
+    """
+    Plans `bins` balanced groups for the items named by `keys` (nodeids). `history` maps a key to its estimated
+    seconds, `fingerprints` maps a key to the request fingerprints it sent last time and `first_wave` flags the
+    items to spread over all bins first. Returns `(bin per item, estimated load per bin)`.
+    """
+    durations = estimate_durations(keys, history)
+    cap = sum(durations) / max(bins, 1) * unit_share
+    units = group_units(durations, [fingerprints.get(key, ()) for key in keys], cap)
+    return lpt_bins(durations, units, bins, first_wave)
@@ -0,0 +1,71 @@
+import hashlib
+import io
+import os
+import pstats
+import re
+
+PROFILES_FOLDER = "profiles"
+DEFAULT_TOP_FUNCTIONS = 25
+MAX_STACK_DEPTH = 64
+MIN_STACK_US = 1  # collapsed stacks below one microsecond are dropped
+
+
+def profile_basename(nodeid):
+    """A file name for `nodeid`: readable, filesystem-safe and unique even after truncation."""
+    digest = hashlib.sha1(nodeid.encode("utf-8")).hexdigest()[:8]
+    return f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', nodeid)[:120]}-{digest}"
+
+
+def frame_label(func):
+    """`module.py:function:line` for a pstats function key `(filename, line, name)`."""
+    filename, line, name = func
+    if filename == "~":  # built-ins such as `<built-in method time.sleep>`
+        return name
+    return f"{os.path.basename(filename)}:{name}:{line}"
+
+
+def collapsed_stacks(stats):
+    """
+    Folded stacks (`root;caller;callee <microseconds>`, one per line) as read by flamegraph.pl, speedscope and
+    inferno, rebuilt from a `pstats.Stats`.
+
+    cProfile records caller -> callee edges rather than whole stacks, so each path's time is apportioned by the share
+    of the parent's cumulative time spent on that path. Recursive calls end their path, paths deeper than
+    `MAX_STACK_DEPTH` frames are cut and paths under `MIN_STACK_US` are dropped, which flattens those parts of the
+    graph but keeps the number of paths bounded.
+    """
+    entries = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, tt, ct) in callers.items():
+            callees.setdefault(caller, []).append((func, tt, ct))
+
+    folded = {}
+
+    def walk(func, stack, tt, ct):
+        stack = stack + [frame_label(func)]
+        key = ";".join(stack)
+        folded[key] = folded.get(key, 0) + tt * 1_000_000
+        children = callees.get(func, ())
+        if not ct or len(stack) >= MAX_STACK_DEPTH:
+            return
+        total = entries[func][3] or ct
+        share = ct / total
+        for child, child_tt, child_ct in children:
+            if child_ct * share * 1_000_000 < MIN_STACK_US or frame_label(child) in stack:
+                continue
+            walk(child, stack, child_tt * share, child_ct * share)
+
+    for func, (_, _, tt, ct, callers) in entries.items():
+        if not callers:
+            walk(func, [], tt, ct)
+    return "".join(f"{stack} {round(us)}\n" for stack, us in folded.items() if us >= MIN_STACK_US)
+
+
+def top_functions(paths, limit=DEFAULT_TOP_FUNCTIONS, sort="cumulative"):
+    """The pstats table of the `limit` top functions over all `.prof` files in `paths`, as text."""
+    buffer = io.StringIO()
+    stats = pstats.Stats(*paths, stream=buffer)
+    stats.files = []  # the header would otherwise list every file
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return buffer.getvalue()
@@ -0,0 +1,142 @@
+import fcntl
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 5
+DEFAULT_BACKOFF = 5.0
+DEFAULT_MIN_RATE = 0.5
+ADDITIVE_INCREASE = 1.0  # requests per second regained per second of successful traffic
+RATE_LIMIT_FOLDER = "rate_limit"
+THROTTLE_STATUS_CODES = (429, 503)
+
+# tokens, last refill, blocked until (epoch seconds), current rate, configured rate, throttled seconds (all workers),
+# back-offs (all workers)
+_STATE = struct.Struct("<6dQ")
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a `Retry-After` header (delta-seconds or HTTP-date); None when absent or unparsable."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - (now or time.time()), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class SharedTokenBucket:
+    """
+    Client-side token bucket whose state lives in a small file shared by every pytest-xdist worker.
+
+    `acquire()` takes one token under an exclusive `flock`, sleeping outside the lock until one is available, so all
+    workers together stay under `rate` requests per second (with bursts of `burst`). `observe()` adapts it: a 429/503
+    halves the shared rate (down to `min_rate`) and blocks everyone for `Retry-After` (or `backoff`) seconds, then
+    successes raise it by `ADDITIVE_INCREASE` rps per second (AIMD), so the rate settles just under the service limit
+    instead of swinging between overload and idle.
+    """
+    def __init__(self, path, rate=DEFAULT_RATE, burst=DEFAULT_BURST, backoff=DEFAULT_BACKOFF,
+                 min_rate=DEFAULT_MIN_RATE):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.backoff = backoff
+        self.min_rate = min(min_rate, rate)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.throttled = 0.0
+        self.backoffs = 0
+
+    def reset(self):
+        """Starts a session with a full bucket at the configured rate (done once, by the controlling process)."""
+        with self._state() as state:
+            state[:] = [self.burst, time.time(), 0.0, self.rate, self.rate, 0.0, 0]
+
+    @contextmanager
+    def _state(self):
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(self._fd, _STATE.size, 0)
+                state = list(_STATE.unpack(raw)) if len(raw) == _STATE.size \
+                    else [self.burst, time.time(), 0.0, self.rate, self.rate, 0.0, 0]
+                yield state
+                os.pwrite(self._fd, _STATE.pack(*state), 0)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def acquire(self):
+        """Blocks until a request may be sent; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._state() as state:
+                tokens, updated, blocked_until, rate = state[:4]
+                now = time.time()
+                tokens = min(self.burst, tokens + max(now - updated, 0.0) * rate)
+                if now >= blocked_until and tokens >= 1:
+                    state[0], state[1] = tokens - 1, now
+                    state[5] += waited
+                    break
+                state[0], state[1] = tokens, now
+                delay = max(blocked_until - now, (1 - tokens) / rate)
+            time.sleep(delay)
+            waited += delay
+        self.acquired += 1
+        self.throttled += waited
+        return waited
+
+    def observe(self, status_code, headers=None):
+        """Feeds a response back into the bucket: backs off on 429/503, recovers the rate on anything else."""
+        with self._state() as state:
+            if status_code in THROTTLE_STATUS_CODES:
+                delay = parse_retry_after((headers or {}).get("Retry-After"))
+                delay = self.backoff if delay is None else delay
+                now = time.time()
+                if state[2] <= now:  # halve once per back-off, not once per response of the same burst
+                    state[3] = max(state[3] / 2, self.min_rate)
+                state[0] = 0.0
+                state[2] = max(state[2], now + delay)
+                state[6] += 1
+                self.backoffs += 1
+            elif state[3] < state[4]:
+                state[3] = min(state[3] + ADDITIVE_INCREASE / state[3], state[4])
+
+    def stats(self):
+        """This process' counters plus the shared totals of the whole session."""
+        with self._state() as state:
+            return {
+                "acquired": self.acquired,
+                "throttled_s": round(self.throttled, 3),
+                "backoffs": self.backoffs,
+                "current_rate": round(state[3], 3),
+                "session_throttled_s": round(state[5], 3),
+                "session_backoffs": state[6],
+            }
+
+    def close(self):
+        os.close(self._fd)
+
+
+_limiter = None
+
+
+def configure_rate_limiter(path=None, **settings):
+    """Enables the shared rate limiter for this process (`path` is the state file); `path=None` disables it."""
+    global _limiter
+    if _limiter is not None:
+        _limiter.close()
+    _limiter = SharedTokenBucket(path, **settings) if path else None
+    return _limiter
+
+
+def get_rate_limiter():
+    return _limiter
@@ -1,5 +1,33 @@
-import requests
+import time
 
+from core.rate_limiter import get_rate_limiter
+from core.request_timing import RequestTiming, get_request_timer, take_connection
+from core.transport import get_transport
 
-def get_request(url, params=None):
-    return requests.get(url, params=params)
+
+def get_request(url, params=None, timeout=None, stream=False):
+    """
+    GET through the pooled transport, paced by the shared rate limiter when one is configured.
+
+    Every call is recorded with `get_request_timer()`: time spent throttled, connect, TLS, time to first byte
+    (`response.elapsed` minus connection setup), body download and size. A streamed body is read later by the
+    caller, so its download time and size stay unknown.
+    """
+    limiter = get_rate_limiter()
+    throttled = limiter.acquire() if limiter is not None else 0.0
+    take_connection()
+    start = time.perf_counter()
+    response = get_transport().get(url, params=params, timeout=timeout, stream=stream)
+    total = time.perf_counter() - start
+    if limiter is not None:
+        limiter.observe(response.status_code, response.headers)
+
+    connect, tls = take_connection()
+    first_byte = response.elapsed.total_seconds()
+    get_request_timer().record(RequestTiming(
+        url=response.url, status_code=response.status_code, throttle=throttled, connect=connect, tls=tls,
+        ttfb=max(first_byte - connect - tls, 0.0),
+        download=None if stream else max(total - first_byte, 0.0),
+        size_bytes=None if stream else len(response.content),
+    ))
+    return response
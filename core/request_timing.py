@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+
+# phases measured around the network call, in report order
+NETWORK_PHASES = ("throttle", "connect", "tls", "ttfb", "download")
+# phases measured in the suite after the body arrived
+CLIENT_PHASES = ("decode", "validate")
+PROPERTY_PREFIX = "cad_"
+
+_connections = threading.local()
+
+
+def note_connection(tcp_seconds, tls_seconds):
+    """Called by the transport when the current thread opened a new connection for the request it is sending."""
+    _connections.pending = (tcp_seconds, tls_seconds)
+
+
+def take_connection():
+    """`(tcp, tls)` seconds of the connection this thread opened since the last call; `(0, 0)` for a reused one."""
+    pending = getattr(_connections, "pending", None)
+    _connections.pending = None
+    return pending or (0.0, 0.0)
+
+
+@dataclass
+class RequestTiming:
+    """Timing breakdown of one CAD request, in seconds; `download` is None for a streamed body read by the caller."""
+    url: str
+    status_code: int
+    throttle: float = 0.0
+    connect: float = 0.0
+    tls: float = 0.0
+    ttfb: float = 0.0
+    download: Optional[float] = 0.0
+    decode: float = 0.0
+    validate: float = 0.0
+    size_bytes: Optional[int] = None
+    generation: int = field(default=0, repr=False, compare=False)
+
+    @property
+    def latency(self):
+        """Seconds the request spent on the wire (connect to last byte), without time waiting for the rate limiter."""
+        return sum(getattr(self, phase) or 0.0 for phase in NETWORK_PHASES if phase != "throttle")
+
+    @property
+    def network(self):
+        return sum(getattr(self, phase) or 0.0 for phase in NETWORK_PHASES)
+
+
+class RequestTimer:
+    """
+    Collects a `RequestTiming` for every request sent while a test runs (from any thread of this process).
+
+    `decode`/`validate` time measured with `phase()` is added to the test totals and to the last request sent
+    from the same thread in the same test, so a cache hit (no request) never borrows a previous test's request.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.generation = 0
+        self.requests = []
+        self.phases = Counter()
+        self.fingerprints = set()
+
+    def begin(self):
+        """Starts collecting for a new test."""
+        with self._lock:
+            self.generation += 1
+            self.requests = []
+            self.phases = Counter()
+            self.fingerprints = set()
+
+    def record(self, timing):
+        with self._lock:
+            timing.generation = self.generation
+            self.requests.append(timing)
+        self._local.last = timing
+
+    def note_fingerprint(self, fingerprint):
+        """Remembers a query the test asked for, whether it was sent or served from a cache."""
+        with self._lock:
+            self.fingerprints.add(fingerprint)
+
+    def detach(self):
+        """Forgets this thread's last request, so the next `phase()` is only attributed to the test totals."""
+        self._local.last = None
+
+    @contextmanager
+    def phase(self, name):
+        """Times the block as client-side phase `name` (one of `CLIENT_PHASES`)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            last = getattr(self._local, "last", None)
+            with self._lock:
+                self.phases[name] += elapsed
+                if last is not None and last.generation == self.generation:
+                    setattr(last, name, getattr(last, name) + elapsed)
+
+    def summary(self):
+        """Totals of the current test: request count, bytes received and seconds per phase."""
+        with self._lock:
+            requests, phases = list(self.requests), Counter(self.phases)
+        totals = {phase: sum(getattr(timing, phase) or 0.0 for timing in requests) for phase in NETWORK_PHASES}
+        totals.update({phase: phases[phase] for phase in CLIENT_PHASES})
+        return {
+            "requests": len(requests),
+            "bytes": sum(timing.size_bytes or 0 for timing in requests),
+            **{f"{phase}_s": round(seconds, 6) for phase, seconds in totals.items()},
+            "network_s": round(sum(totals[phase] for phase in NETWORK_PHASES), 6),
+        }
+
+    def timings(self):
+        with self._lock:
+            return list(self.requests)
+
+
+_timer = RequestTimer()
+
+
+def get_request_timer():
+    return _timer
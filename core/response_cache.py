@@ -0,0 +1,145 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_TTL = 300
+
+
+def canonical_request_key(url, params, *extra):
+    """
+    Builds a hashable key for a GET request that ignores param order and value types,
+    e.g. {'dist-max': 0.05} and {'dist-max': '0.05'} produce the same key.
+    """
+    canonical_params = tuple(sorted((str(key), str(value)) for key, value in (params or {}).items()))
+    return (url, canonical_params) + extra
+
+
+def query_fingerprint(params):
+    """Short digest of a query's params, equal for the same query in every process (unlike `hash`)."""
+    return hashlib.sha1(repr(canonical_request_key(None, params)[1]).encode("utf-8")).hexdigest()[:12]
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    Bounded LRU + TTL cache of raw response bodies with single-flight de-duplication.
+
+    Values are `(status_code, body_bytes)` tuples. Concurrent `get_or_fetch` calls for the same key wait on the
+    first caller's request instead of issuing their own; only values accepted by `cacheable` are stored.
+    """
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE, ttl=DEFAULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.bytes_saved = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get_or_fetch(self, key, fetch_fn, cacheable=lambda value: True):
+        if not self.enabled:
+            return fetch_fn()
+
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                self.bytes_saved += len(value[1])
+                return value
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _InFlight()
+                self._in_flight[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            with self._lock:
+                self.bytes_saved += len(flight.value[1])
+            return flight.value
+
+        try:
+            flight.value = fetch_fn()
+            if cacheable(flight.value):
+                self.put(key, flight.value)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.done.set()
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "bytes_saved": self.bytes_saved,
+                "entries": len(self._entries),
+            }
+
+
+_cache = None
+_cache_settings = {}
+_cache_lock = threading.Lock()
+
+
+def configure_response_cache(**settings):
+    """Sets the options for the per-process `ResponseCache`; `max_entries=0` disables caching."""
+    global _cache
+    with _cache_lock:
+        _cache_settings.clear()
+        _cache_settings.update({key: value for key, value in settings.items() if value is not None})
+        _cache = None
+
+
+def get_response_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(**_cache_settings)
+        return _cache
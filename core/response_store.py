@@ -0,0 +1,224 @@
+import fcntl
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from urllib.parse import urlsplit, urlunsplit
+
+from core.constants import HTTPStatusCodes
+from core.response_cache import canonical_request_key
+
+DEFAULT_STORE_TTL = 3600
+DEFAULT_STORE_MAX_MB = 512
+STORE_FOLDER = "response_store"
+
+# magic, status code, created-at (epoch seconds); followed by the zlib-compressed body
+_HEADER = struct.Struct("<4sHd")
+_MAGIC = b"CAD1"
+
+
+def normalise_url(url):
+    """Lower-cases scheme and host and drops a trailing slash so equivalent URLs share a key."""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), "", ""))
+
+
+def request_fingerprint(url, params):
+    """SHA-256 hex digest identifying a GET request by its normalised URL and canonical params."""
+    raw = json.dumps(canonical_request_key(normalise_url(url), params), separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_storable_status(status_code):
+    """
+    Whether a response may be shared through the store: 2xx and 4xx answers repeat on every fetch, while 5xx and
+    429 (rate limited) ones only describe the moment they were fetched.
+    """
+    return status_code // 100 in (2, 4) and status_code != HTTPStatusCodes.TOO_MANY_REQUESTS.value
+
+
+class ResponseStore:
+    """
+    Content-addressed response store shared by all pytest-xdist workers through the file system.
+
+    Each entry lives at `<root>/<key[:2]>/<key>.z`, where the key is the SHA-256 of the normalised URL and params.
+    A per-key `flock` guarantees that exactly one worker fetches a missing key while the others block and then
+    read the stored body (memory-mapped) once it lands.
+    """
+    def __init__(self, root, ttl=DEFAULT_STORE_TTL, max_bytes=DEFAULT_STORE_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.waited = 0
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.z")
+
+    def get_or_fetch(self, url, params, fetch_fn, cacheable=lambda value: True):
+        """
+        Returns `(status_code, body)` for the request, from disk when a fresh entry exists.
+        `fetch_fn` is called by at most one process per key at a time; values rejected by `cacheable` are not stored.
+        """
+        key = request_fingerprint(url, params)
+        path = self._path(key)
+
+        value = self._read(path)
+        if value is not None:
+            self._count("hits")
+            return value
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._key_lock(path) as waited:
+            value = self._read(path)
+            if value is not None:
+                self._count("waited" if waited else "hits")
+                return value
+
+            self._count("misses")
+            value = fetch_fn()
+            if cacheable(value):
+                self._write(path, value)
+            return value
+
+    @contextmanager
+    def _key_lock(self, path):
+        with open(f"{path}.lock", "a+b") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                waited = False
+            except BlockingIOError:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                waited = True
+            try:
+                yield waited
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self, path):
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, status_code, created_at = _HEADER.unpack_from(mapped)
+                if magic != _MAGIC or time.time() - created_at > self.ttl:
+                    return None
+                return status_code, zlib.decompress(mapped[_HEADER.size:])
+        except (FileNotFoundError, ValueError, struct.error, zlib.error):
+            return None
+
+    def _write(self, path, value):
+        status_code, body = value
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, status_code, time.time()))
+            f.write(zlib.compress(body, 6))
+        os.replace(tmp_path, path)
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def evict(self):
+        """
+        Removes expired entries, then the least recently used ones until the store fits in `max_bytes`.
+        Returns the number of removed entries. Stats of sessions older than the TTL are dropped as well, and so are
+        the lock files of entries that no longer exist and temporary files left behind by interrupted writes.
+        """
+        now = time.time()
+        entries, removed = [], 0
+        for stats_file in glob.glob(os.path.join(self.root, "stats", "*", "*.json")):
+            if now - os.path.getmtime(stats_file) > self.ttl:
+                self._remove(stats_file)
+        for path in glob.glob(os.path.join(self.root, "*", "*.z")):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                removed += self._remove(path)
+            else:
+                entries.append((stat.st_atime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            removed += self._remove(path)
+            total -= size
+            evicted += 1
+
+        kept = {path for _, _, path in entries[evicted:]}
+        for lock_path in glob.glob(os.path.join(self.root, "*", "*.z.lock")):
+            if lock_path[:-len(".lock")] not in kept:
+                self._remove_lock(lock_path)
+        for tmp_path in glob.glob(os.path.join(self.root, "*", "*.z.*.tmp")):
+            try:
+                if now - os.path.getmtime(tmp_path) > self.ttl:
+                    self._remove(tmp_path)
+            except FileNotFoundError:
+                continue
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def _remove_lock(path):
+        """Unlinks a key's lock file unless a process holds it right now, i.e. is fetching that key."""
+        try:
+            with open(path, "rb") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                os.remove(path)
+        except (BlockingIOError, FileNotFoundError):
+            pass
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "waited": self.waited, "misses": self.misses}
+
+    def dump_stats(self, session_id, worker):
+        """Persists this process' counters so the controlling process can aggregate them at session end."""
+        stats_dir = os.path.join(self.root, "stats", session_id)
+        os.makedirs(stats_dir, exist_ok=True)
+        with open(os.path.join(stats_dir, f"{worker}.json"), "w", encoding="utf-8") as f:
+            json.dump(self.stats(), f)
+
+    def session_summary(self, session_id):
+        """Sums the counters dumped by every worker of the session and returns them with the overall hit rate."""
+        totals = {"hits": 0, "waited": 0, "misses": 0}
+        for stats_file in glob.glob(os.path.join(self.root, "stats", session_id, "*.json")):
+            with open(stats_file, encoding="utf-8") as f:
+                for counter, value in json.load(f).items():
+                    totals[counter] = totals.get(counter, 0) + value
+        lookups = sum(totals.values())
+        totals["hit_rate"] = (totals["hits"] + totals["waited"]) / lookups if lookups else 0.0
+        return totals
+
+
+_store = None
+
+
+def configure_response_store(root=None, **settings):
+    """Enables the shared on-disk store for this process; `root=None` disables it."""
+    global _store
+    _store = ResponseStore(root, **settings) if root else None
+    return _store
+
+
+def get_response_store():
+    return _store
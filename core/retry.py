@@ -1,25 +1,194 @@
+import fcntl
 import functools
+import os
+import random
+import struct
+import threading
 import time
+from collections import Counter
+from contextlib import contextmanager
 
+import requests
 
-def retry(max_retries=3, delay=2):
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 8.0
+DEFAULT_RETRY_BUDGET = 30
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+RETRY_BUDGET_FOLDER = "retry_budget"
+
+_USED = struct.Struct("<Q")  # retries taken by all processes of the session
+
+
+class TransientHTTPError(Exception):
+    """An HTTP status worth retrying (502/503/504), raised by callers that check response codes."""
+    def __init__(self, status_code, message=None):
+        super().__init__(message or f"Transient HTTP {status_code}")
+        self.status_code = status_code
+
+
+RETRYABLE_EXCEPTIONS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    ConnectionError,
+    TimeoutError,
+    TransientHTTPError,
+)
+
+
+def is_transient_status(status_code):
+    return status_code in RETRYABLE_STATUS_CODES
+
+
+class SharedRetryBudget:
+    """Counts the retries of every pytest-xdist worker in a small file, under an exclusive `flock`."""
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _used(self):
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(self._fd, _USED.size, 0)
+                state = [_USED.unpack(raw)[0] if len(raw) == _USED.size else 0]
+                yield state
+                os.pwrite(self._fd, _USED.pack(state[0]), 0)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def reset(self):
+        """Starts a session with nothing used (done once, by the controlling process)."""
+        with self._used() as state:
+            state[0] = 0
+
+    def take(self, budget):
+        """Takes one retry when all processes together have taken fewer than `budget`."""
+        with self._used() as state:
+            if state[0] >= budget:
+                return False
+            state[0] += 1
+            return True
+
+    def used(self):
+        with self._used() as state:
+            return state[0]
+
+    def close(self):
+        os.close(self._fd)
+
+
+class RetryEngine:
+    """
+    Retries transient failures only (connection errors, timeouts, 502/503/504) with capped exponential backoff and
+    full jitter, drawing every retry from a session budget: this process' own, or with `shared_budget` the one of
+    all xdist workers together.
+
+    Assertion failures and other errors are raised at once, so a real test failure costs one call instead of
+    `max_attempts` calls plus sleeps. While pytest-rerunfailures re-runs a test (`in_rerun`), calls are not retried
+    again here: the rerun already is the retry.
+    """
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY,
+                 budget=DEFAULT_RETRY_BUDGET, shared_budget=None, sleep=time.sleep):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.shared_budget = shared_budget
+        self.in_rerun = False
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.slept = 0.0
+        self.budget_exhausted = 0
+        self.reasons = Counter()
+
+    def is_retryable(self, error):
+        return isinstance(error, RETRYABLE_EXCEPTIONS)
+
+    def backoff(self, retry_number, base_delay=None):
+        """Full-jitter delay before retry `retry_number` (1-based): uniform in [0, min(max_delay, base * 2^(n-1))]."""
+        base_delay = self.base_delay if base_delay is None else base_delay
+        return random.uniform(0, min(self.max_delay, base_delay * 2 ** (retry_number - 1)))
+
+    def _take_retry(self, error):
+        with self._lock:
+            if self.retries >= self.budget if self.shared_budget is None else not self.shared_budget.take(self.budget):
+                self.budget_exhausted += 1
+                return False
+            self.retries += 1
+            self.reasons[getattr(error, "status_code", None) or type(error).__name__] += 1
+            return True
+
+    def call(self, fn, *args, max_attempts=None, base_delay=None, **kwargs):
+        max_attempts = 1 if self.in_rerun else (max_attempts or self.max_attempts)
+        with self._lock:
+            self.calls += 1
+        attempt = 1
+        while True:
+            with self._lock:
+                self.attempts += 1
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt >= max_attempts or not self.is_retryable(e) or not self._take_retry(e):
+                    raise
+                delay = self.backoff(attempt, base_delay)
+                with self._lock:
+                    self.slept += delay
+                self._sleep(delay)
+                attempt += 1
+
+    def stats(self):
+        used = self.retries if self.shared_budget is None else self.shared_budget.used()
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "sleep_s": round(self.slept, 3),
+                "budget_left": max(self.budget - used, 0),
+                "budget_exhausted": self.budget_exhausted,
+                "reasons": {str(reason): count for reason, count in self.reasons.items()},
+            }
+
+
+_engine = RetryEngine()
+
+
+def configure_retry_engine(budget_path=None, **settings):
+    """
+    Replaces this process' retry engine (see `RetryEngine` for the accepted settings). With `budget_path`, the
+    budget is shared with every process configured with the same file.
+    """
+    global _engine
+    if _engine.shared_budget is not None:
+        _engine.shared_budget.close()
+    if budget_path:
+        settings["shared_budget"] = SharedRetryBudget(budget_path)
+    _engine = RetryEngine(**{key: value for key, value in settings.items() if value is not None})
+    return _engine
+
+
+def get_retry_engine():
+    return _engine
+
+
+def retry(max_retries=DEFAULT_MAX_ATTEMPTS, delay=None):
     """
-    Decorator to automatically retry a function upon failure.
+    Decorator retrying the wrapped call on transient transport/HTTP errors through the session `RetryEngine`.
 
-    Retries the wrapped function up to `max_retries` times with a delay between attempts,
-    handling common exceptions like AssertionError, ValueError, and ConnectionError.
+    Makes up to `max_retries` attempts, waiting an exponentially growing, jittered delay based on `delay` seconds
+    (the engine default when None) between them.
     """
     def decorator_retry(func):
         @functools.wraps(func)
         def wrapper_retry(*args, **kwargs):
-            for attempt in range(max_retries):
-                try:
-                    return func(*args, **kwargs)
-                except (AssertionError, ValueError, ConnectionError) as e:
-                    if attempt < max_retries - 1:
-                        print(f"Attempt {attempt + 1} failed: {e}. Retrying in {delay} seconds...")
-                        time.sleep(delay)
-                    else:
-                        raise
+            return get_retry_engine().call(func, *args, max_attempts=max_retries, base_delay=delay, **kwargs)
         return wrapper_retry
     return decorator_retry
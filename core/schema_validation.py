@@ -0,0 +1,110 @@
+import copy
+import threading
+from itertools import chain
+
+from jsonschema import validators
+from jsonschema.exceptions import best_match
+
+from core.constants import ASTEROID_API_SCHEMA, ResponseKeys
+from core.request_timing import get_request_timer
+
+_JSON_TYPES = {
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "null": (type(None),),
+    "boolean": (bool,),
+}
+
+
+class CompiledSchema:
+    """
+    A schema checked and compiled once, split into a top-level validator and a bulk path for the `data` rows.
+
+    The top level is validated with `data` reduced to `{"type": "array"}`; rows are checked in one pass over all
+    cells (`set(map(type, ...))`) when the row schema is a plain array of simple JSON types. Only when that pass
+    finds a mismatch is the offending row run through the compiled row validator, so the raised error (message,
+    `path`) is the one `jsonschema.validate` would have raised.
+    """
+    def __init__(self, schema):
+        validator_class = validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        self.schema = schema
+        self.validator = validator_class(schema)
+
+        data_schema = schema.get("properties", {}).get(ResponseKeys.DATA.value, {})
+        row_schema = data_schema.get("items")
+        self.row_validator = validator_class(row_schema) if row_schema is not None else None
+        self.cell_types = _cell_types(row_schema)
+        if self.row_validator is not None:
+            top_level = copy.deepcopy(schema)
+            top_level["properties"][ResponseKeys.DATA.value] = {
+                key: value for key, value in data_schema.items() if key != "items"
+            }
+            self.top_level_validator = validator_class(top_level)
+        else:
+            self.top_level_validator = self.validator
+
+    def validate(self, instance):
+        """Raises `jsonschema.ValidationError` for the first problem found, like `jsonschema.validate`."""
+        error = best_match(self.top_level_validator.iter_errors(instance))
+        if error is not None:
+            raise error
+        rows = instance.get(ResponseKeys.DATA.value) if isinstance(instance, dict) else None
+        if self.row_validator is None or not isinstance(rows, list) or not rows:
+            return
+        if self.cell_types is not None and self._rows_look_valid(rows):
+            return
+        for index, row in enumerate(rows):
+            error = best_match(self.row_validator.iter_errors(row))
+            if error is not None:
+                error.path.extendleft([index, ResponseKeys.DATA.value])
+                raise error
+
+    def _rows_look_valid(self, rows):
+        if set(map(type, rows)) != {list}:
+            return False
+        return set(map(type, chain.from_iterable(rows))).issubset(self.cell_types)
+
+
+def _cell_types(row_schema):
+    """
+    Exact Python types accepted for a cell (compared with `type()`, so `True` is not a number), or None when the row
+    schema is anything other than a plain array of simple JSON types.
+    """
+    if not row_schema or set(row_schema) - {"type", "items"} or row_schema.get("type") != "array":
+        return None
+    cell_schema = row_schema.get("items")
+    if not isinstance(cell_schema, dict):
+        return None
+    branches = cell_schema["anyOf"] if set(cell_schema) == {"anyOf"} else [cell_schema]
+    accepted = set()
+    for branch in branches:
+        if set(branch) != {"type"}:
+            return None
+        for json_type in branch["type"] if isinstance(branch["type"], list) else [branch["type"]]:
+            if json_type not in _JSON_TYPES:
+                return None
+            accepted.update(_JSON_TYPES[json_type])
+    return frozenset(accepted)
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_schema_validator(schema=ASTEROID_API_SCHEMA):
+    """Returns the `CompiledSchema` for `schema`, compiling it once per process (keyed by the schema object)."""
+    compiled = _registry.get(id(schema))
+    if compiled is None or compiled.schema is not schema:
+        with _registry_lock:
+            compiled = _registry.get(id(schema))
+            if compiled is None or compiled.schema is not schema:
+                compiled = _registry[id(schema)] = CompiledSchema(schema)
+    return compiled
+
+
+def validate_response(instance, schema=ASTEROID_API_SCHEMA):
+    """Drop-in for `jsonschema.validate(instance=..., schema=...)` using the per-process compiled validator."""
+    with get_request_timer().phase("validate"):
+        get_schema_validator(schema).validate(instance)
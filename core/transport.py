@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from core.request_timing import note_connection
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+
+
+class _TimedConnectionMixin:
+    """Reports how long opening the socket (TCP) and the rest of `connect()` (TLS handshake) took."""
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        self._tcp_seconds = time.perf_counter() - start
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        tcp = getattr(self, "_tcp_seconds", 0.0)
+        tls = time.perf_counter() - start - tcp if isinstance(self, HTTPSConnection) else 0.0
+        note_connection(tcp, max(tls, 0.0))
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool,
+                                                   "https": _TimedHTTPSConnectionPool}
+
+
+class HttpTransport:
+    """
+    Pooled keep-alive HTTP transport shared by every request made in the current process.
+
+    Wraps a single `requests.Session` whose adapters keep up to `pool_size` connections per host alive,
+    so consecutive tests (and load threads) reuse TCP/TLS connections instead of re-handshaking each call.
+    New connections report their TCP and TLS setup time to `core/request_timing.py`.
+    """
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, keep_alive=True):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.keep_alive = keep_alive
+        self.session = requests.Session()
+        self.adapter = _TimedHTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+        self._lock = threading.Lock()
+        self._requests = 0
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        """Send a GET through the pooled session; `timeout` overrides the transport default for this call."""
+        response = self.session.get(url, params=params, timeout=timeout or self.timeout, **kwargs)
+        with self._lock:
+            self._requests += 1
+        return response
+
+    def stats(self):
+        """
+        Returns connection reuse counters for this process.
+
+        `connections_opened` counts new TCP connections created by the pools, `reused` is the number of
+        requests served over an already-open connection.
+        """
+        opened, pooled_requests = 0, 0
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            pooled_requests += pool.num_requests
+        with self._lock:
+            total = self._requests
+        return {
+            "requests": total,
+            "connections_opened": opened,
+            "reused": max(pooled_requests - opened, 0),
+            "pool_size": self.pool_size,
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_transport = None
+_transport_pid = None
+_transport_settings = {}
+_transport_lock = threading.Lock()
+
+
+def configure_transport(**settings):
+    """
+    Sets the options used to build the per-process transport (see `HttpTransport` for the accepted keys).
+    Any transport already created in this process is closed and rebuilt on next use.
+    """
+    global _transport
+    with _transport_lock:
+        _transport_settings.clear()
+        _transport_settings.update({key: value for key, value in settings.items() if value is not None})
+        if _transport is not None:
+            _transport.close()
+            _transport = None
+
+
+def get_transport():
+    """Returns the transport for the current process, creating it lazily (and again after a fork)."""
+    global _transport, _transport_pid
+    with _transport_lock:
+        if _transport is None or _transport_pid != os.getpid():
+            _transport = HttpTransport(**_transport_settings)
+            _transport_pid = os.getpid()
+        return _transport
@@ -3,3 +3,4 @@ from modules.backend_tests.general.request_builder_asteroids import AsteroidRequ
 from modules.backend_tests.helpers.helper_asteroids_data import HelperAsteroidData
 from modules.backend_tests.helpers.helper_thread import HelperThread
 from modules.backend_tests.tests.tests_asteroid_api.test_data import *
+from modules.backend_tests.tests.tests_offline.test_data import *
@@ -1,8 +1,32 @@
-from core import get_request
+import os
+
+from core import get_request, CadModes
 
 
 class AsteroidAPIController:
-    BASE_URL = "https://ssd-api.jpl.nasa.gov/cad.api"
+    # point the suite at a local stand-in with CAD_API_BASE_URL (or the --cad-base-url option)
+    BASE_URL = os.environ.get("CAD_API_BASE_URL", "https://ssd-api.jpl.nasa.gov/cad.api")
+
+    # shared by all instances; set once per process by `use_cassette` (see the --cad-mode option)
+    mode = CadModes.LIVE
+    cassette = None
+
+    @classmethod
+    def use_cassette(cls, mode, cassette=None):
+        cls.mode = CadModes(mode)
+        cls.cassette = cassette if cls.mode != CadModes.LIVE else None
+
+    def get_close_approach_data(self, params, timeout=None, stream=False):
+        """
+        With `stream=True` a live response body is left unread for `response.iter_content()`; recording needs the
+        whole body, so record mode always reads it.
+        """
+        params = params if params else {}
+        if self.mode == CadModes.REPLAY:
+            return self.cassette.replay(self.BASE_URL, params)
 
-    def get_close_approach_data(self, params):
-        return get_request(url=self.BASE_URL, params=params if params else {})
+        response = get_request(url=self.BASE_URL, params=params, timeout=timeout,
+                               stream=stream and self.mode == CadModes.LIVE)
+        if self.mode == CadModes.RECORD:
+            self.cassette.record(self.BASE_URL, params, response)
+        return response
@@ -0,0 +1,34 @@
+import aiohttp
+
+from core.responses import BufferedResponse
+from core.transport import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from modules.backend_tests.controllers.asteroid_api_controller import AsteroidAPIController
+
+
+class AsyncAsteroidAPIController:
+    """
+    asyncio counterpart of `AsteroidAPIController` for load generation.
+
+    One `aiohttp` session (and keep-alive connection pool of `max_connections`) is shared by every call made
+    inside the `async with` block; the target URL follows `AsteroidAPIController.BASE_URL`.
+    """
+    def __init__(self, max_connections=100, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT):
+        self.base_url = AsteroidAPIController.BASE_URL
+        self.max_connections = max_connections
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def get_close_approach_data(self, params):
+        params = {str(key): str(value) for key, value in (params or {}).items()}
+        async with self.session.get(self.base_url, params=params) as response:
+            content = await response.read()
+            return BufferedResponse(str(response.url), response.status, content, dict(response.headers))
@@ -1,5 +1,20 @@
+import json
+import math
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+
 from modules.backend_tests import AsteroidAPIController
-from core import HTTPStatusCodes, retry
+from core import HTTPStatusCodes, ResponseKeys, retry
+from core.retry import TransientHTTPError, is_transient_status
+from core.cad_columns import CadColumns
+from core.cad_shards import DATE_MAX_PARAM, DATE_MIN_PARAM, merge_by_jd, parse_window_date, window_params
+from core.json_stream import CadStream, DEFAULT_CHUNK_SIZE
+from core.request_timing import get_request_timer
+from core.response_cache import canonical_request_key, get_response_cache, query_fingerprint
+from core.response_store import get_response_store, is_storable_status
 
 
 class HelperAsteroidData:
@@ -7,14 +22,168 @@ class HelperAsteroidData:
     Utility class to fetch and validate asteroid API responses.
 
     Handles GET requests to the close-approach endpoint and asserts response status codes.
-    Retries on failure to reduce flakiness in tests.
+    Transient failures (connection errors, timeouts, 502/503/504) are retried with backoff by the session retry
+    engine (see `core/retry.py`); any other unexpected status fails at once.
+    Identical queries are served from the per-process response cache (see `core/response_cache.py`) and,
+    when enabled, from the on-disk store shared by all xdist workers (see `core/response_store.py`).
+    JSON decoding is timed as the `decode` phase of the request that fetched the body (`core/request_timing.py`).
     """
     def __init__(self):
         self.controller = AsteroidAPIController()
 
     @retry()
     def fetch_data(self, expected_status_code=HTTPStatusCodes.OK.value, **params):
-        response = self.controller.get_close_approach_data(params)
-        assert response.status_code == expected_status_code, (f"Expected: {expected_status_code}, "
-                                                              f"actual response: {response.status_code}")
-        return response.json()
+        timer = get_request_timer()
+        timer.detach()
+        status_code, body = self._fetch_body(expected_status_code, params)
+        if status_code != expected_status_code and is_transient_status(status_code):
+            raise TransientHTTPError(status_code)
+        assert status_code == expected_status_code, (f"Expected: {expected_status_code}, "
+                                                     f"actual response: {status_code}")
+        with timer.phase("decode"):
+            return json.loads(body)
+
+    def prefetch(self, queries, concurrency=8):
+        """
+        Warms the response cache (and the shared store, when enabled) with `queries` concurrently.
+
+        Args:
+            queries (list): `(expected_status_code, params)` pairs, already de-duplicated.
+            concurrency (int): Requests in flight at once.
+
+        Returns:
+            list: the queries that could not be warmed (unexpected status or error); their tests fetch them again.
+        """
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+            futures = {executor.submit(self._warm, expected, params): (expected, params)
+                       for expected, params in queries}
+            for future in futures:
+                try:
+                    if not future.result():
+                        failed.append(futures[future])
+                except Exception as e:
+                    pytest.logger.warning(f"Prefetch of {futures[future][1]} failed: {e!r}")
+                    failed.append(futures[future])
+        return failed
+
+    @retry()
+    def _warm(self, expected_status_code, params):
+        status_code, _ = self._fetch_body(expected_status_code, params)
+        if status_code != expected_status_code and is_transient_status(status_code):
+            raise TransientHTTPError(status_code)
+        return status_code == expected_status_code
+
+    def fetch_columns(self, expected_status_code=HTTPStatusCodes.OK.value, **params):
+        """Same as `fetch_data`, decoded into NumPy columns for whole-column bound checks (`core/cad_columns.py`)."""
+        return CadColumns.from_payload(self.fetch_data(expected_status_code, **params))
+
+    def fetch_sharded(self, expected_status_code=HTTPStatusCodes.OK.value, shards=4, max_workers=None,
+                      target_rows=None, **params):
+        """
+        Fetches a wide `date-min`/`date-max` query as concurrent sub-window requests and merges them by `jd`.
+
+        Args:
+            expected_status_code (int): Status every sub-window must return.
+            shards (int): Number of windows the range is split into at first (and the default concurrency).
+            max_workers (int): Sub-window requests in flight at once (defaults to `shards`).
+            target_rows (int): When set, later windows are resized from the row density of the finished ones to
+                hold about this many rows, so dense periods get narrow windows and sparse ones wide windows.
+            **params: Query params; `date-min`/`date-max` must be absolute `YYYY-MM-DD` dates.
+
+        Returns:
+            dict: one response (`signature`, `fields`, `data`, `count`) with rows sorted by `jd`, rows repeated on
+            window boundaries removed and `count` set to the merged row count.
+        """
+        start, end = parse_window_date(params.get(DATE_MIN_PARAM)), parse_window_date(params.get(DATE_MAX_PARAM))
+        window_days = max(math.ceil(max((end - start).days, 1) / shards), 1)
+        workers = max_workers or shards
+        windows, pending, cursor, submitted = [], {}, start, 0
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            def submit_windows():
+                nonlocal cursor, submitted
+                # a single-day range (start == end) still needs its one window
+                while (cursor < end or not submitted) and len(pending) < workers:
+                    submitted += 1
+                    window_end = min(cursor + timedelta(days=window_days), end)
+                    future = executor.submit(self.fetch_data, expected_status_code,
+                                             **window_params(params, cursor, window_end))
+                    pending[future] = (cursor, window_end)
+                    cursor = window_end
+
+            submit_windows()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window_start, window_end = pending.pop(future)
+                    result = future.result()
+                    windows.append((window_start, result))
+                    if target_rows:
+                        rows = int(result.get(ResponseKeys.COUNT.value, 0))
+                        days = max((window_end - window_start).days, 1)
+                        window_days = max(round(target_rows * days / rows), 1) if rows else window_days * 2
+                submit_windows()
+
+        return self._merge_windows([result for _, result in sorted(windows, key=lambda window: window[0])])
+
+    @staticmethod
+    def _merge_windows(results):
+        """Merges per-window responses and reconciles `count` with the de-duplicated rows."""
+        with_data = [result for result in results if result.get(ResponseKeys.DATA.value)]
+        merged = {key: value for key, value in results[0].items() if key != ResponseKeys.DATA.value}
+        if not with_data:
+            merged[ResponseKeys.COUNT.value] = type(merged.get(ResponseKeys.COUNT.value, 0))(0)
+            return merged
+
+        fields = with_data[0]["fields"]
+        assert all(result["fields"] == fields for result in with_data), "Sub-windows returned different fields"
+        fetched = sum(len(result[ResponseKeys.DATA.value]) for result in with_data)
+        data = list(merge_by_jd(fields, [result[ResponseKeys.DATA.value] for result in with_data]))
+
+        count_type = type(with_data[0][ResponseKeys.COUNT.value])
+        merged.update({"fields": fields, ResponseKeys.COUNT.value: count_type(len(data)),
+                       ResponseKeys.DATA.value: data})
+        pytest.logger.debug(f"Merged {len(results)} date windows: {fetched} rows fetched, "
+                            f"{fetched - len(data)} boundary duplicates dropped")
+        return merged
+
+    @contextmanager
+    def fetch_stream(self, expected_status_code=HTTPStatusCodes.OK.value, chunk_size=DEFAULT_CHUNK_SIZE, **params):
+        """
+        Streams the response instead of buffering it (see `core/json_stream.py`).
+
+        Yields a `CadStream` whose `header` (`count`, `fields`, `signature`) is parsed up front and whose `rows()` /
+        `batches()` are decoded while the body downloads. Not retried and never cached: for windows too wide to hold.
+        """
+        response = self.controller.get_close_approach_data(params, stream=True)
+        try:
+            assert response.status_code == expected_status_code, (f"Expected: {expected_status_code}, "
+                                                                   f"actual response: {response.status_code}")
+            yield CadStream(response.iter_content(chunk_size))
+        finally:
+            response.close()
+
+    def _fetch_body(self, expected_status_code, params):
+        """
+        Returns `(status_code, body)` for the query, coalescing identical in-flight calls.
+        Only responses that match `expected_status_code` are cached, so a failed attempt is always re-fetched.
+        """
+        def fetch():
+            response = self.controller.get_close_approach_data(params)
+            return response.status_code, response.content
+
+        store = get_response_store()
+        if store is not None:
+            fetch_live = fetch
+
+            def fetch():
+                return store.get_or_fetch(
+                    self.controller.BASE_URL, params, fetch_live, cacheable=lambda value: is_storable_status(value[0])
+                )
+
+        get_request_timer().note_fingerprint(query_fingerprint(params))
+        key = canonical_request_key(self.controller.BASE_URL, params, expected_status_code)
+        return get_response_cache().get_or_fetch(
+            key, fetch, cacheable=lambda value: value[0] == expected_status_code
+        )
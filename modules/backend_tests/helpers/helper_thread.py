@@ -1,73 +1,185 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from core import HTTPStatusCodes
+import asyncio
+import os
+from core import HTTPStatusCodes, ROOT_WORKING_DIRECTORY, LOGS_FOLDER
+from core.capacity import find_capacity
+from core.distributed_load import DEFAULT_CONNECT_TIMEOUT, LoadCoordinator, wait_for_workers
+from core.log_pipeline import LoggedBody
+from core.load_engine import AsyncLoadEngine
+from modules.backend_tests.controllers.async_asteroid_api_controller import AsyncAsteroidAPIController
+from modules.backend_tests.helpers.load_worker import spawn_cad_load_workers
 import pytest
 
 
 class HelperThread:
     """
-    Utility class to simulate concurrent load on the Asteroids API using threading.
+    Utility class to simulate concurrent load on the Asteroids API.
+
+    Asteroid load runs on a single asyncio event loop (`AsyncLoadEngine`) with at most `concurrency` requests in
+    flight; `threads` is kept as the default request count so existing callers keep their behaviour.
+    The report of the last run (latency, throughput, errors, cancellations) is kept in `last_report`.
     """
-    def __init__(self, threads=20):
+    def __init__(self, threads=20, concurrency=None):
         self.threads = threads
+        self.concurrency = concurrency or threads
+        self.last_report = None
 
-    def simulate_parallel_requests(
-        self,
-        request_fn,
-        expected_success=HTTPStatusCodes.OK.value,
-        expected_failure=HTTPStatusCodes.SERVICE_UNAVAILABLE.value
-    ):
+    def simulate_asteroid_load(self, controller, expected_success=HTTPStatusCodes.OK.value,
+                               expected_failure=HTTPStatusCodes.SERVICE_UNAVAILABLE.value,
+                               requests=None, params=None, timeout=None, processes=None):
         """
-        Executes the provided request function in parallel across multiple threads.
+        Convenience method to simulate load against the Asteroids API using default parameters.
 
         Args:
-            request_fn (Callable): The function to call in each thread. Must return a status code.
-            expected_success (int): Expected HTTP status code for a successful request.
-            expected_failure (int): Expected HTTP status code for a failed (rate-limited) request.
+            controller: An instance with `get_close_approach_data()` method; its `BASE_URL` is targeted.
+            expected_success (int): Expected HTTP 200 OK response code.
+            expected_failure (int): Expected HTTP 503 rate-limited response code.
+            requests (int): Total number of requests to send (defaults to `threads`).
+            params (dict): Query params for every request (defaults to the API defaults).
+            timeout (float): Seconds after which the run is cancelled and the partial result returned.
+            processes (int): When > 1, the requests are split across that many worker processes
+                (see `simulate_distributed_load`).
 
         Returns:
             Tuple[int, int, int]: A count of (successes, failures, unexpected responses).
         """
-        successes, failures, others = 0, 0, 0
-
-        with ThreadPoolExecutor(max_workers=self.threads) as executor:
-            futures = [executor.submit(request_fn) for _ in range(self.threads)]
-
-            for future in as_completed(futures):
-                try:
-                    status_code = future.result()
-                    if status_code == expected_failure:
-                        failures += 1
-                    elif status_code == expected_success:
-                        successes += 1
-                    else:
-                        pytest.logger.warning(f"Unexpected response: {status_code}")
-                        others += 1
-                except Exception as e:
-                    pytest.logger.error(f"Thread call error: {e}")
-                    others += 1
-
-        return successes, failures, others
+        total_requests = requests or self.threads
+        if processes and processes > 1:
+            self.simulate_distributed_load(controller, processes=processes, requests=total_requests,
+                                           params=params, timeout=timeout)
+            return self.last_report.classify(expected_success, expected_failure)
 
-    def simulate_asteroid_load(self, controller, expected_success=HTTPStatusCodes.OK.value,
-                               expected_failure=HTTPStatusCodes.SERVICE_UNAVAILABLE.value):
+        engine = AsyncLoadEngine(concurrency=self.concurrency)
+        self.last_report = self._run_against(
+            controller, params, lambda make_call: engine.run(make_call, total_requests, timeout=timeout)
+        )
+        self._log_report(self.last_report)
+        return self.last_report.classify(expected_success, expected_failure)
+
+    def simulate_open_loop_load(self, controller, rate, duration, params=None, max_in_flight=None):
         """
-        Convenience method to simulate load against the Asteroids API using default parameters.
+        Holds a constant request rate against the Asteroids API for a fixed duration (open loop).
 
         Args:
-            controller: An instance with `get_close_approach_data()` method.
-            expected_success (int): Expected HTTP 200 OK response code.
-            expected_failure (int): Expected HTTP 503 rate-limited response code.
+            controller: An instance with `get_close_approach_data()` method; its `BASE_URL` is targeted.
+            rate (float): Requests started per second, independent of response times.
+            duration (float): Seconds to keep sending.
+            params (dict): Query params for every request (defaults to the API defaults).
+            max_in_flight (int): Outstanding requests above which new sends are dropped (defaults to `concurrency`).
 
         Returns:
-            Tuple[int, int, int]: A count of (successes, failures, unexpected responses).
+            LoadReport: latency percentiles (`report.percentile(99)`), throughput and status mix over time.
         """
+        engine = AsyncLoadEngine(concurrency=self.concurrency)
+        self.last_report = self._run_against(
+            controller, params,
+            lambda make_call: engine.run_open_loop(make_call, rate, duration, max_in_flight=max_in_flight)
+        )
+        self._log_report(self.last_report)
+        return self.last_report
 
-        def make_call():
-            response = controller.get_close_approach_data({})
-            return response.status_code
+    def simulate_distributed_load(self, controller, processes=4, remote_workers=0, rate=None, duration=None,
+                                  requests=None, params=None, coordinator_host="127.0.0.1", timeout=None,
+                                  connect_timeout=DEFAULT_CONNECT_TIMEOUT):
+        """
+        Runs the load from several worker processes (and optionally other hosts) and merges their results.
 
-        return self.simulate_parallel_requests(
-            request_fn=make_call,
-            expected_success=expected_success,
-            expected_failure=expected_failure
+        Each worker runs its own event loop and HTTP session on `1/N` of the load and streams mergeable latency
+        histograms and counters back to a local coordinator socket, so the GIL and JSON decoding of one process
+        no longer cap the offered load.
+
+        Args:
+            controller: An instance with `get_close_approach_data()` method; its `BASE_URL` is targeted.
+            processes (int): Worker processes started on this machine.
+            remote_workers (int): Additional workers expected to join from other hosts via
+                `python -m modules.backend_tests.helpers.load_worker --coordinator <host:port>`.
+            rate (float), duration (float): Open-loop mode, total rate across all workers.
+            requests (int): Closed-loop mode, total request count across all workers (used when `rate` is None).
+            params (dict): Query params for every request (defaults to the API defaults).
+            coordinator_host (str): Interface the coordinator listens on; use `0.0.0.0` for remote workers.
+            timeout (float): Seconds to wait for all workers before returning the partial aggregate.
+            connect_timeout (float): Seconds all workers get to connect before the run fails with `TimeoutError`.
+
+        Returns:
+            LoadReport: the merged report of every worker.
+        """
+        job = {"url": controller.BASE_URL, "params": params or {}, "concurrency": self.concurrency}
+        if rate is not None:
+            job.update(mode="open_loop", rate=rate, duration=duration)
+        else:
+            job.update(mode="closed_loop", requests=requests or self.threads, timeout=timeout)
+
+        coordinator = LoadCoordinator(job, workers=processes + remote_workers, host=coordinator_host,
+                                      connect_timeout=connect_timeout).start()
+        pytest.logger.info(f"Load coordinator on {coordinator.address}, waiting for {processes} local and "
+                           f"{remote_workers} remote workers")
+        workers = spawn_cad_load_workers(f"127.0.0.1:{coordinator.port}", processes)
+        self.last_report = wait_for_workers(coordinator, workers, timeout)
+        pytest.logger.debug("Distributed load report (%s workers finished): %s", coordinator.finished_workers,
+                            LoggedBody(self.last_report.summary()))
+        return self.last_report
+
+    def discover_capacity(self, controller, start_rate=1, max_rate=500, step_duration=10, params=None,
+                          artifacts_dir=None, concurrency_levels=None, **criteria):
+        """
+        Ramps, then binary-searches, the open-loop request rate to find the highest RPS sustained without 503s
+        or latency blow-up, optionally once per in-flight limit (see `core.capacity.find_capacity` for the pass
+        criteria accepted in `criteria`).
+
+        Args:
+            controller: An instance with `get_close_approach_data()` method; its `BASE_URL` is targeted.
+            start_rate (float): First probed rate; each ramp step doubles it.
+            max_rate (float): Upper bound of the ramp.
+            step_duration (float): Seconds each rate is held.
+            params (dict): Query params for every request (defaults to the API defaults).
+            artifacts_dir (str): Where the JSON/CSV curve is written (defaults to `output/capacity`).
+            concurrency_levels (list): In-flight request limits to search the rate at, one curve each; by default
+                a single curve allows ~2 s worth of outstanding requests.
+
+        Returns:
+            CapacityResult: the knee point (`knee_rps`, and `knee_concurrency` when searched) and every probed point
+                of the throughput-vs-latency curve.
+        """
+        engine = AsyncLoadEngine(concurrency=self.concurrency)
+        max_connections = max(self.concurrency, int(max_rate), *(concurrency_levels or []))
+
+        async def run_search(make_call):
+            async def run_step(rate, concurrency=None):
+                # by default allow ~2 s worth of outstanding requests before a step counts as saturated
+                max_in_flight = concurrency or max(self.concurrency, int(rate * 2))
+                report = await engine.run_open_loop(make_call, rate, step_duration, max_in_flight=max_in_flight)
+                pytest.logger.info(f"Capacity probe at {rate:.1f} rps, {max_in_flight} in flight: {report.summary()}")
+                return report
+
+            return await find_capacity(run_step, start_rate=start_rate, max_rate=max_rate,
+                                       concurrency_levels=concurrency_levels, **criteria)
+
+        result = self._run_against(controller, params, run_search, max_connections=max_connections)
+        json_path, csv_path = result.write_artifacts(
+            artifacts_dir or os.path.join(ROOT_WORKING_DIRECTORY, LOGS_FOLDER, "capacity")
         )
+        knee = f"{result.knee_rps} rps" + (f" at {result.knee_concurrency} in flight" if concurrency_levels else "")
+        pytest.logger.info(f"Capacity knee: {knee} (curve: {json_path}, {csv_path})")
+        return result
+
+    def _run_against(self, controller, params, run_fn, max_connections=None):
+        """Runs `run_fn(make_call)` on a fresh event loop with an async controller aimed at `controller.BASE_URL`."""
+        async def run_load():
+            async with AsyncAsteroidAPIController(max_connections=max_connections or self.concurrency) \
+                    as async_controller:
+                async_controller.base_url = controller.BASE_URL
+
+                async def make_call():
+                    response = await async_controller.get_close_approach_data(params or {})
+                    return response.status_code
+
+                return await run_fn(make_call)
+
+        return asyncio.run(run_load())
+
+    @staticmethod
+    def _log_report(report):
+        """Logs the `LoadReport` of a run, its call errors at ERROR."""
+        summary = report.summary()
+        if summary["errors"]:
+            pytest.logger.error(f"Load call errors: {summary['errors']}")
+        pytest.logger.debug("Load report: %s", LoggedBody(summary))
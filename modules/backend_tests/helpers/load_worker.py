@@ -0,0 +1,55 @@
+"""
+Load worker process for distributed CAD load runs (see `core/distributed_load.py`).
+
+Local workers are spawned by `HelperThread.simulate_distributed_load`; on other hosts start them by hand,
+pointing at the coordinator address the test logs:
+
+    python -m modules.backend_tests.helpers.load_worker --coordinator 10.0.0.5:47001 --processes 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+from contextlib import asynccontextmanager
+
+from core.distributed_load import run_load_worker
+from modules.backend_tests.controllers.async_asteroid_api_controller import AsyncAsteroidAPIController
+
+
+@asynccontextmanager
+async def cad_request_fn(job):
+    """Yields a request function sending `job["params"]` to `job["url"]` over one keep-alive aiohttp session."""
+    async with AsyncAsteroidAPIController(max_connections=job.get("concurrency", 100)) as controller:
+        controller.base_url = job["url"]
+        params = job.get("params") or {}
+
+        async def make_call():
+            response = await controller.get_close_approach_data(params)
+            return response.status_code
+
+        yield make_call
+
+
+def run_cad_load_worker(address):
+    asyncio.run(run_load_worker(address, cad_request_fn))
+
+
+def spawn_cad_load_workers(address, processes):
+    """Starts `processes` local worker processes connected to the coordinator at `address`."""
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=run_cad_load_worker, args=(address,), daemon=True) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Join a distributed CAD load run as one or more workers.")
+    parser.add_argument("--coordinator", required=True, help="host:port printed by the coordinating test run")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start on this host")
+    args = parser.parse_args()
+    for worker in spawn_cad_load_workers(args.coordinator, args.processes):
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Bulk-downloads CAD close approaches into a columnar snapshot (`core/cad_snapshot.py`) by date window, for offline
+analysis and for the stand-in server, without re-fetching:
+
+    python -m modules.backend_tests.helpers.snapshot_downloader --start 2000-01-01 --end 2030-01-01 --dist-max 0.2
+    pytest --cad-stand-in --cad-stand-in-snapshot output/snapshots/cad
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from core import HTTPStatusCodes, ROOT_WORKING_DIRECTORY, LOGS_FOLDER, ResponseKeys, retry
+from core.cad_shards import parse_window_date, split_date_range, window_params
+from core.cad_snapshot import SNAPSHOTS_FOLDER, CadSnapshot, SnapshotWriter
+from core.retry import TransientHTTPError, configure_retry_engine, is_transient_status
+from modules.backend_tests.controllers.asteroid_api_controller import AsteroidAPIController
+from modules.backend_tests.general.request_builder_asteroids import AsteroidRequestBuilder
+
+DEFAULT_WINDOW_DAYS = 30
+DEFAULT_CONCURRENCY = 4
+DEFAULT_SNAPSHOT = os.path.join(ROOT_WORKING_DIRECTORY, LOGS_FOLDER, SNAPSHOTS_FOLDER, "cad")
+
+
+@retry()
+def fetch_window(controller, params):
+    """One date window as `(fields, data)`; 502/503/504 and connection errors are retried with backoff."""
+    response = controller.get_close_approach_data(params)
+    if is_transient_status(response.status_code):
+        raise TransientHTTPError(response.status_code)
+    if response.status_code != HTTPStatusCodes.OK.value:
+        raise ValueError(f"CAD API answered {response.status_code} for {params}: {response.content[:300]!r}")
+    payload = json.loads(response.content)
+    return payload.get("fields") or [], payload.get(ResponseKeys.DATA.value) or []
+
+
+def new_rows(fields, data, last_jd, written_at_last_jd):
+    """
+    The rows of a window not written yet. Neighbouring windows share their boundary date (CAD bounds are
+    inclusive), so rows up to the last written `jd` already came with the previous window.
+    """
+    jd_index, des_index, orbit_index = fields.index("jd"), fields.index("des"), fields.index("orbit_id")
+    rows = []
+    for row in data:
+        jd = float(row[jd_index])
+        if jd < last_jd or (jd == last_jd and (row[des_index], row[orbit_index]) in written_at_last_jd):
+            continue
+        rows.append(row)
+    return rows
+
+
+def download_snapshot(path, start, end, window_days=DEFAULT_WINDOW_DAYS, concurrency=DEFAULT_CONCURRENCY,
+                      params=None, controller=None, on_window=None):
+    """
+    Downloads `[start, end]` window by window through `AsteroidAPIController` and writes a snapshot to `path`.
+
+    Args:
+        path (str): Snapshot directory (created, existing column files are overwritten).
+        start (datetime), end (datetime): Inclusive date span.
+        window_days (int): Days per request; keep a window well below the API's row limits for dense periods.
+        concurrency (int): Windows in flight at once; they are still written strictly in date order.
+        params (dict): Extra query params, e.g. `{"dist-max": "0.2"}`; `fullname` and `diameter` are always on.
+        controller (AsteroidAPIController): Controller to use (a new one by default).
+        on_window (callable): Called with `(window_start, window_end, rows_written)` after every window.
+
+    Returns:
+        CadSnapshot: the finished snapshot, opened.
+    """
+    controller = controller or AsteroidAPIController()
+    base = {**AsteroidRequestBuilder().with_fullname().with_diameter().build(), **(params or {})}
+    windows = split_date_range(start, end, max(math.ceil(max((end - start).days, 1) / window_days), 1))
+    last_jd, written_at_last_jd = -math.inf, set()
+
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor, \
+            SnapshotWriter(path, source={"url": controller.BASE_URL, "params": base}) as writer:
+        pending = deque()
+        for window in windows:
+            pending.append((window, executor.submit(fetch_window, controller, window_params(base, *window))))
+            if len(pending) < concurrency * 2:  # a bounded read-ahead keeps finished windows from piling up
+                continue
+            last_jd, written_at_last_jd = _write_next(writer, pending, last_jd, written_at_last_jd, on_window)
+        while pending:
+            last_jd, written_at_last_jd = _write_next(writer, pending, last_jd, written_at_last_jd, on_window)
+    return CadSnapshot(path)
+
+
+def _write_next(writer, pending, last_jd, written_at_last_jd, on_window):
+    (window_start, window_end), future = pending.popleft()
+    fields, data = future.result()
+    rows = new_rows(fields, data, last_jd, written_at_last_jd) if data else []
+    writer.append(fields, rows)
+    if rows:
+        jd_index, des_index, orbit_index = fields.index("jd"), fields.index("des"), fields.index("orbit_id")
+        boundary = float(rows[-1][jd_index])
+        keys = {(row[des_index], row[orbit_index]) for row in rows if float(row[jd_index]) == boundary}
+        last_jd, written_at_last_jd = boundary, (written_at_last_jd | keys if boundary == last_jd else keys)
+    if on_window:
+        on_window(window_start, window_end, writer.rows)
+    return last_jd, written_at_last_jd
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download CAD close approaches into a columnar snapshot.")
+    parser.add_argument("--start", required=True, help="First date, YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="Last date, YYYY-MM-DD")
+    parser.add_argument("--out", default=DEFAULT_SNAPSHOT, help="Snapshot directory")
+    parser.add_argument("--window-days", type=int, default=DEFAULT_WINDOW_DAYS, help="Days per request")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Windows in flight at once")
+    parser.add_argument("--dist-max", default=None, help="dist-max of every request (the API default is 0.05 au)")
+    parser.add_argument("--base-url", default=None, help="CAD endpoint, e.g. a stand-in server")
+    parser.add_argument("--retry-budget", type=int, default=500, help="Transient-error retries for the download")
+    args = parser.parse_args()
+
+    if args.base_url:
+        AsteroidAPIController.BASE_URL = args.base_url
+    configure_retry_engine(budget=args.retry_budget)
+    params = AsteroidRequestBuilder().with_dist_max(args.dist_max).build() if args.dist_max else {}
+    started = time.perf_counter()
+
+    def progress(window_start, window_end, rows):
+        print(f"{window_start:%Y-%m-%d} .. {window_end:%Y-%m-%d}: {rows} rows", file=sys.stderr)
+
+    snapshot = download_snapshot(args.out, parse_window_date(args.start), parse_window_date(args.end),
+                                 args.window_days, args.concurrency, params, on_window=progress)
+    print(f"{len(snapshot)} rows written to {args.out} in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
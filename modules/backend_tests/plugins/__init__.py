@@ -0,0 +1,4 @@
+from modules.backend_tests.plugins.duration_history import DurationHistoryPlugin
+from modules.backend_tests.plugins.latency_budget import LatencyBudgetPlugin, LatencyBudgetWarning
+from modules.backend_tests.plugins.prefetch import PrefetchPlugin
+from modules.backend_tests.plugins.profiler import HotPathProfilerPlugin
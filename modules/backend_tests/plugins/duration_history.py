@@ -0,0 +1,128 @@
+import json
+import os
+
+import pytest
+from xdist.scheduler import LoadScopeScheduling
+
+from core.duration_history import DurationHistory
+from core.lpt_schedule import plan_schedule
+from core.request_timing import PROPERTY_PREFIX
+
+GROUP_PREFIX = "lpt"
+LPT_PLANS_FOLDER = "lpt_plans"
+
+
+def history_key(nodeid):
+    """The nodeid without the `@group` suffixes of `--dist loadgroup` mode."""
+    while nodeid.rfind("@") > nodeid.rfind("]"):
+        nodeid = nodeid[:nodeid.rfind("@")]
+    return nodeid
+
+
+class LptScheduling(LoadScopeScheduling):
+    """
+    xdist scheduler that hands each worker one bin of the LPT plan the workers wrote to `plan_path` at collection.
+    A test missing from the plan (or every test, when there was no history to plan from) is a work unit of its own.
+    """
+    def __init__(self, config, log, plan_path):
+        super().__init__(config, log)
+        self.plan_path = plan_path
+        self.groups = {}
+
+    def schedule(self):
+        if self.collection is None and os.path.exists(self.plan_path):
+            with open(self.plan_path, encoding="utf-8") as file:
+                self.groups = json.load(file)
+        super().schedule()
+
+    def _split_scope(self, nodeid):
+        return self.groups.get(nodeid, nodeid)
+
+
+class DurationHistoryPlugin:
+    """
+    Records every test's duration, outcome, retries, reruns, request count and request fingerprints into a SQLite
+    history (`core/duration_history.py`) at the end of each session, from the controlling process only.
+
+    With a `plan_path` under xdist, every worker reads that history at collection time and plans one bin per worker
+    longest-processing-time-first (`core/lpt_schedule.py`), keeping tests that sent the same query in the same bin.
+    Smoke tests are spread over the bins before anything else and still run first within each (see
+    `pytest_collection_modifyitems` in conftest.py), so they stay a first wave on every worker. The first worker
+    writes the plan to `plan_path`, and the controlling process' `LptScheduling` hands each worker one bin; node ids
+    stay unchanged, so report names and `--lf` are the same with and without the schedule.
+    """
+    name = "cad-duration-history"
+
+    def __init__(self, config, path, record=True, plan_path=None):
+        self.path = path
+        self.controller = not hasattr(config, "workerinput")
+        self.record = record and self.controller
+        self.plan_path = plan_path
+        self.results = {}
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_xdist_make_scheduler(self, config, log):
+        if self.plan_path:
+            return LptScheduling(config, log, self.plan_path)
+        return None
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_collection_modifyitems(self, session, config, items):
+        """Plans once every other implementation has run, so tests deselected with -m/-k are not balanced."""
+        result = yield
+        worker = getattr(config, "workerinput", {})
+        if self.plan_path and worker.get("workercount", 1) > 1 and os.path.exists(self.path):
+            self._plan(items, worker)
+        return result
+
+    def _plan(self, items, worker):
+        history = DurationHistory(self.path)
+        try:
+            estimates, fingerprints = history.estimates(), history.fingerprints()
+        finally:
+            history.close()
+        if not estimates:
+            return
+
+        workers = worker["workercount"]
+        bins, loads = plan_schedule([history_key(item.nodeid) for item in items], estimates, fingerprints, workers,
+                                    first_wave=["smoke" in item.keywords for item in items])
+        if worker.get("workerid") != "gw0":
+            return  # every worker computes the same plan; one writes it
+        os.makedirs(os.path.dirname(self.plan_path), exist_ok=True)
+        temporary = f"{self.plan_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({item.nodeid: f"{GROUP_PREFIX}{number}" for item, number in zip(items, bins)}, file)
+        os.replace(temporary, self.plan_path)
+        pytest.logger.info(f"LPT schedule of {len(items)} tests over {workers} workers, estimated seconds per "
+                           f"worker: {[round(load, 1) for load in loads]}")
+
+    def pytest_runtest_logreport(self, report):
+        if not self.record:
+            return
+        result = self.results.setdefault(history_key(report.nodeid), {
+            "duration": 0.0, "outcome": "passed", "retries": 0, "reruns": 0, "requests": 0, "fingerprints": set(),
+        })
+        result["duration"] += report.duration
+        if report.outcome == "rerun":
+            result["reruns"] += 1
+        elif report.when == "call" or report.outcome != "passed":
+            result["outcome"] = report.outcome
+        properties = dict(report.user_properties) if report.when == "call" else {}
+        result["requests"] += properties.get(f"{PROPERTY_PREFIX}requests", 0)
+        result["retries"] += properties.get(f"{PROPERTY_PREFIX}retries", 0)
+        result["fingerprints"].update(getattr(report, "cad_fingerprints", None) or ())
+
+    def pytest_sessionfinish(self, session):
+        if not self.record or not self.results:
+            return
+        history = DurationHistory(self.path)
+        try:
+            history.record(os.environ["PYTEST_SESSION_ID"], self.results)
+        finally:
+            history.close()
+        pytest.logger.info(f"Recorded {len(self.results)} test durations in {self.path}")
+
+    def pytest_unconfigure(self, config):
+        if self.controller and self.plan_path and os.path.exists(self.plan_path):
+            os.remove(self.plan_path)
@@ -0,0 +1,54 @@
+import warnings
+
+import pytest
+
+from core.latency_budget import LatencyBudget
+from core.request_timing import PROPERTY_PREFIX, get_request_timer
+
+MARKER = "latency_budget"
+
+
+class LatencyBudgetWarning(UserWarning):
+    """Emitted instead of a failure when a latency budget is exceeded with `--latency-budget-mode=warn`."""
+
+
+class LatencyBudgetPlugin:
+    """
+    Enforces `@pytest.mark.latency_budget(p50_ms=..., p95_ms=..., max_ms=...)` on the CAD requests a test sends.
+
+    A test's budget starts from the `latency_budgets` ini groups of the markers it carries (the strictest limit wins
+    when several match); limits given on the marker itself replace the inherited ones. Latency is per request,
+    connect to last byte (`RequestTiming.latency`), so rate-limiter waits, retries' backoff sleeps and assertion work
+    do not count. Tests that sent no request (cache hits, replay) are not checked.
+    """
+    name = "cad-latency-budget"
+
+    def __init__(self, groups=None, mode="fail"):
+        self.groups = groups or {}
+        self.mode = mode
+
+    def budget_for(self, item):
+        budget = LatencyBudget()
+        for marker, group_budget in self.groups.items():
+            if item.get_closest_marker(marker) is not None:
+                budget = budget.tightened(group_budget)
+        marker = item.get_closest_marker(MARKER)
+        return budget.overridden(**marker.kwargs) if marker is not None else budget
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_call(self, item):
+        result = yield
+        budget = self.budget_for(item)
+        latencies = [timing.latency for timing in get_request_timer().timings()]
+        if not budget or not latencies:
+            return result
+
+        observed, exceeded = budget.check(latencies)
+        item.user_properties.extend((f"{PROPERTY_PREFIX}latency_{key}", value) for key, value in observed.items())
+        if exceeded:
+            message = f"Latency budget exceeded ({len(latencies)} CAD requests): {'; '.join(exceeded)}"
+            pytest.logger.warning(f"{item.nodeid}: {message}")
+            if self.mode == "fail":
+                pytest.fail(message, pytrace=False)
+            warnings.warn(LatencyBudgetWarning(message))
+        return result
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from core import HTTPStatusCodes
+from core.latency_histogram import LatencyHistogram
+from core.request_timing import get_request_timer
+from core.response_cache import canonical_request_key, get_response_cache
+from core.response_store import get_response_store
+from modules.backend_tests.helpers.helper_asteroids_data import HelperAsteroidData
+
+MARKER = "cad_prefetch"
+DEFAULT_PREFETCH_CONCURRENCY = 8
+
+
+def planned_queries(items):
+    """
+    Unique `(expected_status_code, params)` queries declared by the `cad_prefetch` markers of `items`, in collection
+    order. The marker's `build` callable gets the item's parametrize values as keyword arguments and returns the
+    params dict (or a list of them) the test will fetch; `params="<argname>"` instead names a parametrize argument
+    that already holds them. A hint that fails is logged and skipped, never failing collection.
+    """
+    queries = {}
+    for item in items:
+        marker = item.get_closest_marker(MARKER)
+        if marker is None:
+            continue
+        expected = marker.kwargs.get("expected_status_code", HTTPStatusCodes.OK.value)
+        values = item.callspec.params if hasattr(item, "callspec") else {}
+        try:
+            built = values[marker.kwargs["params"]] if "params" in marker.kwargs else marker.kwargs["build"](**values)
+        except Exception as e:
+            pytest.logger.warning(f"{item.nodeid}: prefetch hint failed: {e!r}")
+            continue
+        for params in built if isinstance(built, list) else [built]:
+            queries.setdefault(canonical_request_key(None, params, expected), (expected, params))
+    return list(queries.values())
+
+
+class PrefetchPlugin:
+    """
+    Fetches every query declared with `@pytest.mark.cad_prefetch(...)` concurrently once collection is done and
+    before the first test, so the tests find their responses in the response cache and only validate.
+
+    Under xdist each worker warms its share of the queries into the on-disk response store (`--response-store`),
+    which every worker reads from; without the store, workers would each fetch everything, so prefetching is skipped.
+    """
+    name = "cad-prefetch"
+
+    def __init__(self, config, concurrency=DEFAULT_PREFETCH_CONCURRENCY):
+        self.concurrency = concurrency
+        self.worker = getattr(config, "workerinput", None)
+
+    def pytest_collection_finish(self, session):
+        queries = planned_queries(session.items)
+        if not queries:
+            return
+        if self.worker is not None:
+            if get_response_store() is None:
+                pytest.logger.warning("Prefetch skipped: under xdist it needs --response-store to share responses")
+                return
+            index = int(self.worker["workerid"].lstrip("gw"))
+            queries = queries[index::self.worker["workercount"]]
+        cache = get_response_cache()
+        if cache.enabled and len(queries) > cache.max_entries and get_response_store() is None:
+            pytest.logger.warning(f"Prefetching the first {cache.max_entries} of {len(queries)} queries, "
+                                  f"the response cache holds no more (--response-cache-size)")
+            queries = queries[:cache.max_entries]
+
+        timer = get_request_timer()
+        timer.begin()
+        start = time.perf_counter()
+        failed = HelperAsteroidData().prefetch(queries, self.concurrency)
+        elapsed = time.perf_counter() - start
+
+        histogram = LatencyHistogram()
+        for timing in timer.timings():
+            histogram.record(timing.latency)
+        pytest.logger.info(f"Prefetched {len(queries) - len(failed)} of {len(queries)} queries in {elapsed:.2f} s "
+                           f"({self.concurrency} in flight, {histogram.total} requests, "
+                           f"p50 {histogram.percentile(50):.0f} ms, max {histogram.max_us / 1000:.0f} ms)")
+        timer.begin()
@@ -0,0 +1,97 @@
+import cProfile
+import glob
+import os
+import pstats
+import tracemalloc
+
+import pytest
+
+from core.profiling import DEFAULT_TOP_FUNCTIONS, collapsed_stacks, profile_basename, top_functions
+from core.request_timing import PROPERTY_PREFIX
+
+TRACEMALLOC_FRAMES = 1  # "lineno" statistics only need the allocating frame; each extra frame costs time
+TOP_ALLOCATION_SITES = 5
+
+
+class HotPathProfilerPlugin:
+    """
+    Profiles the call phase of every test with cProfile and, with `memory=True`, tracemalloc.
+
+    Each test writes `<nodeid>.prof` (for snakeviz, `python -m pstats`) and `<nodeid>.collapsed` (folded stacks for
+    flamegraph tools) into `folder`. Its peak traced memory goes into the report as the `cad_peak_alloc_kb` property,
+    and the allocation sites still holding the most memory when the test returns are logged. The controlling process
+    prints the top cumulative functions over all `.prof` files and the tests with the highest peaks at the end.
+
+    Only the thread running the test is profiled; requests sent from load or prefetch threads are not.
+    """
+    name = "cad-hotpath-profiler"
+
+    def __init__(self, config, folder, memory=False, top=DEFAULT_TOP_FUNCTIONS):
+        self.folder = folder
+        self.memory = memory
+        self.top = top
+        self.controller = not hasattr(config, "workerinput")
+        self.peaks = {}
+        os.makedirs(folder, exist_ok=True)
+
+    @pytest.hookimpl(wrapper=True, trylast=True)
+    def pytest_runtest_call(self, item):
+        """Innermost wrapper, so the other plugins' bookkeeping around the call is not profiled."""
+        profiler = cProfile.Profile()
+        started = self.memory and not tracemalloc.is_tracing()  # leave `-X tracemalloc` running when given
+        if started:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        elif self.memory:
+            tracemalloc.reset_peak()
+        profiler.enable()
+        try:
+            return (yield)
+        finally:
+            profiler.disable()
+            if self.memory:
+                self._save_memory(item, started)
+            self._save_profile(item, profiler)
+
+    def _save_memory(self, item, started):
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started:
+            tracemalloc.stop()
+        name = f"{PROPERTY_PREFIX}peak_alloc_kb"
+        # replaces the peak of a failed run when pytest-rerunfailures calls the test again
+        item.user_properties[:] = [prop for prop in item.user_properties if prop[0] != name]
+        item.user_properties.append((name, round(peak / 1024, 1)))
+        sites = snapshot.statistics("lineno")[:TOP_ALLOCATION_SITES]
+        pytest.logger.debug(f"{item.nodeid}: peak {peak / 1024:.1f} KiB, retained: "
+                            + "; ".join(f"{site.traceback[0]} {site.size / 1024:.1f} KiB" for site in sites))
+
+    def _save_profile(self, item, profiler):
+        path = os.path.join(self.folder, profile_basename(item.nodeid))
+        profiler.dump_stats(f"{path}.prof")
+        with open(f"{path}.collapsed", "w", encoding="utf-8") as file:
+            file.write(collapsed_stacks(pstats.Stats(profiler)))
+
+    def pytest_runtest_logreport(self, report):
+        if report.when == "call":
+            peak = dict(report.user_properties).get(f"{PROPERTY_PREFIX}peak_alloc_kb")
+            if peak is not None:
+                self.peaks[report.nodeid] = peak
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.controller:
+            return
+        profiles = sorted(glob.glob(os.path.join(self.folder, "*.prof")))
+        if not profiles:
+            return
+        terminalreporter.write_sep("-", f"hot paths: top {self.top} cumulative over {len(profiles)} tests")
+        table = top_functions(profiles, self.top)
+        terminalreporter.write_line(table)
+        if self.peaks:
+            terminalreporter.write_sep("-", "hot paths: peak traced memory")
+            for nodeid, peak in sorted(self.peaks.items(), key=lambda entry: -entry[1])[:self.top]:
+                terminalreporter.write_line(f"{peak:>12.1f} KiB  {nodeid}")
+        with open(os.path.join(self.folder, "summary.txt"), "w", encoding="utf-8") as file:
+            file.write(table)
+            file.writelines(f"{peak:.1f} KiB  {nodeid}\n" for nodeid, peak in
+                            sorted(self.peaks.items(), key=lambda entry: -entry[1]))
+        terminalreporter.write_line(f"profiles: {self.folder}")
@@ -0,0 +1,2 @@
+from modules.backend_tests.stand_in.dataset import CadDataset
+from modules.backend_tests.stand_in.cad_server import CadStandInServer, build_dataset, run_query
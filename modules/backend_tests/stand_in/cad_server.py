@@ -0,0 +1,366 @@
+"""
+Local stand-in for https://ssd-api.jpl.nasa.gov/cad.api.
+
+Serves the parameters `AsteroidRequestBuilder` produces with the real filter semantics, response shape and 400
+messages, from a synthetic, JSON or columnar snapshot dataset, behind a configurable token-bucket rate limiter that
+answers 503.
+
+    python -m modules.backend_tests.stand_in.cad_server --port 8088 --rate 50 --burst 10
+    pytest --cad-base-url http://127.0.0.1:8088/cad.api
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qsl, urlsplit
+
+from core.cad_dates import datetime_to_jd
+from modules.backend_tests.stand_in.dataset import CadDataset, SnapshotDataset
+
+SIGNATURE = {"source": "NASA/JPL SBDB Close Approach Data API", "version": "1.5"}
+MORE_INFO = "https://ssd-api.jpl.nasa.gov/doc/cad.html"
+LUNAR_DISTANCE_AU = 0.00256955529
+DEFAULT_DATE_WINDOW_DAYS = 60
+DEFAULT_DIST_MAX = "0.05"
+
+KIND_FILTERS = {
+    "a": lambda kind, des: kind == "a",
+    "an": lambda kind, des: kind == "a" and des.isdigit(),
+    "au": lambda kind, des: kind == "a" and not des.isdigit(),
+    "c": lambda kind, des: kind == "c",
+    "cn": lambda kind, des: kind == "c" and des[:1].isdigit(),
+    "cu": lambda kind, des: kind == "c" and not des[:1].isdigit(),
+    "n": lambda kind, des: des[:1].isdigit() and (kind == "c" or des.isdigit()),
+    "u": lambda kind, des: not (des[:1].isdigit() and (kind == "c" or des.isdigit())),
+}
+SORT_KEYS = {
+    "date": "jd", "dist": "dist", "dist-min": "dist_min", "dist-max": "dist_max",
+    "v-inf": "v_inf", "v-rel": "v_rel", "h": "h", "object": "des",
+}
+NUMERIC_BOUNDS = {
+    # query parameter: (dataset column, is_upper_bound)
+    "dist-min": ("dist", False), "dist-max": ("dist", True),
+    "h-min": ("h", False), "h-max": ("h", True),
+    "v-inf-min": ("v_inf", False), "v-inf-max": ("v_inf", True),
+    "v-rel-min": ("v_rel", False), "v-rel-max": ("v_rel", True),
+}
+RECOGNIZED_PARAMS = {
+    "date-min", "date-max", "t-min", "t-max", "t-origin", "kind", "fullname", "diameter", "sort", "limit",
+    *NUMERIC_BOUNDS,
+}
+_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}(:\d{2})?)?$")
+_RELATIVE_DAYS_PATTERN = re.compile(r"^[+-]\d+$")
+
+
+class CadQueryError(ValueError):
+    """A request the real API rejects with HTTP 400; the message is returned verbatim."""
+
+
+def _invalid(param):
+    return CadQueryError(f"invalid value specified for query parameter '{param}'")
+
+
+def _parse_date(param, value, now):
+    if value == "now":
+        return now
+    if _RELATIVE_DAYS_PATTERN.match(value):
+        return now + timedelta(days=int(value))
+    if not _DATE_PATTERN.match(value):
+        raise _invalid(param)
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise _invalid(param) from None
+
+
+def _parse_distance(param, value):
+    try:
+        if value.upper().endswith("LD"):
+            return float(value[:-2]) * LUNAR_DISTANCE_AU
+        return float(value)
+    except ValueError:
+        raise _invalid(param) from None
+
+
+def _parse_float(param, value):
+    try:
+        return float(value)
+    except ValueError:
+        raise _invalid(param) from None
+
+
+def _parse_bool(param, value):
+    if value.lower() not in ("true", "false", "1", "0"):
+        raise _invalid(param)
+    return value.lower() in ("true", "1")
+
+
+def run_query(dataset, params, now=None):
+    """
+    Applies CAD query parameters to the dataset and returns the JSON response body as bytes.
+    Raises `CadQueryError` for requests the real API answers with 400.
+    """
+    if any(key not in RECOGNIZED_PARAMS for key in params):
+        raise CadQueryError("one or more query parameter was not recognized")
+
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None).replace(second=0, microsecond=0)
+    date_min = _parse_date("date-min", params.get("date-min", "now"), now)
+    date_max = _parse_date("date-max", params.get("date-max", f"+{DEFAULT_DATE_WINDOW_DAYS}"), now)
+    jd_min, jd_max = datetime_to_jd(date_min), datetime_to_jd(date_max)
+
+    if "t-min" in params or "t-max" in params:
+        # t-min/t-max are Julian Day bounds, optionally relative to t-origin
+        origin = _parse_float("t-origin", params["t-origin"]) if "t-origin" in params else 0.0
+        if "t-min" in params:
+            jd_min = max(jd_min, origin + _parse_float("t-min", params["t-min"]))
+        if "t-max" in params:
+            jd_max = min(jd_max, origin + _parse_float("t-max", params["t-max"]))
+
+    bounds = []
+    for param, (column, is_upper) in NUMERIC_BOUNDS.items():
+        value = params.get(param, DEFAULT_DIST_MAX if param == "dist-max" else None)
+        if value is None:
+            continue
+        parse = _parse_distance if param.startswith("dist") else _parse_float
+        bounds.append((getattr(dataset, column), parse(param, value), is_upper))
+
+    kind_filter = None
+    if "kind" in params:
+        kind_filter = KIND_FILTERS.get(params["kind"])
+        if kind_filter is None:
+            raise CadQueryError(f"invalid object kind specified: '{params['kind']}'")
+
+    with_diameter = _parse_bool("diameter", params["diameter"]) if "diameter" in params else False
+    with_fullname = _parse_bool("fullname", params["fullname"]) if "fullname" in params else False
+    limit = int(_parse_float("limit", params["limit"])) if "limit" in params else None
+
+    indices = []
+    for i in dataset.jd_slice(jd_min, jd_max):
+        if kind_filter and not kind_filter(dataset.kind[i], dataset.des[i]):
+            continue
+        if any(column[i] is None or (column[i] > bound if is_upper else column[i] < bound)
+               for column, bound, is_upper in bounds):
+            continue
+        indices.append(i)
+
+    sort = params.get("sort", "date")
+    descending = sort.startswith("-")
+    sort_key = SORT_KEYS.get(sort.lstrip("-"))
+    if sort_key is None:
+        raise _invalid("sort")
+    if sort_key != "jd" or descending:
+        column = getattr(dataset, sort_key)
+        indices.sort(key=lambda i: (column[i] is None, column[i]), reverse=descending)
+    if limit is not None:
+        indices = indices[:limit]
+
+    signature = json.dumps(SIGNATURE, separators=(",", ":"))
+    if not indices:
+        return f'{{"signature":{signature},"count":0}}'.encode("utf-8")
+
+    encoded = dataset.encoded_rows(diameter=with_diameter, fullname=with_fullname)
+    fields = json.dumps(dataset.fields(diameter=with_diameter, fullname=with_fullname), separators=(",", ":"))
+    rows = ",".join(encoded[i] for i in indices)
+    return f'{{"signature":{signature},"count":{len(indices)},"fields":{fields},"data":[{rows}]}}'.encode("utf-8")
+
+
+class TokenBucket:
+    """Allows `rate` requests per second with bursts up to `burst`; `rate=0` disables limiting."""
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def take(self):
+        if not self.rate:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class CadStandInServer:
+    """
+    asyncio HTTP/1.1 server (keep-alive, no framework) answering `/cad.api` from a `CadDataset`.
+
+    Successful bodies are memoised per query string, so steady-state load is bounded by socket I/O only.
+    """
+    REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               503: "Service Unavailable"}
+
+    def __init__(self, dataset, host="127.0.0.1", port=0, rate=50.0, burst=10, cache_size=1024):
+        self.dataset = dataset
+        self.host = host
+        self.port = port
+        self.limiter = TokenBucket(rate, burst)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._server = None
+        self._loop = None
+        self._thread = None
+        self._connections = {}
+        self.requests = 0
+        self.rejected = 0
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/cad.api"
+
+    def respond(self, target):
+        """Returns `(status, body, extra_headers)` for a request target such as `/cad.api?date-min=...`."""
+        url = urlsplit(target)
+        if not url.path.rstrip("/").endswith("cad.api"):
+            return 404, json.dumps({"code": "404", "message": "not found"}).encode("utf-8"), {}
+        if not self.limiter.take():
+            self.rejected += 1
+            body = json.dumps({"code": "503", "message": "service unavailable: too many requests"})
+            return 503, body.encode("utf-8"), {"Retry-After": "1"}
+
+        cached = self._cache.get(url.query)
+        if cached is not None:
+            self._cache.move_to_end(url.query)
+            return cached
+        try:
+            result = 200, run_query(self.dataset, dict(parse_qsl(url.query, keep_blank_values=True))), {}
+        except CadQueryError as e:
+            body = {"code": "400", "message": str(e), "moreInfo": MORE_INFO}
+            return 400, json.dumps(body).encode("utf-8"), {}
+
+        if "date-min" in url.query and "date-max" in url.query:  # defaults are relative to "now"
+            self._cache[url.query] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    async def _handle(self, reader, writer):
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, version = (lines[0].split(" ") + ["", ""])[:3]
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                self.requests += 1
+                if method != "GET":
+                    status, body, extra = 405, b'{"code":"405","message":"method not allowed"}', {}
+                else:
+                    status, body, extra = self.respond(target)
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                head_lines = [
+                    f"HTTP/1.1 {status} {self.REASONS.get(status, '')}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(body)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ] + [f"{name}: {value}" for name, value in extra.items()]
+                writer.write(("\r\n".join(head_lines) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def start_async(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=4096)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    def start(self):
+        """Starts serving on a background event loop thread and returns once the socket is bound."""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start_async())
+            started.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="cad-stand-in", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            handlers = list(self._connections)
+            for writer in self._connections.values():  # idle keep-alive connections would outlive the loop
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            self._loop.stop()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop)
+        self._thread.join(timeout=5)
+
+
+def build_dataset(snapshot=None, rows_per_day=20, seed=1801, years_back=6, years_ahead=3):
+    """
+    The stand-in dataset: a columnar snapshot directory (see `helpers/snapshot_downloader.py`), a JSON file saved
+    from a real CAD response, or synthetic rows when `snapshot` is None.
+    """
+    if snapshot and os.path.isdir(snapshot):
+        return SnapshotDataset.from_directory(snapshot)
+    if snapshot:
+        return CadDataset.from_file(snapshot)
+    today = datetime.now(timezone.utc).replace(tzinfo=None).replace(hour=0, minute=0, second=0, microsecond=0)
+    return CadDataset.synthetic(
+        start=today.replace(year=today.year - years_back, day=1),
+        end=today.replace(year=today.year + years_ahead, day=1),
+        rows_per_day=rows_per_day,
+        seed=seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the NASA/JPL CAD API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--snapshot", help="JSON file saved from a real CAD response (fields + data), or a "
+                                           "columnar snapshot directory.")
+    parser.add_argument("--rows-per-day", type=float, default=20, help="Density of the synthetic dataset.")
+    parser.add_argument("--seed", type=int, default=1801)
+    parser.add_argument("--rate", type=float, default=50, help="Requests per second before 503 (0 = unlimited).")
+    parser.add_argument("--burst", type=int, default=10, help="Token bucket size of the rate limiter.")
+    args = parser.parse_args()
+
+    dataset = build_dataset(args.snapshot, args.rows_per_day, args.seed)
+    server = CadStandInServer(dataset, args.host, args.port, rate=args.rate, burst=args.burst)
+
+    async def serve():
+        await server.start_async()
+        print(f"CAD stand-in serving {len(dataset)} rows on {server.base_url}")
+        await server._server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import json
+import math
+import random
+import re
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from core.cad_dates import MONTH_ABBREVIATIONS, datetime_to_jd
+from core.cad_snapshot import NUMERIC_COLUMNS, CadSnapshot
+
+BASE_FIELDS = ["des", "orbit_id", "jd", "cd", "dist", "dist_min", "dist_max", "v_rel", "v_inf", "t_sigma_f", "h"]
+DIAMETER_FIELDS = ["diameter", "diameter_sigma"]
+FULLNAME_FIELD = "fullname"
+# numbered periodic comets, with an optional fragment letter: `1P`, `73P-B`
+NUMBERED_COMET_PATTERN = re.compile(r"\d+P(-[A-Z]+)?")
+
+
+def format_cd(value):
+    """Formats a datetime the way the CAD API does (`%Y-%b-%d %H:%M`), independent of the process locale."""
+    return (f"{value.year:04d}-{MONTH_ABBREVIATIONS[value.month - 1]}-{value.day:02d} "
+            f"{value.hour:02d}:{value.minute:02d}")
+
+
+def _number(value):
+    return None if value is None else format(value, ".16g")
+
+
+def default_fullname(des):
+    return f"       ({des})"
+
+
+def default_kind(des):
+    """`c` for comet designations (`C/2020 F3`, `1P`), `a` otherwise (`2020 AP` is an asteroid)."""
+    return "c" if "/" in des or NUMBERED_COMET_PATTERN.fullmatch(des) else "a"
+
+
+class CadDataset:
+    """
+    Close-approach rows held column-wise and sorted by `jd`, the order the CAD API returns them in.
+
+    Rows are pre-encoded to JSON once per field layout so a response is a slice plus a join.
+    """
+    def __init__(self, rows):
+        rows = sorted(rows, key=lambda row: row["jd"])
+        self.des = [row["des"] for row in rows]
+        self.orbit_id = [row["orbit_id"] for row in rows]
+        self.jd = [row["jd"] for row in rows]
+        self.cd = [row["cd"] for row in rows]
+        self.dist = [row["dist"] for row in rows]
+        self.dist_min = [row["dist_min"] for row in rows]
+        self.dist_max = [row["dist_max"] for row in rows]
+        self.v_rel = [row["v_rel"] for row in rows]
+        self.v_inf = [row["v_inf"] for row in rows]
+        self.t_sigma_f = [row["t_sigma_f"] for row in rows]
+        self.h = [row["h"] for row in rows]
+        self.diameter = [row.get("diameter") for row in rows]
+        self.diameter_sigma = [row.get("diameter_sigma") for row in rows]
+        self.fullname = [row.get("fullname") or default_fullname(row["des"]) for row in rows]
+        self.kind = [row.get("kind") or default_kind(row["des"]) for row in rows]
+        self._encoded = {}
+
+    def __len__(self):
+        return len(self.jd)
+
+    def jd_slice(self, jd_min, jd_max):
+        """Returns the `range` of row indices with `jd_min <= jd <= jd_max`."""
+        return range(bisect_left(self.jd, jd_min), bisect_right(self.jd, jd_max))
+
+    def fields(self, diameter=False, fullname=False):
+        return BASE_FIELDS + (DIAMETER_FIELDS if diameter else []) + ([FULLNAME_FIELD] if fullname else [])
+
+    def encoded_rows(self, diameter=False, fullname=False):
+        """JSON-encoded rows (one string per row) for the given field layout, built on first use."""
+        layout = (diameter, fullname)
+        if layout not in self._encoded:
+            self._encoded[layout] = [self.encode_row(i, diameter, fullname) for i in range(len(self.jd))]
+        return self._encoded[layout]
+
+    def encode_row(self, i, diameter=False, fullname=False):
+        row = [self.des[i], self.orbit_id[i], _number(self.jd[i]), self.cd[i], _number(self.dist[i]),
+               _number(self.dist_min[i]), _number(self.dist_max[i]), _number(self.v_rel[i]),
+               _number(self.v_inf[i]), self.t_sigma_f[i], _number(self.h[i])]
+        if diameter:
+            row += [_number(self.diameter[i]), _number(self.diameter_sigma[i])]
+        if fullname:
+            row.append(self.fullname[i])
+        return json.dumps(row, separators=(",", ":"))
+
+    @classmethod
+    def synthetic(cls, start, end, rows_per_day=20, seed=1801):
+        """
+        Generates a reproducible dataset between two datetimes.
+
+        Approach times are distinct minutes (so `cd` values never collide), distances are log-uniform in
+        0.0002-0.5 au, and about 2% of the objects are comets.
+        """
+        rng = random.Random(seed)
+        total_minutes = int((end - start).total_seconds() // 60)
+        count = min(int(rows_per_day * total_minutes / 1440), total_minutes)
+        rows = []
+        for minute in rng.sample(range(total_minutes), count):
+            approach = start + timedelta(minutes=minute)
+            jd = datetime_to_jd(approach) + rng.uniform(0, 59) / 86400.0
+            dist = math.exp(rng.uniform(math.log(0.0002), math.log(0.5)))
+            spread = rng.uniform(0.00001, 0.01)
+            v_inf = rng.uniform(0.5, 40.0)
+            v_rel = math.sqrt(v_inf ** 2 + 0.00178 / max(dist, 0.00005))
+            is_comet = rng.random() < 0.02
+            year = approach.year - rng.randint(0, 30)
+            if is_comet:
+                des = f"C/{year} {rng.choice('ABCDEFGHJKLMNOPQRSTUVWXY')}{rng.randint(1, 9)}"
+                h = rng.uniform(8.0, 18.0)
+            elif rng.random() < 0.1:
+                des = str(rng.randint(1000, 600000))
+                h = rng.uniform(14.0, 22.0)
+            else:
+                des = f"{year} {rng.choice('ABCDEFGHJKLMNOPQRSTUVWXY')}{rng.choice('ABCDEFGHJKLMNOPQRSTUVWXYZ')}" \
+                      f"{rng.randint(1, 99)}"
+                h = rng.uniform(18.0, 32.0)
+            has_diameter = not is_comet and rng.random() < 0.1
+            t_sigma = rng.randint(0, 2000)
+            rows.append({
+                "des": des,
+                "orbit_id": str(rng.randint(1, 250)),
+                "jd": jd,
+                "cd": format_cd(approach),
+                "dist": dist,
+                "dist_min": dist * (1 - spread),
+                "dist_max": dist * (1 + spread),
+                "v_rel": v_rel,
+                "v_inf": v_inf,
+                "t_sigma_f": "< 00:01" if t_sigma == 0 else f"{t_sigma // 60:02d}:{t_sigma % 60:02d}",
+                "h": round(h, 2),
+                "diameter": round(1329 / math.sqrt(0.14) * 10 ** (-h / 5), 3) if has_diameter else None,
+                "diameter_sigma": round(rng.uniform(0.001, 0.05), 3) if has_diameter else None,
+                "fullname": f"       ({des})",
+                "kind": "c" if is_comet else "a",
+            })
+        return cls(rows)
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Loads a snapshot saved from a real CAD response (`fields` + `data`, e.g. with fullname/diameter)."""
+        fields = payload["fields"]
+        rows = []
+        for values in payload.get("data", []):
+            row = dict(zip(fields, values))
+            for key in ("jd", "dist", "dist_min", "dist_max", "v_rel", "v_inf", "h", "diameter", "diameter_sigma"):
+                if row.get(key) is not None:
+                    row[key] = float(row[key])
+            rows.append(row)
+        return cls(rows)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_payload(json.load(f))
+
+
+class LazyColumn:
+    """Read-only sequence computing `get(i)` on access, for columns too large to hold as Python lists."""
+    def __init__(self, length, get):
+        self._length = length
+        self._get = get
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError(i)
+        return self._get(i)
+
+
+class SnapshotDataset(CadDataset):
+    """
+    A `CadDataset` over a memory-mapped `CadSnapshot` (`core/cad_snapshot.py`): values are decoded per row on access
+    and rows encoded per response, so the stand-in can serve tens of millions of rows that are never loaded whole.
+    """
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        size = len(snapshot)
+        for name in NUMERIC_COLUMNS:
+            setattr(self, name, LazyColumn(size, self._number_getter(snapshot.column(name))))
+        for name in ("des", "orbit_id", "cd", "t_sigma_f"):
+            setattr(self, name, LazyColumn(size, self._string_getter(snapshot.column(name))))
+        names = snapshot.column("fullname")
+        self.fullname = LazyColumn(size, lambda i: snapshot.string(int(names[i])) or default_fullname(self.des[i]))
+        self.kind = LazyColumn(size, lambda i: default_kind(self.des[i]))
+        self._encoded = {}
+
+    @staticmethod
+    def _number_getter(values):
+        def get(i):
+            value = float(values[i])
+            return None if math.isnan(value) else value
+        return get
+
+    def _string_getter(self, codes):
+        return lambda i: self.snapshot.string(int(codes[i]))
+
+    def jd_slice(self, jd_min, jd_max):
+        window = self.snapshot.jd_range(jd_min, jd_max)
+        return range(window.start, window.stop)
+
+    def encoded_rows(self, diameter=False, fullname=False):
+        return LazyColumn(len(self), lambda i: self.encode_row(i, diameter, fullname))
+
+    @classmethod
+    def from_directory(cls, path):
+        return cls(CadSnapshot(path))
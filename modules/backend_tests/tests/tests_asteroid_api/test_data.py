@@ -1,3 +1,11 @@
+from modules.backend_tests.general.request_builder_asteroids import AsteroidRequestBuilder
+
+
+def date_range_params(start, end, **_):
+    """Request params of a row with `start` and `end` dates, e.g. for `@pytest.mark.cad_prefetch(build=...)`."""
+    return AsteroidRequestBuilder().with_date_range(start, end).build()
+
+
 DATE_RANGES = [
     ("Valid short range", "2025-01-01", "2025-01-10", True),
     ("Mid-term range", "2024-06-01", "2024-06-15", True),
@@ -27,11 +35,28 @@ VALID_DATA_TYPES_DATES = [
     ("Field validation range", "2024-01-01", "2024-01-10")
 ]
 
+# required CadEntry columns dropped from a response: (label, column)
+MISSING_REQUIRED_COLUMNS = [
+    ("Without absolute magnitude", "h"),
+    ("Without designation", "des"),
+]
+
 COMBINED_DATA_AND_DISTANCE = [
     ("Combined filter short range", "2025-01-01", "2025-01-10", "0.05"),
     ("Combined filter mid-term", "2024-06-01", "2024-06-15", "0.02")
 ]
 
+# wide windows checked through the streaming parser instead of a buffered body
+STREAMED_DATE_AND_DISTANCE = [
+    ("Two decades within 0.05 AU", "2000-01-01", "2020-01-01", "0.05"),
+]
+
+# sharded fetches: (label, start, end, dist-max, shards, adaptive target rows per window or None)
+SHARDED_DATE_RANGES = [
+    ("Quarter in 6 fixed windows", "2025-01-01", "2025-04-01", "0.05", 6, None),
+    ("Quarter in adaptive windows", "2025-01-01", "2025-04-01", "0.05", 4, 50),
+]
+
 ABSOLUTE_MAGNITUDES = [
     ("Upper bound H=22", "22"),
     ("Upper bound H=25", "25")
@@ -71,10 +96,27 @@ INVALID_QUERIES_WITH_EXPECTED_MSG = [
     ),
 ]
 
+# boundary cases: (label, builder param, value, checked column, lower bound, upper bound)
 BOUNDARY_TEST_CASES = [
-    ("Distance Min = 0", "dist_min", 0, 4, lambda val: float(val) >= 0),
-    ("Distance Max = 1", "dist_max", 1, 4, lambda val: float(val) <= 1),
-    ("H Max = 0", "h_max", 0, 10, lambda val: float(val) <= 0),
-    ("V-inf Max = 0", "v_inf_max", 0, 8, lambda val: float(val) <= 0),
-    ("Diameter Field Present", "diameter", None, 11, lambda val: True)  # checks length in test
+    ("Distance Min = 0", "dist_min", 0, "dist", 0, None),
+    ("Distance Max = 1", "dist_max", 1, "dist", None, 1),
+    ("H Max = 0", "h_max", 0, "h", None, 0),
+    ("V-inf Max = 0", "v_inf_max", 0, "v_inf", None, 0),
+    ("Diameter Field Present", "diameter", None, "diameter", None, None)  # only checks the column is returned
+]
+
+# open-loop load: (label, target rps, duration in seconds, max p99 latency of the 200s in ms, max share of 503s)
+OPEN_LOOP_LATENCY_TARGETS = [
+    ("2 rps for 10 s, p99 < 5 s", 2, 10, 5000, 0.1),
+]
+
+# distributed load: (label, worker processes, total rps, duration in seconds)
+DISTRIBUTED_LOAD = [
+    ("4 processes, 2 rps for 10 s", 4, 2, 10),
+]
+
+# capacity discovery: (label, start rps, max rps, seconds per probed rate, in-flight limits searched or None)
+CAPACITY_DISCOVERY = [
+    ("Ramp 1 -> 64 rps, 10 s steps", 1, 64, 10, None),
+    ("Ramp 1 -> 64 rps at 2 / 8 / 32 in flight, 5 s steps", 1, 64, 5, [2, 8, 32]),
 ]
@@ -1,16 +1,17 @@
 import pytest
 
 from core import ResponseKeys
-from modules.backend_tests import AsteroidRequestBuilder, EMPTY_DATE_RANGES
+from modules.backend_tests import EMPTY_DATE_RANGES, date_range_params
 
 
 @pytest.mark.flaky_regression
 @pytest.mark.edgecase
 @pytest.mark.parametrize("label, start, end", EMPTY_DATE_RANGES)
+@pytest.mark.cad_prefetch(build=date_range_params)
 def test_edge_case_no_data(helper_asteroid, label, start, end):
     """Confirm API returns zero results for extreme future date range."""
     pytest.logger.info(f"Testing future range with no data: {start} → {end}")
-    params = AsteroidRequestBuilder().with_date_range(start, end).build()
+    params = date_range_params(start, end)
     result = helper_asteroid.fetch_data(**params)
 
     count = result.get(ResponseKeys.COUNT.value)
@@ -22,11 +23,12 @@ def test_edge_case_no_data(helper_asteroid, label, start, end):
 @pytest.mark.edgecase
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, start, end", EMPTY_DATE_RANGES)
+@pytest.mark.cad_prefetch(build=date_range_params)
 def test_empty_ranges_return_no_data(helper_asteroid, label, start, end):
     """Verify empty data sets return zero count and no data array."""
     pytest.logger.info(f"[{label}] Testing with empty date range: {start} → {end}")
 
-    params = AsteroidRequestBuilder().with_date_range(start, end).build()
+    params = date_range_params(start, end)
     result = helper_asteroid.fetch_data(**params)
 
     count = result.get(ResponseKeys.COUNT.value, 0)
@@ -29,6 +29,7 @@ def test_smoke_invalid_param_returns_400(helper_asteroid, faker_fixture):
 @pytest.mark.negative
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, param, expected_error", INVALID_PARAMS)
+@pytest.mark.cad_prefetch(params="param", expected_status_code=HTTPStatusCodes.BAD_REQUEST.value)
 def test_invalid_param(helper_asteroid, label, param, expected_error):
     """Check that invalid parameters return proper error messages."""
     pytest.logger.info(f"[{label}] Sending request with invalid param(s): {param}")
@@ -48,6 +49,7 @@ def test_invalid_param(helper_asteroid, label, param, expected_error):
 @pytest.mark.negative
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, query_params, expected_msg", INVALID_QUERIES_WITH_EXPECTED_MSG)
+@pytest.mark.cad_prefetch(params="query_params", expected_status_code=400)
 def test_invalid_queries_return_400(helper_asteroid, label, query_params, expected_msg):
     """Negative tests for invalid query parameter combinations resulting in 400 response."""
     pytest.logger.warning(f"[{label}] Sending: {query_params}")
@@ -1,29 +1,65 @@
 import pytest
 
-from core import ResponseKeys, AsteroidDataFields
+from core import ResponseKeys
+from core.cad_columns import CadColumns
+from core.log_pipeline import LoggedBody
 from modules.backend_tests import (
     AsteroidRequestBuilder,
     DATE_RANGES,
     DISTANCES,
     COMBINED_DATA_AND_DISTANCE,
+    STREAMED_DATE_AND_DISTANCE,
+    SHARDED_DATE_RANGES,
     ABSOLUTE_MAGNITUDES,
     VELOCITY_LIMITS,
     DISTANCE_RANGES,
-    MIN_DISTANCE_VALUES
+    MIN_DISTANCE_VALUES,
+    date_range_params
 )
 
 
+def distance_params(dist, **_):
+    """Request params of a `DISTANCES` row."""
+    return AsteroidRequestBuilder().with_dist_max(dist).build()
+
+
+def date_and_distance_params(start, end, dist, **_):
+    """Request params of a `COMBINED_DATA_AND_DISTANCE`, `STREAMED_DATE_AND_DISTANCE` or `SHARDED_DATE_RANGES` row."""
+    return AsteroidRequestBuilder().with_date_range(start, end).with_dist_max(dist).build()
+
+
+def min_distance_params(dist_min, **_):
+    """Request params of a `MIN_DISTANCE_VALUES` row."""
+    return AsteroidRequestBuilder().with_dist_min(dist_min).build()
+
+
+def distance_range_params(dist_min, dist_max, **_):
+    """Request params of a `DISTANCE_RANGES` row."""
+    return AsteroidRequestBuilder().with_dist_range(dist_min, dist_max).build()
+
+
+def magnitude_params(magnitude, **_):
+    """Request params of an `ABSOLUTE_MAGNITUDES` row."""
+    return AsteroidRequestBuilder().with_h_max(magnitude).build()
+
+
+def velocity_params(velocity, **_):
+    """Request params of a `VELOCITY_LIMITS` row."""
+    return AsteroidRequestBuilder().with_v_inf_max(velocity).build()
+
+
 @pytest.mark.smoke
 @pytest.mark.filtering
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, start, end, has_data", DATE_RANGES)
+@pytest.mark.cad_prefetch(build=date_range_params)
 def test_smoke_valid_date_filter_returns_data(helper_asteroid, label, start, end, has_data):
     """
     Smoke test: Ensure a valid date range returns a well-formed data list.
     """
     pytest.logger.info(f"[{label}] Testing date range: {start} → {end}")
 
-    params = AsteroidRequestBuilder().with_date_range(start, end).build()
+    params = date_range_params(start, end)
     result = helper_asteroid.fetch_data(**params)
 
     count = result.get(ResponseKeys.COUNT.value, 0)
@@ -46,11 +82,12 @@ def test_smoke_valid_date_filter_returns_data(helper_asteroid, label, start, end
 @pytest.mark.filtering
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, dist", DISTANCES)
+@pytest.mark.cad_prefetch(build=distance_params)
 def test_filter_by_distance(helper_asteroid, label, dist):
     """Ensure distance filter reduces or limits result set."""
     pytest.logger.info(f"[{label}] Testing with dist-max={dist} AU")
 
-    params = AsteroidRequestBuilder().with_dist_max(dist).build()
+    params = distance_params(dist)
     result = helper_asteroid.fetch_data(**params)
 
     if ResponseKeys.DATA.value not in result:
@@ -68,77 +105,108 @@ def test_filter_by_distance(helper_asteroid, label, dist):
 @pytest.mark.filtering
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, start, end, dist", COMBINED_DATA_AND_DISTANCE)
+@pytest.mark.cad_prefetch(build=date_and_distance_params)
 def test_combined_date_and_distance_filter(helper_asteroid, label, start, end, dist):
     """Test combined filtering with both date range and maximum distance."""
     pytest.logger.info(f"[{label}] Combined filter: {start} → {end} with dist-max={dist}")
-    params = (
-        AsteroidRequestBuilder()
-        .with_date_range(start, end)
-        .with_dist_max(dist)
-        .build()
-    )
+    params = date_and_distance_params(start, end, dist)
 
-    result = helper_asteroid.fetch_data(**params)
-    data = result.get(ResponseKeys.DATA.value, [])
+    try:
+        columns = helper_asteroid.fetch_columns(**params)
+    except ValueError as e:
+        pytest.logger.error(f"[{label}] Invalid numeric value in response: {e}")
+        pytest.fail(f"[{label}] Invalid numeric value in response: {e}")
 
-    pytest.logger.debug(f"[{label}] Total entries returned: {len(data)}")
-    if not data:
+    pytest.logger.debug(f"[{label}] Total entries returned: {len(columns)}")
+    if not len(columns):
         pytest.logger.warning(f"[{label}] No entries returned with combined filters")
 
-    max_dist = float(dist)
-    for i, entry in enumerate(data):
-        try:
-            approach_distance = float(entry[AsteroidDataFields.DIST])
-        except (ValueError, IndexError) as e:
-            pytest.logger.error(f"[{label}] Invalid distance at row {i}: {e}")
-            pytest.fail(f"Invalid distance value at row {i}: {entry} ({e})")
+    offending = columns.violations("dist", upper=dist)
+    assert not offending.size, f"[{label}] Entries exceed max distance {dist}: {columns.describe(offending, 'dist')}"
 
-        assert approach_distance <= max_dist, (
-            f"Entry {i} exceeds max distance: {approach_distance} > {max_dist} (entry: {entry})"
-        )
+
+@pytest.mark.filtering
+@pytest.mark.flaky_regression
+@pytest.mark.parametrize("label, start, end, dist", STREAMED_DATE_AND_DISTANCE)
+def test_streamed_wide_window_distance_filter(helper_asteroid, label, start, end, dist):
+    """Check a multi-year window row batch by row batch while the response is still downloading."""
+    pytest.logger.info(f"[{label}] Streaming {start} → {end} with dist-max={dist}")
+    params = date_and_distance_params(start, end, dist)
+
+    with helper_asteroid.fetch_stream(**params) as stream:
+        pytest.logger.debug(f"[{label}] Header: count={stream.count}, fields={stream.fields}")
+        rows, offending = 0, []
+        for batch in stream.batches():
+            rows += len(batch)
+            violations = batch.violations("dist", upper=dist)
+            if violations.size:
+                offending.append(batch.describe(violations, "dist"))
+
+    assert not offending, f"[{label}] Entries exceed max distance {dist}: {'; '.join(offending)}"
+    assert rows == stream.count, f"[{label}] Streamed {rows} rows but the header count is {stream.count}"
+
+
+@pytest.mark.filtering
+@pytest.mark.flaky_regression
+@pytest.mark.parametrize("label, start, end, dist, shards, target_rows", SHARDED_DATE_RANGES)
+@pytest.mark.cad_prefetch(build=date_and_distance_params)
+def test_sharded_date_range_matches_single_request(helper_asteroid, label, start, end, dist, shards, target_rows):
+    """Fetch a range as concurrent sub-windows and check the JD-merged result equals the single request."""
+    pytest.logger.info(f"[{label}] Sharding {start} → {end} into {shards} windows (target rows: {target_rows})")
+    params = date_and_distance_params(start, end, dist)
+
+    sharded = helper_asteroid.fetch_sharded(shards=shards, target_rows=target_rows, **params)
+    single = helper_asteroid.fetch_data(**params)
+
+    assert int(sharded[ResponseKeys.COUNT.value]) == int(single[ResponseKeys.COUNT.value]), \
+        f"[{label}] Sharded count {sharded[ResponseKeys.COUNT.value]} != single {single[ResponseKeys.COUNT.value]}"
+    assert sharded.get(ResponseKeys.DATA.value, []) == single.get(ResponseKeys.DATA.value, []), \
+        f"[{label}] Merged rows differ from the single request"
 
 
 @pytest.mark.filtering
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, dist_min", MIN_DISTANCE_VALUES)
+@pytest.mark.cad_prefetch(build=min_distance_params)
 def test_filter_by_min_distance(helper_asteroid, label, dist_min):
     """Ensure API correctly filters results with minimum distance ≥ defined threshold."""
     pytest.logger.info(f"[{label}] Filtering by dist-min = {dist_min}")
-    params = AsteroidRequestBuilder().with_dist_min(dist_min).build()
+    params = min_distance_params(dist_min)
     result = helper_asteroid.fetch_data(**params)
 
-    pytest.logger.debug(f"Response received: {result}")
+    pytest.logger.debug("Response received: %s", LoggedBody(result))
     assert ResponseKeys.COUNT.value in result
     assert result[ResponseKeys.COUNT.value] >= 0
 
     if result[ResponseKeys.COUNT.value] > 0:
         assert ResponseKeys.DATA.value in result
-        for entry in result[ResponseKeys.DATA.value]:
-            dist = float(entry[AsteroidDataFields.DIST])
-            assert dist >= float(dist_min)
+        columns = CadColumns.from_payload(result)
+        offending = columns.violations("dist", lower=dist_min)
+        assert not offending.size, f"[{label}] {columns.describe(offending, 'dist')}"
 
 
 @pytest.mark.filtering
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, dist_min, dist_max", DISTANCE_RANGES)
+@pytest.mark.cad_prefetch(build=distance_range_params)
 def test_filter_by_distance_range(helper_asteroid, label, dist_min, dist_max):
     """Verify results fall within distance range defined in test_data.py."""
     pytest.logger.info(f"[{label}] Filtering by dist-min={dist_min} and dist-max={dist_max}")
-    params = AsteroidRequestBuilder().with_dist_range(dist_min, dist_max).build()
-    result = helper_asteroid.fetch_data(**params)
+    params = distance_range_params(dist_min, dist_max)
+    columns = helper_asteroid.fetch_columns(**params)
 
-    for entry in result.get(ResponseKeys.DATA.value, []):
-        dist = float(entry[AsteroidDataFields.DIST])
-        assert float(dist_min) <= dist <= float(dist_max)
+    offending = columns.violations("dist", lower=dist_min, upper=dist_max)
+    assert not offending.size, f"[{label}] {columns.describe(offending, 'dist')}"
 
 
 @pytest.mark.filtering
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, magnitude", ABSOLUTE_MAGNITUDES)
+@pytest.mark.cad_prefetch(build=magnitude_params)
 def test_filter_by_absolute_magnitude_upper_bound(helper_asteroid, label, magnitude):
     """Filter objects with absolute magnitude ≤ threshold defined in test_data.py."""
     pytest.logger.info(f"[{label}] Filtering by h <= {magnitude}")
-    params = AsteroidRequestBuilder().with_h_max(magnitude).build()
+    params = magnitude_params(magnitude)
     result = helper_asteroid.fetch_data(**params)
 
     assert ResponseKeys.DATA.value in result
@@ -147,11 +215,12 @@ def test_filter_by_absolute_magnitude_upper_bound(helper_asteroid, label, magnit
 @pytest.mark.filtering
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, velocity", VELOCITY_LIMITS)
+@pytest.mark.cad_prefetch(build=velocity_params)
 def test_filter_by_velocity_upper_bound(helper_asteroid, label, velocity):
     """Ensure filtered objects have v-inf ≤ defined max velocity."""
     pytest.logger.info(f"[{label}] Filtering by v-inf <= {velocity} km/s")
-    params = AsteroidRequestBuilder().with_v_inf_max(velocity).build()
-    result = helper_asteroid.fetch_data(**params)
+    params = velocity_params(velocity)
+    columns = helper_asteroid.fetch_columns(**params)
 
-    for entry in result.get(ResponseKeys.DATA.value, []):
-        assert float(entry[AsteroidDataFields.V_REL]) <= float(velocity)
+    offending = columns.violations("v_inf", upper=velocity)
+    assert not offending.size, f"[{label}] {columns.describe(offending, 'v_inf')}"
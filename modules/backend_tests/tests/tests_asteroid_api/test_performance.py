@@ -1,6 +1,9 @@
+import os
 import pytest
 
 from core import HTTPStatusCodes
+from core.log_pipeline import LoggedBody
+from modules.backend_tests import OPEN_LOOP_LATENCY_TARGETS, CAPACITY_DISCOVERY, DISTRIBUTED_LOAD
 
 
 @pytest.mark.performance
@@ -26,3 +29,85 @@ def test_simulate_rate_limit(helper_asteroid, helper_thread):
     assert failures >= 1, (
         f"Expected at least one {HTTPStatusCodes.SERVICE_UNAVAILABLE.value} error under load"
     )
+
+
+@pytest.mark.performance
+@pytest.mark.flaky_regression
+@pytest.mark.parametrize("label, rate, duration, p99_ms, max_unavailable", OPEN_LOOP_LATENCY_TARGETS)
+def test_open_loop_latency_percentiles(helper_asteroid, helper_thread, label, rate, duration, p99_ms,
+                                       max_unavailable):
+    """
+    Hold a constant request rate and check the p99 latency of the 200s, measured from each request's scheduled send
+    time. A few 503s are allowed, e.g. while the rate limiter refills after an earlier overload test.
+    """
+    pytest.logger.info(f"[{label}] Sending {rate} rps for {duration} s (open loop)")
+    report = helper_thread.simulate_open_loop_load(
+        controller=helper_asteroid.controller, rate=rate, duration=duration
+    )
+    summary = report.summary()
+
+    pytest.logger.info(f"[{label}] Latency: {summary['latency_ms']} | status mix: {summary['status_counts']}")
+    pytest.logger.debug("[%s] Status mix per second: %s", label, LoggedBody(report.timeline_rows()))
+
+    ok = report.status_counts[HTTPStatusCodes.OK.value]
+    unavailable = report.status_counts[HTTPStatusCodes.SERVICE_UNAVAILABLE.value]
+    assert not report.errors, f"[{label}] Transport errors under load: {dict(report.errors)}"
+    assert report.dropped == 0, f"[{label}] {report.dropped} requests dropped, the target rate was not offered"
+    assert ok + unavailable == report.completed, \
+        f"[{label}] Responses other than 200/503 at {rate} rps: {dict(report.status_counts)}"
+    assert unavailable <= max_unavailable * report.completed, \
+        f"[{label}] {unavailable} of {report.completed} requests rate-limited at {rate} rps"
+    assert report.percentile(99, successful=True) < p99_ms, \
+        f"[{label}] p99 {report.percentile(99, successful=True):.1f} ms of the 200s exceeds {p99_ms} ms at {rate} rps"
+
+
+@pytest.mark.performance
+@pytest.mark.flaky_regression
+@pytest.mark.parametrize("label, processes, rate, duration", DISTRIBUTED_LOAD)
+def test_distributed_load_is_aggregated(helper_asteroid, helper_thread, label, processes, rate, duration):
+    """Split an open-loop run across worker processes and check the merged report accounts for every request."""
+    pytest.logger.info(f"[{label}] Fanning {rate} rps for {duration} s out to {processes} worker processes")
+    report = helper_thread.simulate_distributed_load(
+        controller=helper_asteroid.controller, processes=processes, rate=rate, duration=duration,
+        timeout=duration + 60
+    )
+    summary = report.summary()
+
+    pytest.logger.info(f"[{label}] Latency: {summary['latency_ms']} | status mix: {summary['status_counts']}")
+
+    assert report.target_rate == pytest.approx(rate), f"[{label}] Worker rates do not add up to {rate} rps"
+    assert report.completed + report.dropped + report.cancelled == int(rate * duration), \
+        f"[{label}] Merged report lost requests: {summary}"
+    assert not report.errors, f"[{label}] Transport errors under load: {dict(report.errors)}"
+    assert report.histogram.total == report.completed, f"[{label}] Latency histograms were not merged"
+
+
+@pytest.mark.performance
+@pytest.mark.capacity
+@pytest.mark.parametrize("label, start_rate, max_rate, step_duration, concurrency_levels", CAPACITY_DISCOVERY)
+def test_discover_sustainable_request_rate(helper_asteroid, helper_thread, label, start_rate, max_rate,
+                                           step_duration, concurrency_levels):
+    """
+    Find the highest request rate served without 503s or latency blow-up, per in-flight limit when given, and save
+    the curve as JSON/CSV.
+    """
+    pytest.logger.info(f"[{label}] Searching for the sustainable request rate")
+    result = helper_thread.discover_capacity(
+        controller=helper_asteroid.controller,
+        start_rate=start_rate,
+        max_rate=max_rate,
+        step_duration=step_duration,
+        concurrency_levels=concurrency_levels,
+    )
+
+    for point in result.points:
+        pytest.logger.info(f"[{label}] {point.rate} rps, {point.concurrency or 'default'} in flight -> "
+                           f"p99 {point.p99_ms} ms, errors {point.error_ratio:.2%} "
+                           f"{'OK' if point.passed else point.reason}")
+
+    assert result.points, f"[{label}] No rate was probed"
+    assert result.knee_rps >= start_rate, f"[{label}] Not even {start_rate} rps was sustained"
+    assert all(os.path.exists(path) for path in result.artifacts), f"[{label}] Capacity artifacts were not written"
+    if concurrency_levels:
+        assert sorted(result.knees) == sorted(concurrency_levels), f"[{label}] Not every in-flight limit was searched"
+        assert result.knees[result.knee_concurrency] == result.knee_rps, f"[{label}] Knee is not the best limit's"
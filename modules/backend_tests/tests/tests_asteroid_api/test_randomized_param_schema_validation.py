@@ -1,10 +1,11 @@
 import pytest
 from datetime import timedelta
-from jsonschema import validate, ValidationError as JsonSchemaValidationError
-from pydantic import ValidationError as PydanticValidationError
+from jsonschema import ValidationError as JsonSchemaValidationError
 
 from modules.backend_tests import AsteroidRequestBuilder
-from core import ASTEROID_API_SCHEMA, ResponseKeys, CadEntry, DATE_FORMAT_ISO
+from core import ASTEROID_API_SCHEMA, ResponseKeys, DATE_FORMAT_ISO
+from core.cad_validation import validate_cad_rows, format_failures
+from core.schema_validation import validate_response
 
 
 @pytest.mark.schema
@@ -25,14 +26,10 @@ def test_randomized_param_schema_validation(helper_asteroid, faker_fixture):
     result = helper_asteroid.fetch_data(**params)
 
     try:
-        validate(instance=result, schema=ASTEROID_API_SCHEMA)
+        validate_response(result, ASTEROID_API_SCHEMA)
     except JsonSchemaValidationError as e:
         pytest.fail(f"Randomized schema failed: {e}")
 
-    fields = result.get("fields", [])
-    for entry in result.get(ResponseKeys.DATA.value, []):
-        entry_dict = dict(zip(fields, entry))
-        try:
-            CadEntry.model_validate(entry_dict)
-        except PydanticValidationError as e:
-            pytest.fail(f"Randomized entry failed CadEntry validation: {e}")
+    failures = validate_cad_rows(result.get("fields", []), result.get(ResponseKeys.DATA.value, []))
+    if failures:
+        pytest.fail(f"Randomized entry failed CadEntry validation: {format_failures(failures)}")
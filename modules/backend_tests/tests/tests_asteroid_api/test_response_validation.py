@@ -1,12 +1,15 @@
 import pytest
 
-from modules.backend_tests import AsteroidRequestBuilder, VALID_SORTING_DATES
-from core import ResponseKeys, AsteroidDataFields, NASA_CLOSE_APPROACH_DATE_FORMAT, DATE_FORMAT_ISO
+from modules.backend_tests import VALID_SORTING_DATES, date_range_params
+from core import ResponseKeys, AsteroidDataFields, DATE_FORMAT_ISO
+from core.cad_dates import parse_cd_array, first_unsorted, jd_range_violations
 from datetime import datetime
+import numpy as np
 
 
 @pytest.mark.smoke
 @pytest.mark.flaky_regression
+@pytest.mark.latency_budget(p50_ms=2000, max_ms=5000)
 def test_cad_api_smoke_returns_basic_fields(helper_asteroid):
     """
     Basic smoke test: Ensure default request returns expected top-level keys.
@@ -22,45 +25,52 @@ def test_cad_api_smoke_returns_basic_fields(helper_asteroid):
 @pytest.mark.flaky_regression
 @pytest.mark.validation
 @pytest.mark.parametrize("label, start, end", VALID_SORTING_DATES)
+@pytest.mark.cad_prefetch(build=date_range_params)
 def test_results_sorted_by_close_approach_date(helper_asteroid, label, start, end):
     """Check that results are sorted by close-approach date ascending."""
     pytest.logger.info(f"[{label}] Verifying sorting from {start} to {end}")
-    params = AsteroidRequestBuilder().with_date_range(start, end).build()
+    params = date_range_params(start, end)
     result = helper_asteroid.fetch_data(**params)
 
-    dates = [entry[AsteroidDataFields.CD] for entry in result.get(ResponseKeys.DATA.value, [])]
-    parsed_dates = [datetime.strptime(date, NASA_CLOSE_APPROACH_DATE_FORMAT) for date in dates]
+    data = result.get(ResponseKeys.DATA.value, [])
+    parsed_dates = parse_cd_array([entry[AsteroidDataFields.CD] for entry in data])
+    jd = np.array([entry[AsteroidDataFields.JD] for entry in data], dtype=np.float64)
 
-    if parsed_dates != sorted(parsed_dates):
+    unsorted_at = first_unsorted(parsed_dates)
+    if unsorted_at is not None:
         pytest.logger.error(f"[{label}] Dates are not sorted correctly!")
 
-    assert parsed_dates == sorted(parsed_dates)
+    assert unsorted_at is None, \
+        f"[{label}] Row {unsorted_at} ({parsed_dates[unsorted_at]}) is earlier than the row before it"
+    unsorted_at = first_unsorted(jd)
+    assert unsorted_at is None, \
+        f"[{label}] Row {unsorted_at} has a smaller {AsteroidDataFields.JD.name} than the row before it"
 
 
 @pytest.mark.flaky_regression
 @pytest.mark.validation
 @pytest.mark.parametrize("label, start, end", VALID_SORTING_DATES)
+@pytest.mark.cad_prefetch(build=date_range_params)
 def test_close_approach_date_format_is_valid(helper_asteroid, label, start, end):
     """Validate all close-approach dates conform to the expected NASA format."""
     pytest.logger.info(f"[{label}] Validating 'cd' format for entries between {start} and {end}")
-    params = AsteroidRequestBuilder().with_date_range(start, end).build()
+    params = date_range_params(start, end)
     result = helper_asteroid.fetch_data(**params)
 
-    for entry in result.get(ResponseKeys.DATA.value, []):
-        date_str = entry[AsteroidDataFields.CD]
-        try:
-            datetime.strptime(date_str, NASA_CLOSE_APPROACH_DATE_FORMAT)
-        except ValueError:
-            pytest.fail(f"[{label}] Invalid {AsteroidDataFields.CD.name} format: {date_str}")
+    try:
+        parse_cd_array([entry[AsteroidDataFields.CD] for entry in result.get(ResponseKeys.DATA.value, [])])
+    except ValueError as e:
+        pytest.fail(f"[{label}] Invalid {AsteroidDataFields.CD.name} format: {e}")
 
 
 @pytest.mark.validation
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, start, end", VALID_SORTING_DATES)
+@pytest.mark.cad_prefetch(build=date_range_params)
 def test_cd_field_is_present_and_not_empty(helper_asteroid, label, start, end):
     """Ensure all entries contain a non-empty 'cd' (close-approach date)."""
     pytest.logger.info(f"[{label}] Checking non-empty 'cd' field from {start} to {end}")
-    params = AsteroidRequestBuilder().with_date_range(start, end).build()
+    params = date_range_params(start, end)
     result = helper_asteroid.fetch_data(**params)
 
     for entry in result.get(ResponseKeys.DATA.value, []):
@@ -71,18 +81,25 @@ def test_cd_field_is_present_and_not_empty(helper_asteroid, label, start, end):
 @pytest.mark.validation
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, start, end", VALID_SORTING_DATES)
+@pytest.mark.cad_prefetch(build=date_range_params)
 def test_cd_within_requested_date_range(helper_asteroid, label, start, end):
     """Ensure 'cd' values fall within the specified date range."""
     pytest.logger.info(f"[{label}] Verifying 'cd' is within {start} to {end}")
-    params = AsteroidRequestBuilder().with_date_range(start, end).build()
+    params = date_range_params(start, end)
     result = helper_asteroid.fetch_data(**params)
 
     start_date = datetime.strptime(start, DATE_FORMAT_ISO)
     end_date = datetime.strptime(end, DATE_FORMAT_ISO)
+    data = result.get(ResponseKeys.DATA.value, [])
 
-    for entry in result.get(ResponseKeys.DATA.value, []):
-        cd_date = datetime.strptime(entry[AsteroidDataFields.CD], NASA_CLOSE_APPROACH_DATE_FORMAT)
-        assert start_date <= cd_date <= end_date, f"'{AsteroidDataFields.CD.name}' out of range: {cd_date}"
+    cd_dates = parse_cd_array([entry[AsteroidDataFields.CD] for entry in data])
+    out_of_range = np.flatnonzero((cd_dates < np.datetime64(start_date, "m"))
+                                  | (cd_dates > np.datetime64(end_date, "m")))
+    assert not out_of_range.size, f"'{AsteroidDataFields.CD.name}' out of range: {cd_dates[out_of_range[:5]]}"
+
+    jd = np.array([entry[AsteroidDataFields.JD] for entry in data], dtype=np.float64)
+    out_of_range = jd_range_violations(jd, start_date, end_date)
+    assert not out_of_range.size, f"'{AsteroidDataFields.JD.name}' out of range: {jd[out_of_range[:5]]}"
 
 
 @pytest.mark.validation
@@ -1,12 +1,13 @@
 import pytest
-from jsonschema import validate, ValidationError
-from pydantic import ValidationError as PydanticValidationError
+from jsonschema import ValidationError
 
 from core import ASTEROID_API_SCHEMA, AsteroidDataFields
-from modules.backend_tests import AsteroidRequestBuilder, VALID_DATA_TYPES_DATES
+from core.cad_validation import validate_cad_rows, format_failures
+from core.schema_validation import validate_response
+from modules.backend_tests import VALID_DATA_TYPES_DATES, MISSING_REQUIRED_COLUMNS, date_range_params
 
 
-from core import CadEntry, ResponseKeys
+from core import ResponseKeys
 
 
 @pytest.mark.smoke
@@ -21,34 +22,32 @@ def test_response_schema(helper_asteroid):
 
     # validate using JSON Schema
     try:
-        validate(instance=result, schema=schema)
+        validate_response(result, schema)
         pytest.logger.info("JSON Schema validation passed.")
     except ValidationError as e:
         pytest.logger.error(f"JSON Schema validation failed: {e}")
         pytest.fail(f"JSON Schema validation failed: {e}")
 
-    # validate each row using Pydantic by converting list to dict
+    # validate all rows against the CadEntry contract in one batched pydantic call
     fields = result.get("fields", [])
     data = result.get(ResponseKeys.DATA.value, [])
 
-    try:
-        for row in data:
-            entry_dict = dict(zip(fields, row))
-            CadEntry.model_validate(entry_dict)
-        pytest.logger.info("Pydantic CadEntry validation passed.")
-    except PydanticValidationError as e:
-        pytest.logger.error(f"Pydantic CadEntry validation failed: {e}")
-        pytest.fail(f"Pydantic CadEntry validation failed: {e}")
+    failures = validate_cad_rows(fields, data)
+    if failures:
+        pytest.logger.error(f"Pydantic CadEntry validation failed: {format_failures(failures)}")
+        pytest.fail(f"Pydantic CadEntry validation failed: {format_failures(failures)}")
+    pytest.logger.info("Pydantic CadEntry validation passed.")
 
 
 @pytest.mark.validation
 @pytest.mark.flaky_regression
 @pytest.mark.parametrize("label, start, end", VALID_DATA_TYPES_DATES)
+@pytest.mark.cad_prefetch(build=date_range_params)
 def test_data_fields_have_expected_types(helper_asteroid, label, start, end):
     """Validate expected types for key fields in a known data window."""
     pytest.logger.info(f"[{label}] Validating data field types from {start} to {end}")
 
-    params = AsteroidRequestBuilder().with_date_range(start, end).build()
+    params = date_range_params(start, end)
     result = helper_asteroid.fetch_data(**params)
 
     data = result.get(ResponseKeys.DATA.value, [])
@@ -66,3 +65,25 @@ def test_data_fields_have_expected_types(helper_asteroid, label, start, end):
             f"{AsteroidDataFields.DIST.name} should be a positive float"
 
         pytest.logger.info(f"[{label}] Field types successfully validated.")
+
+
+@pytest.mark.validation
+@pytest.mark.parametrize("label, column", MISSING_REQUIRED_COLUMNS)
+def test_rows_missing_required_column_fail_validation(helper_asteroid, label, column):
+    """A response without a required `CadEntry` column must fail row validation, not pass the batched check."""
+    start, end = VALID_DATA_TYPES_DATES[0][1:]
+    params = date_range_params(start, end)
+    result = helper_asteroid.fetch_data(**params)
+
+    fields = result.get("fields", [])
+    data = result.get(ResponseKeys.DATA.value, [])
+    assert data, f"[{label}] No data returned for range {start} to {end}"
+
+    position = fields.index(column)
+    failures = validate_cad_rows(fields[:position] + fields[position + 1:],
+                                 [row[:position] + row[position + 1:] for row in data])
+    pytest.logger.debug(f"[{label}] Failures: {format_failures(failures)}")
+
+    assert failures, f"[{label}] Rows without '{column}' passed CadEntry validation"
+    assert {failure.field for failure in failures} == {column}, \
+        f"[{label}] Expected only '{column}' to be reported: {format_failures(failures)}"
@@ -0,0 +1,137 @@
+import json
+from collections import defaultdict
+from datetime import datetime
+from itertools import count
+
+import pytest
+
+from core import CadModes
+from core.cad_dates import datetime_to_jd
+from core.cad_shards import parse_window_date
+from core.cad_snapshot import NUMERIC_COLUMNS, CadSnapshot, SnapshotWriter, designation_hash
+from modules.backend_tests import (AsteroidAPIController, SNAPSHOT_BOUNDARY_APPROACHES, SNAPSHOT_BOUNDARY_DOWNLOADS,
+                                   SNAPSHOT_DATASET_QUERIES, SNAPSHOT_HASH_COLLISIONS, SNAPSHOT_MONTH)
+from modules.backend_tests.helpers.snapshot_downloader import download_snapshot
+from modules.backend_tests.stand_in.cad_server import CadStandInServer, run_query
+from modules.backend_tests.stand_in.dataset import CadDataset, SnapshotDataset, format_cd
+
+HASH_BITS = 0xFF  # designations sharing the low 8 hash bits collide in every index of up to 256 slots
+
+
+@pytest.fixture(scope="module")
+def month_payload():
+    """Every column of a synthetic `SNAPSHOT_MONTH`, as a CAD response body."""
+    start, end, rows_per_day = SNAPSHOT_MONTH
+    dataset = CadDataset.synthetic(parse_window_date(start), parse_window_date(end), rows_per_day=rows_per_day)
+    params = {"date-min": start, "date-max": end, "dist-max": "1", "diameter": "true", "fullname": "true"}
+    return json.loads(run_query(dataset, params))
+
+
+@pytest.fixture(scope="module")
+def month_snapshot(month_payload, tmp_path_factory):
+    """`month_payload` written to a snapshot in two appends."""
+    path = str(tmp_path_factory.mktemp("snapshot"))
+    fields, data = month_payload["fields"], month_payload["data"]
+    with SnapshotWriter(path) as writer:
+        writer.append(fields, data[:len(data) // 2])
+        writer.append(fields, data[len(data) // 2:])
+    return path
+
+
+def colliding_designations(colliding, total):
+    """`total` designations, the first `colliding` of them in one hash slot, plus one more for that slot."""
+    slots = defaultdict(list)
+    for number in count(1):
+        des = f"2024 AA{number}"
+        slot = slots[designation_hash(des) & HASH_BITS]
+        slot.append(des)
+        if len(slot) == colliding + 1:
+            break
+    others = [candidates[0] for candidates in slots.values() if candidates is not slot]
+    return slot[:colliding] + others[:total - colliding], slot[colliding]
+
+
+def boundary_row(des, orbit_id, approach):
+    moment = datetime.strptime(approach, "%Y-%m-%d %H:%M")
+    return {"des": des, "orbit_id": orbit_id, "jd": datetime_to_jd(moment), "cd": format_cd(moment),
+            "dist": 0.01, "dist_min": 0.0099, "dist_max": 0.0101, "v_rel": 10.5, "v_inf": 10.4,
+            "t_sigma_f": "00:01", "h": 24.5}
+
+
+@pytest.mark.offline
+def test_snapshot_reads_back_every_row(month_payload, month_snapshot):
+    """Rows written to a snapshot read back unchanged and every designation finds exactly its rows."""
+    fields, data = month_payload["fields"], month_payload["data"]
+    snapshot = CadSnapshot(month_snapshot)
+    pytest.logger.info(f"Reading back {len(data)} rows of {len(set(row[0] for row in data))} designations")
+
+    assert len(snapshot) == len(data), f"Snapshot holds {len(snapshot)} of {len(data)} rows"
+    rows_by_des = defaultdict(list)
+    for index, values in enumerate(data):
+        expected = {name: float(value) if name in NUMERIC_COLUMNS and value is not None else value
+                    for name, value in zip(fields, values)}
+        assert snapshot.row(index) == expected, f"Row {index} changed in the snapshot"
+        rows_by_des[expected["des"]].append(index)
+    for des, rows in rows_by_des.items():
+        assert snapshot.rows_for(des).tolist() == rows, f"Wrong rows for {des}"
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("label, colliding, total", SNAPSHOT_HASH_COLLISIONS)
+def test_snapshot_index_probes_past_hash_collisions(tmp_path, label, colliding, total):
+    """Designations sharing a hash slot are all found, and a missing one ends its probe empty-handed."""
+    designations, missing = colliding_designations(colliding, total)
+    data = [[designations[index % total], "1", str(2460310.5 + index)] for index in range(total * 3)]
+    with SnapshotWriter(str(tmp_path)) as writer:
+        writer.append(["des", "orbit_id", "jd"], data)
+    snapshot = CadSnapshot(str(tmp_path))
+    pytest.logger.info(f"[{label}] {designations[:colliding]} share a slot, {missing} is not written")
+
+    for position, des in enumerate(designations):
+        assert snapshot.rows_for(des).tolist() == list(range(position, total * 3, total)), \
+            f"[{label}] Wrong rows for {des}"
+    assert snapshot.rows_for(missing).size == 0, f"[{label}] {missing} was found although never written"
+
+
+@pytest.mark.offline
+def test_snapshot_without_designations_is_readable(tmp_path):
+    """Rows of a layout without `des` are stored with a null designation and an empty index."""
+    with SnapshotWriter(str(tmp_path)) as writer:
+        writer.append(["orbit_id", "jd"], [["1", "2460310.5"], ["2", "2460311.5"]])
+    snapshot = CadSnapshot(str(tmp_path))
+
+    assert len(snapshot) == 2
+    assert snapshot.row(0)["des"] is None and snapshot.row(1)["orbit_id"] == "2"
+    assert snapshot.rows_for("2024 AA1").size == 0
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("label, start, end, window_days, concurrency", SNAPSHOT_BOUNDARY_DOWNLOADS)
+def test_snapshot_download_writes_boundary_rows_once(tmp_path, label, start, end, window_days, concurrency):
+    """Approaches on a window boundary come back from both neighbouring windows but are written once."""
+    dataset = CadDataset([boundary_row(*approach) for approach in SNAPSHOT_BOUNDARY_APPROACHES])
+    server = CadStandInServer(dataset, rate=1000, burst=100).start()
+    controller = AsteroidAPIController()
+    controller.BASE_URL, controller.mode = server.base_url, CadModes.LIVE  # local rows, never recorded
+    try:
+        snapshot = download_snapshot(str(tmp_path), parse_window_date(start), parse_window_date(end), window_days,
+                                     concurrency, params={"dist-max": "1"}, controller=controller)
+    finally:
+        server.stop()
+    written = [(snapshot.row(index)["des"], snapshot.row(index)["orbit_id"]) for index in range(len(snapshot))]
+    pytest.logger.info(f"[{label}] {server.requests} windows fetched, {len(written)} rows written")
+
+    assert written == [(des, orbit_id) for des, orbit_id, _ in SNAPSHOT_BOUNDARY_APPROACHES], \
+        f"[{label}] Boundary rows were dropped or written twice: {written}"
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("label, params", SNAPSHOT_DATASET_QUERIES)
+def test_snapshot_dataset_answers_like_loaded_rows(month_payload, month_snapshot, label, params):
+    """The stand-in answers a query from a memory-mapped snapshot byte for byte as from the same rows in memory."""
+    expected = run_query(CadDataset.from_payload(month_payload), params)
+    actual = run_query(SnapshotDataset.from_directory(month_snapshot), params)
+    pytest.logger.info(f"[{label}] {json.loads(expected)['count']} rows for {params}")
+
+    assert json.loads(expected)["count"] > 0, f"[{label}] Query matches no rows, nothing is compared"
+    assert actual == expected, f"[{label}] Snapshot-backed response differs from the in-memory one"
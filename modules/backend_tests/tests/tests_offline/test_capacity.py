@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from core.capacity import find_capacity
+from core.load_engine import LoadReport
+from modules.backend_tests import CAPACITY_SEARCHES
+
+STEP_SECONDS = 10
+TOLERANCE = 0.05
+
+
+def model_step(latency):
+    """`run_step` of a server answering in `latency` s: sends beyond the in-flight limit are dropped."""
+    async def run_step(rate, concurrency):
+        report = LoadReport(target_rate=rate, elapsed=STEP_SECONDS)
+        sent = int(rate * STEP_SECONDS)
+        served = sent if rate * latency <= concurrency else int(concurrency / latency * STEP_SECONDS)
+        for _ in range(served):
+            report.add(200, latency)
+        report.dropped = sent - served
+        return report
+    return run_step
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("label, latency, concurrency_levels", CAPACITY_SEARCHES)
+def test_capacity_search_finds_knee_per_in_flight_limit(label, latency, concurrency_levels):
+    """Each in-flight limit gets its own knee near `limit / latency` rps, and the best limit is reported."""
+    result = asyncio.run(find_capacity(model_step(latency), max_rate=1000, tolerance=TOLERANCE,
+                                       concurrency_levels=concurrency_levels))
+    pytest.logger.info(f"[{label}] Knees {result.knees}, best {result.knee_rps} rps at {result.knee_concurrency}")
+
+    assert sorted(result.knees) == sorted(concurrency_levels), f"[{label}] Not every limit was searched"
+    for concurrency, knee in result.knees.items():
+        limit = concurrency / latency
+        assert limit * (1 - TOLERANCE) <= knee <= limit, \
+            f"[{label}] Knee {knee} rps at {concurrency} in flight, the model sustains {limit} rps"
+    assert result.knee_concurrency == max(concurrency_levels), f"[{label}] Best limit not reported"
+    assert {point.concurrency for point in result.points} == set(concurrency_levels)
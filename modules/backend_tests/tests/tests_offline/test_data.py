@@ -0,0 +1,61 @@
+# synthetic month written to a snapshot: (first day, last day, rows per day)
+SNAPSHOT_MONTH = ("2024-01-01", "2024-02-01", 40)
+
+# stand-in queries answered from the SNAPSHOT_MONTH snapshot: (label, params)
+SNAPSHOT_DATASET_QUERIES = [
+    ("Default layout", {"date-min": "2024-01-05", "date-max": "2024-01-20"}),
+    ("Farthest first with diameter", {"date-min": "2024-01-01", "date-max": "2024-02-01", "dist-max": "0.2",
+                                      "sort": "-dist", "diameter": "true"}),
+    ("Comets with full names", {"date-min": "2024-01-01", "date-max": "2024-02-01", "dist-max": "1",
+                                "kind": "c", "fullname": "true"}),
+    ("Ten slowest numbered", {"date-min": "2024-01-10", "date-max": "2024-01-25", "dist-max": "1",
+                              "kind": "an", "sort": "v-inf", "limit": "10"}),
+]
+
+# designation hash index: (label, designations sharing one hash slot, designations per snapshot)
+SNAPSHOT_HASH_COLLISIONS = [
+    ("Four designations in one slot", 4, 4),
+    ("Three colliding among eight", 3, 8),
+]
+
+# approaches on daily window boundaries, returned by both neighbouring windows: (des, orbit_id, approach time)
+SNAPSHOT_BOUNDARY_APPROACHES = [
+    ("2019 AB1", "3", "2024-01-01 12:00"),
+    ("2020 CD2", "5", "2024-01-02 00:00"),
+    ("2021 EF3", "1", "2024-01-02 00:00"),
+    ("2021 EF3", "2", "2024-01-02 00:00"),
+    ("2022 GH4", "7", "2024-01-03 00:00"),
+    ("2023 JK5", "4", "2024-01-03 18:30"),
+    ("2018 LM6", "9", "2024-01-04 00:00"),
+]
+
+# snapshot downloads of SNAPSHOT_BOUNDARY_APPROACHES: (label, first day, last day, days per window, windows in flight)
+SNAPSHOT_BOUNDARY_DOWNLOADS = [
+    ("Daily windows, one at a time", "2024-01-01", "2024-01-04", 1, 1),
+    ("Daily windows, three in flight", "2024-01-01", "2024-01-04", 1, 3),
+]
+
+# stand-in object kind of a designation: (label, designation, kind)
+DESIGNATION_KINDS = [
+    ("Numbered periodic comet", "1P", "c"),
+    ("Comet fragment", "73P-B", "c"),
+    ("Long-period comet", "C/2020 F3", "c"),
+    ("Unnumbered periodic comet", "P/2019 LD2", "c"),
+    ("Provisional asteroid ending in P", "2020 AP", "a"),
+    ("Numbered asteroid", "99942", "a"),
+]
+
+# shared response store: (label, status code, stored for other workers)
+STORE_STATUS_CODES = [
+    ("OK", 200, True),
+    ("Bad request", 400, True),
+    ("Rate limited", 429, False),
+    ("Internal server error", 500, False),
+    ("Service unavailable", 503, False),
+]
+
+# capacity search against a model server sustaining `in-flight limit / latency` rps: (label, latency in s, limits)
+CAPACITY_SEARCHES = [
+    ("200 ms responses at 2 / 8 in flight", 0.2, [8, 2]),
+    ("50 ms responses at 1 / 4 / 16 in flight", 0.05, [1, 4, 16]),
+]
@@ -0,0 +1,58 @@
+import glob
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.response_cache import ResponseCache
+from core.response_store import ResponseStore
+from modules.backend_tests import AsteroidRequestBuilder, STORE_STATUS_CODES, VALID_SORTING_DATES
+from modules.backend_tests.helpers import helper_asteroids_data
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("label, status_code, stored", STORE_STATUS_CODES)
+def test_shared_store_keeps_only_repeatable_responses(helper_asteroid, monkeypatch, tmp_path, label, status_code,
+                                                      stored):
+    """Only 2xx and 4xx answers other than 429 may be served to other workers from the shared store."""
+    store = ResponseStore(str(tmp_path))
+    monkeypatch.setattr(helper_asteroids_data, "get_response_store", lambda: store)
+    monkeypatch.setattr(helper_asteroids_data, "get_response_cache", ResponseCache)
+    monkeypatch.setattr(helper_asteroid.controller, "get_close_approach_data",
+                        lambda params: SimpleNamespace(status_code=status_code, content=b"{}"))
+    params = AsteroidRequestBuilder().with_date_range(*VALID_SORTING_DATES[0][1:]).build()
+
+    helper_asteroid.fetch_data(expected_status_code=status_code, **params)
+    pytest.logger.info(f"[{label}] Fetched a {status_code} response through the shared store")
+
+    refetched = []
+
+    def fetch_again():
+        refetched.append(params)
+        return 200, b"{}"
+
+    store.get_or_fetch(helper_asteroid.controller.BASE_URL, params, fetch_again)
+    assert bool(refetched) != stored, \
+        f"[{label}] A {status_code} response was {'not ' if stored else ''}kept in the shared store"
+
+
+@pytest.mark.offline
+def test_evict_removes_orphaned_lock_and_temporary_files(tmp_path):
+    """Eviction also clears lock files of removed entries and temporary files of interrupted writes."""
+    store = ResponseStore(str(tmp_path), ttl=60)
+    for day in ("2025-01-01", "2025-01-02"):
+        store.get_or_fetch("https://example.org/cad.api", {"date-min": day}, lambda: (200, b"{}"))
+    expired, kept = sorted(glob.glob(os.path.join(str(tmp_path), "*", "*.z")))
+    stale = time.time() - 120
+    os.utime(expired, (stale, stale))
+    leftover, writing = f"{kept}.4242.tmp", f"{kept}.4343.tmp"
+    for path in (leftover, writing):
+        with open(path, "wb"):
+            pass
+    os.utime(leftover, (stale, stale))
+
+    assert store.evict() == 1
+    remaining = set(glob.glob(os.path.join(str(tmp_path), "*", "*.z*")))
+    pytest.logger.info(f"Left after eviction: {sorted(os.path.basename(path) for path in remaining)}")
+    assert remaining == {kept, f"{kept}.lock", writing}, "Orphaned lock or stale temporary files were kept"
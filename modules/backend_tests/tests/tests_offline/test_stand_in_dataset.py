@@ -0,0 +1,12 @@
+import pytest
+
+from modules.backend_tests import DESIGNATION_KINDS
+from modules.backend_tests.stand_in.dataset import default_kind
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("label, des, kind", DESIGNATION_KINDS)
+def test_default_kind_tells_comets_from_asteroids(label, des, kind):
+    """Rows without a `kind` get `c` only for comet designations, so `kind` filters match the real API."""
+    pytest.logger.info(f"[{label}] {des} -> {default_kind(des)}")
+    assert default_kind(des) == kind, f"[{label}] {des} classified as {default_kind(des)!r}, expected {kind!r}"